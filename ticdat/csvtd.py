@@ -7,7 +7,6 @@ import os
 from ticdat.utils import DataFrame, create_generic_free, numericish, case_space_to_pretty
 from ticdat.utils import freezable_factory, TicDatError, verify, containerish, dictish
 from collections import defaultdict
-from itertools import product
 
 try:
     import csv
@@ -89,25 +88,35 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
                 self.tic_dat_factory.data_types.get(table, {}).get(field)
             )
         return self._dv_dt[table, field]
-    def _read_cell(self, table, field, x):
-        def _inner_rtn(x):
-            if table == "parameters" and self.tic_dat_factory.parameters:
-                return x
-            dv, dt = self._get_dv_dt(table, field)
-            if x == "" and ((dt and dt.nullable) or (not dt and dv is None) or
-                            numericish(self.tic_dat_factory._general_read_cell(table, field, None))):
-                return None
-            should_try_float = (dt and dt.number_allowed) or (not dt and numericish(dv)) or \
-                               (table in self.tic_dat_factory.generic_tables)
-            if should_try_float:
+    def _cell_reader(self, table, field):
+        # resolves everything that depends only on (table, field) up front, so as to not pay for it once per cell
+        tdf = self.tic_dat_factory
+        general = tdf._cell_reader(table, field)
+        if table == "parameters" and tdf.parameters:
+            return (lambda x: x) if general is None else general
+        dv, dt = self._get_dv_dt(table, field)
+        empty_is_none = bool((dt and dt.nullable) or (not dt and dv is None))
+        should_try_float = (dt and dt.number_allowed) or (not dt and numericish(dv)) or \
+                           (table in tdf.generic_tables)
+        must_be_int = bool(dt and dt.must_be_int)
+        # whether an empty cell reads as None is resolved the first time an empty cell is read, since the None as
+        # infinity flagging can object to a field that never reads a None
+        empty_as_none = [True] if empty_is_none else []
+        def reader(x):
+            if x == "":
+                if not empty_as_none:
+                    empty_as_none.append(general is not None and numericish(general(None)))
+                if empty_as_none[0]:
+                    x = None
+            elif should_try_float:
                 try:
                     x = float(x)
-                    if int(x) == x and dt and dt.must_be_int:
+                    if int(x) == x and must_be_int:
                         x = int(x)
                 except:
-                    return x
-            return x
-        return self.tic_dat_factory._general_read_cell(table, field, _inner_rtn(x))
+                    pass
+            return x if general is None else general(x)
+        return reader
     def _create_tic_dat(self, dir_path, dialect, headers_present, encoding):
         verify(dialect in csv.list_dialects(), "Invalid dialect %s"%dialect)
         verify(os.path.isdir(dir_path), "Invalid directory path %s"%dir_path)
@@ -148,12 +157,10 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
         rtn = {t:defaultdict(int) for t,_ in tdf.primary_key_fields.items()
                if _ and self._get_file_path(dir_path, t)}
         for t in rtn:
+            pk_len = len(tdf.primary_key_fields[t])
             with open(self._get_file_path(dir_path, t), encoding=encoding) as csvfile:
-                for r in self._get_data(csvfile, t, dialect, headers_present):
-                    p_key = r[tdf.primary_key_fields[t][0]] \
-                            if len(tdf.primary_key_fields[t])==1 else \
-                            tuple(r[_] for _ in tdf.primary_key_fields[t])
-                    rtn[t][p_key] += 1
+                for r in self._get_data(csvfile, t, dialect, headers_present)[1]:
+                    rtn[t][r[0] if pk_len == 1 else r[:pk_len]] += 1
         for t in list(rtn.keys()):
             rtn[t] = {k:v for k,v in rtn[t].items() if v > 1}
             if not rtn[t]:
@@ -167,26 +174,47 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
         if rtn:
             return rtn[0]
     def _get_data(self, csvfile, table, dialect, headers_present):
+        """
+        :return: the field names, and a generator of one tuple of cell values (in field name order) per data row
+        """
         tdf = self.tic_dat_factory
-        fieldnames=tdf.primary_key_fields.get(table, ()) + tdf.data_fields.get(table, ())
+        fieldnames = tdf.compile().all_fields.get(table, ())
         assert fieldnames or table in self.tic_dat_factory.generic_tables
-        for row in csv.DictReader(csvfile, dialect = dialect,
-                            **({"fieldnames":fieldnames} if not headers_present else {})):
+        csv_rows = csv.reader(csvfile, dialect=dialect)
+        if headers_present:
+            header = next(csv_rows, [])
+            # as with csv.DictReader, the last of any exactly duplicated column names is the one that is used
+            header_positions = {h: i for i, h in enumerate(header)}
+            fieldnames = fieldnames or tuple(header_positions)
+            row_len = len(header)
+        else:
+            row_len = len(fieldnames)
+        readers = [self._cell_reader(table, f) for f in fieldnames]
+        def positions():
+            # the header is resolved once, but (as before) only complained about if there is data to read
             if not headers_present:
-                verify(len(row) == len(fieldnames),
-                   "Need %s columns for table %s"%(len(fieldnames), table))
-                yield {f: self._read_cell(table, f, row[f]) for f in fieldnames}
-            else:
-                key_matching = defaultdict(list)
-                for k,f in product(row.keys(), fieldnames or row.keys()):
-                    if k.lower() ==f.lower():
-                        key_matching[f].append(k)
-                fieldnames = fieldnames or row.keys()
-                for f in fieldnames:
-                    verify(f in key_matching, "Unable to find field name %s for table %s"%(f, table))
-                    verify(len(key_matching[f]) <= 1,
-                           "Duplicate field names found for field %s table %s"%(f, table))
-                yield {f: self._read_cell(table, f, row[key_matching[f][0]]) for f in fieldnames}
+                return tuple(range(len(fieldnames)))
+            key_matching = defaultdict(list)
+            for k, i in header_positions.items():
+                key_matching[k.lower()].append(i)
+            for f in fieldnames:
+                verify(f.lower() in key_matching, "Unable to find field name %s for table %s"%(f, table))
+                verify(len(key_matching[f.lower()]) <= 1,
+                       "Duplicate field names found for field %s table %s"%(f, table))
+            return tuple(key_matching[f.lower()][0] for f in fieldnames)
+        def rows():
+            field_positions = None
+            for row in csv_rows:
+                if not row: # csv.DictReader also skips blank rows
+                    continue
+                if field_positions is None:
+                    field_positions = positions()
+                if len(row) < row_len: # and pads short rows with None
+                    row += [None] * (row_len - len(row))
+                verify(headers_present or len(row) == row_len,
+                       "Need %s columns for table %s"%(len(fieldnames), table))
+                yield tuple(r(row[i]) for r, i in zip(readers, field_positions))
+        return fieldnames, rows()
 
     def _create_table(self, dir_path, table, dialect, headers_present, encoding):
         file_path = self._get_file_path(dir_path, table)
@@ -196,21 +224,22 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
         if table in tdf.generator_tables:
             def rtn() :
                 with open(file_path, encoding=encoding) as csvfile:
-                    for r in self._get_data(csvfile, table, dialect, headers_present):
-                        yield tuple(r[_] for _ in tdf.data_fields[table])
+                    yield from self._get_data(csvfile, table, dialect, headers_present)[1]
         else:
-            rtn = {} if tdf.primary_key_fields.get(table) else []
+            pk_len = len(tdf.primary_key_fields.get(table, ()))
+            rtn = {} if pk_len else []
             with open(file_path, encoding=encoding) as csvfile:
-                for r in self._get_data(csvfile, table, dialect, headers_present) :
-                    if tdf.primary_key_fields.get(table) :
-                        p_key = r[tdf.primary_key_fields[table][0]] \
-                                if len(tdf.primary_key_fields[table]) == 1 else \
-                                tuple(r[_] for _ in tdf.primary_key_fields[table])
-                        rtn[p_key] = tuple(r[_] for _ in tdf.data_fields.get(table,()))
-                    elif table in tdf.generic_tables:
-                        rtn.append(r)
-                    else:
-                        rtn.append(tuple(r[_] for _ in tdf.data_fields[table]))
+                fieldnames, rows = self._get_data(csvfile, table, dialect, headers_present)
+                if pk_len == 1:
+                    for r in rows:
+                        rtn[r[0]] = r[1:]
+                elif pk_len:
+                    for r in rows:
+                        rtn[r[:pk_len]] = r[pk_len:]
+                elif table in tdf.generic_tables:
+                    rtn.extend(dict(zip(fieldnames, r)) for r in rows)
+                else:
+                    rtn.extend(rows)
         return rtn
 
     def write_directory(self, tic_dat, dir_path, allow_overwrite = False, dialect='excel',
@@ -259,10 +288,16 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
             f = os.path.join(dir_path, (case_space_to_pretty(t) if case_space_table_names else t) + ".csv")
             with open(f, 'w', newline='') as csvfile:
                  writer = csv.DictWriter(csvfile,dialect=dialect, fieldnames=
-                        tdf.primary_key_fields.get(t, ()) + tdf.data_fields.get(t, ()) )
+                        tdf.compile().all_fields.get(t, ()))
                  writer.writeheader() if write_header else None
+                 writers = {}
                  def infinty_io_dict(d):
-                     return {f: self.tic_dat_factory._infinity_flag_write_cell(t, f, x) for f,x in d.items()}
+                     rtn = {}
+                     for f, x in d.items():
+                         if f not in writers:
+                             writers[f] = tdf._cell_writer(t, f)
+                         rtn[f] = x if writers[f] is None else writers[f](x)
+                     return rtn
                  _t =  getattr(tic_dat, t)
                  if dictish(_t) :
                      for p_key, data_row in _t.items() :
@@ -29,7 +29,7 @@ def make_json_dict(tdf, tic_dat, verbose=False, use_infinity_io_flag_if_provided
         return x if not use_infinity_io_flag_if_provided else tdf._infinity_flag_write_cell(t, f, x)
     jdict = defaultdict(list)
     for t in tdf.all_tables:
-        all_fields = tdf.primary_key_fields.get(t,()) + tdf.data_fields.get(t,())
+        all_fields = tdf.compile().all_fields.get(t, ())
         def make_row(row):
             assert containerish(row) and len(row) == len(all_fields)
             row = [write_cell(t, f, x) for f, x in zip(all_fields, row)]
@@ -160,13 +160,20 @@ class JsonTicFactory(freezable_factory(object, "_isFrozen")) :
                 rtn[t] = jdict[table_keys[t][0]]
         orig_rtn, rtn = rtn, {}
         for t, rows in orig_rtn.items():
-            all_fields = tdf.primary_key_fields.get(t, ()) + tdf.data_fields.get(t, ())
+            all_fields = tdf.compile().all_fields.get(t, ())
             rtn[t] = []
+            # the cell readers are resolved once per field, and not once per cell
+            readers = {}
+            def read_cell(f, x):
+                if f not in readers:
+                    readers[f] = tdf._cell_reader(t, f)
+                return x if readers[f] is None else readers[f](x)
+            all_readers = [tdf._cell_reader(t, f) for f in all_fields]
             for row in rows:
                 if dictish(row):
-                    rtn[t].append({f: tdf._general_read_cell(t, f, x) for f, x in row.items()})
+                    rtn[t].append({f: read_cell(f, x) for f, x in row.items()})
                 else:
-                    rtn[t].append([tdf._general_read_cell(t, f, x) for f, x in zip(all_fields, row)])
+                    rtn[t].append([x if r is None else r(x) for r, x in zip(all_readers, row)])
         return rtn
     def write_file(self, tic_dat, json_file_path, allow_overwrite = False, verbose = False, to_pandas = False):
         """
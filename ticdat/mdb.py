@@ -164,7 +164,7 @@ class MdbTicFactory(freezable_factory(object, "_isFrozen")) :
               with con.cursor() as cur:
                 cur.execute("Select * from [%s]"%mdb_table)
                 fields = set(_[0].lower() for _ in cur.description)
-                for field in tdf.primary_key_fields.get(table, ()) + tdf.data_fields.get(table, ()):
+                for field in tdf.compile().all_fields.get(table, ()):
                     verify(field.lower() in fields,
                         "Unable to recognize field %s in table %s for file %s"%
                         (field, table, mdb_file_path))
@@ -178,8 +178,9 @@ class MdbTicFactory(freezable_factory(object, "_isFrozen")) :
               with con.cursor() as cur :
                 cur.execute("Select %s from [%s]"%(", ".join(_brackets(tdf.data_fields[table])),
                                                    table_name))
+                readers = [tdf._cell_reader(table, f) for f in tdf.data_fields[table]]
                 for row in cur.fetchall():
-                  yield [tdf._general_read_cell(table, f, x) for f, x in zip(tdf.data_fields[table], row)]
+                  yield [x if r is None else r(x) for r, x in zip(readers, row)]
         return tableObj
     def _create_tic_dat(self, mdbFilePath):
         tdf = self.tic_dat_factory
@@ -191,13 +192,14 @@ class MdbTicFactory(freezable_factory(object, "_isFrozen")) :
         rtn = {}
         with _connect(_connection_str(mdbFilePath)) as con:
             for table in set(tdf.all_tables).difference(tdf.generator_tables).difference(missing_tables):
-                fields = tdf.primary_key_fields.get(table, ()) + tdf.data_fields.get(table, ())
+                fields = tdf.compile().all_fields.get(table, ())
                 rtn[table]= {} if tdf.primary_key_fields.get(table, ())  else []
+                readers = [tdf._cell_reader(table, f) for f in fields]
                 with con.cursor() as cur :
                     cur.execute("Select %s from [%s]"%(", ".join(_brackets(fields)),
                                  table_names[table]))
                     for row_ in cur.fetchall():
-                        row = [tdf._general_read_cell(table, f, x) for f, x in zip(fields, row_)]
+                        row = [x if r is None else r(x) for r, x in zip(readers, row_)]
                         pk = row[:len(tdf.primary_key_fields.get(table, ()))]
                         data = row[len(tdf.primary_key_fields.get(table, ())):]
                         if dictish(rtn[table]) :
@@ -14,6 +14,8 @@ try:
 except:
     isnull = numpy = None
 import collections as clt
+import math
+import weakref
 from ticdat.pgtd import PostgresPanFactory
 try:
     import amplpy
@@ -22,6 +24,12 @@ except:
 
 pd, DataFrame = utils.pd, utils.DataFrame # if pandas not installed will be falsey
 
+# the namedtuples returned by the find_ functions are defined here, so that they can be pickled back from the
+# worker processes (see the n_jobs arguments)
+TableField = clt.namedtuple("TableField", ["table", "field"])
+TablePredicateName = clt.namedtuple("TablePredicateName", ["table", "predicate_name"])
+PrimaryKeyErrorMessage = clt.namedtuple("PrimaryKeyErrorMessage", ["primary_key", "error_message"])
+
 def _faster_df_apply(df, func, trip_wire_check=None):
     cols = list(df.columns)
     data, index = [], []
@@ -37,6 +45,59 @@ def _faster_df_apply(df, func, trip_wire_check=None):
     # will default to float for empty Series, like original pandas
     return pd.Series(data, index=index, **({"dtype": numpy.float64} if not data else {}))
 
+def _first_failures(where_bad_rows, allowed):
+    # (where_bad_rows with only the first allowed failures still marked, the number of failures still marked)
+    bad_posns = numpy.flatnonzero(where_bad_rows.to_numpy())
+    too_many = bad_posns[int(math.ceil(allowed)):]
+    if len(too_many):
+        where_bad_rows = where_bad_rows.copy()
+        where_bad_rows.iloc[too_many] = False
+    return where_bad_rows, len(bad_posns) - len(too_many)
+
+def _numbers_where(series, condition):
+    # a boolean array marking the non-null utils.numericish entries of series for which condition holds.
+    # condition is applied to an array holding all these entries at once
+    rtn = numpy.zeros(len(series), dtype=bool)
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return rtn
+    is_number = series.notnull().to_numpy()
+    if not pd.api.types.is_numeric_dtype(series.dtype):
+        is_number[is_number] = list(map(utils.numericish, series.to_numpy()[is_number]))
+    rtn[is_number] = condition(series.to_numpy()[is_number])
+    return rtn
+
+def _datetime_adjusted(series):
+    # series with utils.dateutil_adjuster applied to each entry. Each distinct entry is only parsed once.
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series # dateutil_adjuster wouldn't change any of the entries
+    cache = {}
+    def adjusted(x):
+        try:
+            return cache[type(x), x]
+        except KeyError:
+            rtn = utils.dateutil_adjuster(x)
+            cache[type(x), x] = rtn = x if rtn is None else rtn
+            return rtn
+        except TypeError: # unhashable
+            rtn = utils.dateutil_adjuster(x)
+            return x if rtn is None else rtn
+    return pd.Series([adjusted(x) for x in series], index=series.index,
+                     **({"dtype": numpy.float64} if not len(series) else {}))
+
+def _same_rows(df1, df2, columns, nans_are_same):
+    # are the rows of df1 and df2 exactly the same, up to row order? The rows are aligned by sorting their hashes,
+    # and then compared with a single vectorized equality test. False means the row by row comparison is needed.
+    if not nans_are_same and (df1[columns].isnull().to_numpy().any() or df2[columns].isnull().to_numpy().any()):
+        return False # Null cells are never the same, unless nans_are_same
+    try:
+        aligned = [df[columns].to_numpy(dtype=object)[
+                       numpy.argsort(pd.util.hash_pandas_object(df[columns], index=False).to_numpy(), kind="stable")]
+                   for df in (df1, df2)]
+    except TypeError: # unhashable cells
+        return False
+    same = (aligned[0] == aligned[1]) | (isnull(aligned[0]) & isnull(aligned[1]))
+    return bool(numpy.all(same))
+
 class PanDatFactory(object):
     """
      Defines a schema for a collection of pandas.DataFrame objects.
@@ -161,7 +222,8 @@ class PanDatFactory(object):
                 for pn, rpi in row_predicates.items():
                     rtn.add_data_row_predicate(tbl, predicate=rpi.predicate, predicate_name=pn,
                                                predicate_kwargs_maker=rpi.predicate_kwargs_maker,
-                                               predicate_failure_response=rpi.predicate_failure_response)
+                                               predicate_failure_response=rpi.predicate_failure_response,
+                                               predicate_vectorized=rpi.predicate_vectorized)
         return rtn
     @property
     def default_values(self):
@@ -248,32 +310,28 @@ class PanDatFactory(object):
         :param json_read: special 'None'->None override needed for pandas json reader
         '''
         assert push_parameters_to_be_valid or not json_read, "json_read should always push_parameters_to_be_valid"
-        apply = _faster_df_apply
+        # the adjustments are made a column at a time, rather than a row at a time
         for t in set(self.all_tables).difference(["parameters"]): # parameters table is handled differently
             df = getattr(dat, t)
             for f in self.primary_key_fields.get(t, ()) + self.data_fields.get(t, ()):
                 if utils.numericish(self.infinity_io_flag):
-                    fixme = apply(df, lambda row: utils.numericish(row[f]) and row[f] >= self.infinity_io_flag)
+                    fixme = _numbers_where(df[f], lambda x: x >= self.infinity_io_flag)
                     df.loc[fixme, f] = float("inf")
-                    fixme = apply(df, lambda row: utils.numericish(row[f]) and row[f] <= -self.infinity_io_flag)
+                    fixme = _numbers_where(df[f], lambda x: x <= -self.infinity_io_flag)
                     df.loc[fixme, f] = -float("inf")
                 elif utils.numericish(self._none_as_infinity_bias(t, f)):
                     assert self.infinity_io_flag is None
                     df[f].fillna(value=self._none_as_infinity_bias(t, f) * float("inf"), inplace=True)
                 dt = self.data_types.get(t, {}).get(f, None)
                 if dt and dt.datetime:
-                    def fixed_row(row):
-                        new_row_f = utils.dateutil_adjuster(row[f])
-                        return new_row_f if new_row_f is not None else row[f]
-                    df[f] = apply(df, fixed_row)
+                    df[f] = _datetime_adjusted(df[f])
                 if json_read and self._dtypes_for_pandas_read(t).get(f) == str:
                     assert dt, "assumed because _dtypes_for_pandas_read result"
-                    if dt.nullable:
-                        def fixed_row(row):
-                            if utils.stringish(row[f]) and row[f].lower() == "none":
-                                return None
-                            return row[f]
-                        df[f] = apply(df, fixed_row)
+                    if dt.nullable and (df[f].dtype == object or pd.api.types.is_string_dtype(df[f].dtype)):
+                        fixme = (df[f].str.lower() == "none").fillna(False).to_numpy(dtype=bool)
+                        if fixme.any():
+                            df[f] = df[f].astype(object)
+                            df.loc[fixme, f] = None
 
         # this is the logic that is used in lieu of infinity_io_flag logic for the parameters table
         # it is predicated on the assumption that the parameters table will be serialized to a string/string table
@@ -324,18 +382,17 @@ class PanDatFactory(object):
                                                    lambda row: None if isnull(row[fld]) else str(row[fld]))
         if self.infinity_io_flag == "N/A":
             return rtn
-        apply = _faster_df_apply
         for t in set(self.all_tables).difference(["parameters"]): # parameters table is handled differently
             df = getattr(rtn, t)
             for f in self.primary_key_fields.get(t, ()) + self.data_fields.get(t, ()):
                 if utils.numericish(self.infinity_io_flag):
-                    fixme = apply(df, lambda row: utils.numericish(row[f]) and row[f] >= self.infinity_io_flag)
+                    fixme = _numbers_where(df[f], lambda x: x >= self.infinity_io_flag)
                     df.loc[fixme, f] = self.infinity_io_flag
-                    fixme = apply(df, lambda row: utils.numericish(row[f]) and row[f] <= -self.infinity_io_flag)
+                    fixme = _numbers_where(df[f], lambda x: x <= -self.infinity_io_flag)
                     df.loc[fixme, f] = -self.infinity_io_flag
                 elif utils.numericish(self._none_as_infinity_bias(t, f)):
                     assert self.infinity_io_flag is None
-                    fixme = apply(df, lambda row: row[f] == float("inf") * self._none_as_infinity_bias(t, f))
+                    fixme = _numbers_where(df[f], lambda x: x == float("inf") * self._none_as_infinity_bias(t, f))
                     df.loc[fixme, f] = None
         return rtn
     def set_data_type(self, table, field, number_allowed = True,
@@ -409,7 +466,7 @@ class PanDatFactory(object):
 
     def add_data_row_predicate(self, table, predicate, predicate_name=None,
                                predicate_kwargs_maker=None,
-                               predicate_failure_response="Boolean"):
+                               predicate_failure_response="Boolean", predicate_vectorized=False):
         """
         The purpose of calling add_data_row_predicate is to prepare for a future call to find_data_row_failures.
         See https://bit.ly/3e9pdCP for more details on these two functions.
@@ -450,6 +507,14 @@ class PanDatFactory(object):
                                            a clean row by returning True (the one and only literal True in Python)
                                            and a dirty row by returning a non-empty string (which is an error message).
 
+        :param predicate_vectorized: boolean. If truthy, then predicate checks the entire table at once, instead of
+                                     being called once per row. In this case predicate is either a DataFrame.eval
+                                     expression string (e.g. "min_supply <= max_supply", with any predicate_kwargs
+                                     available as @ variables) or a function that accepts the table DataFrame
+                                     (along with any predicate_kwargs) and returns a Series with an entry for each row.
+                                     These entries follow predicate_failure_response, exactly as the row-by-row
+                                     return values would. An expression string implies predicate_vectorized.
+
         See find_data_row_failures for details on handling exceptions thrown by predicate or predicate_kwargs_maker.
         :return:
         """
@@ -462,7 +527,9 @@ class PanDatFactory(object):
                 self._data_row_predicates[table].pop(predicate_name, None)
             return
 
-        verify(callable(predicate), "predicate should be a one argument function")
+        predicate_vectorized = bool(predicate_vectorized or stringish(predicate))
+        verify(callable(predicate) or stringish(predicate),
+               "predicate should be a one argument function or a DataFrame.eval expression string")
         verify(not predicate_kwargs_maker or callable(predicate_kwargs_maker),
                "predicate_kwargs_maker should be a one argument function")
         verify(predicate_failure_response in ["Boolean", "Error Message"],
@@ -470,7 +537,8 @@ class PanDatFactory(object):
         if predicate_name is None:
             predicate_name = next(i for i in count() if i not in self._data_row_predicates[table])
         self._data_row_predicates[table][predicate_name] = RowPredicateInfo(predicate, predicate_kwargs_maker,
-                                                                            predicate_failure_response)
+                                                                            predicate_failure_response,
+                                                                            predicate_vectorized)
 
     def add_parameter(self, name, default_value, number_allowed = True,
                       inclusive_min = True, inclusive_max = False, min = 0, max = float("inf"),
@@ -712,6 +780,7 @@ class PanDatFactory(object):
         self._parameters = {}
         self._infinity_io_flag = ["N/A"]
         self._none_as_infinity_bias_cache = {}
+        self._good_objects = weakref.WeakKeyDictionary() # see good_pan_dat_object
 
 
         self.all_tables = frozenset(init_fields)
@@ -767,6 +836,20 @@ class PanDatFactory(object):
         :return: True if the dataObj can be recognized as a PanDat data object. False otherwise.
         """
         verify(DataFrame and pd, "Need to install pandas")
+        # a passing result is memoized for as long as data_obj has the same DataFrames, with the same column indexes
+        # (pandas replaces the column index of a DataFrame whenever columns are added, dropped or renamed)
+        snapshot = None
+        if all(isinstance(getattr(data_obj, t, None), DataFrame) for t in self.all_tables):
+            snapshot = utils.make_snapshot([x for t in sorted(self.all_tables) for df in [getattr(data_obj, t)]
+                                            for x in (df, df.columns)], ())
+        memo = safe_apply(lambda: self._good_objects.setdefault(data_obj, {}))() if snapshot else None
+        if memo and utils.same_snapshot(memo.get("snapshot"), snapshot):
+            return True
+        rtn = self._good_pan_dat_object(data_obj, bad_message_handler)
+        if rtn and memo is not None:
+            memo["snapshot"] = snapshot
+        return rtn
+    def _good_pan_dat_object(self, data_obj, bad_message_handler):
         for t in self.all_tables:
             if not hasattr(data_obj, t) :
                 bad_message_handler(t + " not an attribute.")
@@ -781,18 +864,32 @@ class PanDatFactory(object):
             bad_message_handler("The following are (table, field) pairs missing from the data.\n%s"%missing_fields)
             return False
         return True
-    def copy_pan_dat(self, pan_dat):
+    def copy_pan_dat(self, pan_dat, copy_on_write=False):
         """
         copies the tic_dat object into a new tic_dat object
         performs a deep copy
 
         :param pan_dat: a pandat object
 
+        :param copy_on_write: boolean. If truthy, the tables of the returned object are shallow copies of the
+                              tables of pan_dat, and pandas defers copying the data of a table until either
+                              copy of that table is edited. This makes it cheap to create many slightly
+                              different copies of a large data set. Requires pandas 2.0 or later, with the
+                              pandas mode.copy_on_write option turned on.
+
         :return: a deep copy of the pan_dat argument
         """
         msg  = []
         verify(self.good_pan_dat_object(pan_dat, msg.append),
                "pan_dat not a good object for this factory : %s"%"\n".join(msg))
+        if copy_on_write:
+            # the copy on write mode of pandas 1.x doesn't protect against every sort of in place edit
+            verify(int(utils.pd.__version__.split(".")[0]) >= 2 and utils.pd.get_option("mode.copy_on_write"),
+                   "copy_on_write requires pandas 2.0 or later, with the mode.copy_on_write option turned on")
+            rtn = self.PanDat()
+            for t in self.all_tables:
+                setattr(rtn, t, getattr(pan_dat, t).copy(deep=False))
+            return rtn
         return self.PanDat(**{t:getattr(pan_dat, t) for t in self.all_tables})
     def copy_to_tic_dat(self, pan_dat, freeze_it=False):
         """
@@ -822,10 +919,11 @@ class PanDatFactory(object):
         # in the primary key entries.
         tdf = TicDatFactory(**self.schema())
         return tdf.freeze_me(rtn) if freeze_it else rtn
-    def _copy_to_tic_dat(self, pan_dat, keep_generics_as_df=True):
-        sch = self.schema()
+    def _copy_to_tic_dat(self, pan_dat, keep_generics_as_df=True, table_restrictions=None):
+        tables = self.all_tables if table_restrictions is None else table_restrictions
+        sch = {t: v for t, v in self.schema().items() if t in tables}
         if not keep_generics_as_df:
-            for t in self.generic_tables:
+            for t in self.generic_tables.intersection(tables):
                 sch[t] = [[], list(getattr(pan_dat, t).columns)]
         from ticdat import TicDatFactory
         tdf = TicDatFactory(**sch)
@@ -836,7 +934,7 @@ class PanDatFactory(object):
             if t in self.generic_tables and not keep_generics_as_df:
                 return list(map(list, rtn.itertuples(index=False)))
             return rtn
-        return tdf.TicDat(**{t: df(t) for t in self.all_tables})
+        return tdf.TicDat(**{t: df(t) for t in tables})
     def _same_data(self, obj1, obj2, epsilon = 0, nans_are_same_for_data_rows = False):
         from ticdat import TicDatFactory
         sch = self.schema()
@@ -846,10 +944,16 @@ class PanDatFactory(object):
             if set(getattr(obj1, t).columns) != set(getattr(obj2, t).columns):
                 return False
             sch[t] = [[], list(getattr(obj1, t).columns)]
-        tdf = TicDatFactory(**sch)
-        return tdf._same_data(self._copy_to_tic_dat(obj1, keep_generics_as_df=False),
-                              self._copy_to_tic_dat(obj2, keep_generics_as_df=False), epsilon=epsilon,
-                              nans_are_same_for_data_rows=nans_are_same_for_data_rows)
+        # the tables whose rows are exactly the same (in any order) are confirmed in a vectorized fashion. The
+        # remaining tables are compared row by row, which also handles epsilon and type coercions like 1 == 1.0
+        to_compare = [t for t in self.all_tables if not _same_rows(getattr(obj1, t), getattr(obj2, t),
+                                                                   sch[t][0] + sch[t][1], nans_are_same_for_data_rows)]
+        if not to_compare:
+            return True
+        tdf = TicDatFactory(**{t: sch[t] for t in to_compare})
+        return tdf._same_data(self._copy_to_tic_dat(obj1, keep_generics_as_df=False, table_restrictions=to_compare),
+                              self._copy_to_tic_dat(obj2, keep_generics_as_df=False, table_restrictions=to_compare),
+                              epsilon=epsilon, nans_are_same_for_data_rows=nans_are_same_for_data_rows)
     def _true_data_types(self):
         '''
         See issue https://github.com/ticdat/ticdat/issues/46  and the doc string for find_data_type_failures
@@ -864,7 +968,7 @@ class PanDatFactory(object):
                       inclusive_min=True, inclusive_max=True, min=-float("inf"), max=float("inf"),
                       must_be_int=False, strings_allowed='*', nullable=False, datetime=False)
         return tmp_pdf.data_types
-    def find_data_type_failures(self, pan_dat, as_table=True, max_failures=float("inf")):
+    def find_data_type_failures(self, pan_dat, as_table=True, max_failures=float("inf"), n_jobs=1):
         """
         Finds the data type failures for a pandat object
 
@@ -877,6 +981,11 @@ class PanDatFactory(object):
         :param max_failures: number. An upper limit on the number of failures to find. Will short circuit and return
                                      ASAP with a partial failure enumeration when this number is reached.
 
+        :param n_jobs: integer. The number of worker processes to shard the checks across (-1 means one per CPU).
+                       The workers are forked, and thus inherit pan_dat without it being pickled. Ignored if
+                       max_failures is finite (since short circuiting is inherently sequential) or if processes can't
+                       be forked on this platform.
+
         :return: A dictionary constructed as follow:
                  The keys are namedtuples with members "table", "field". Each (table,field) pair
                  has data values that are inconsistent with its data type. (table, field) pairs
@@ -893,24 +1002,31 @@ class PanDatFactory(object):
         verify(self.good_pan_dat_object(pan_dat, msg.append),
                "pan_dat not a good object for this factory : %s"%"\n".join(msg))
         assert max_failures > 0, "max_failures should be a positive number"
-
+        if n_jobs != 1 and max_failures == float("inf"):
+            return self._sharded_find(lambda t: self._find_data_type_failures(
+                pan_dat, as_table, max_failures, [0], tables=[t]), list(self._true_data_types()), n_jobs)
+        return self._find_data_type_failures(pan_dat, as_table, max_failures, [0])
+    def _sharded_find(self, find, shards, n_jobs):
+        # merges the dictionaries returned by calling find for each shard, with the calls spread across n_jobs
+        # forked worker processes
+        rtn = {}
+        for _ in utils.fork_map(find, shards, n_jobs):
+            rtn.update(_)
+        return rtn
+    def _find_data_type_failures(self, pan_dat, as_table, max_failures, number_failures, tables=None):
+        # number_failures is a one element list counting the failures found so far, by this and any earlier checks
+        # tables, if provided, restricts the tables that are checked
         rtn = {}
-        TableField = clt.namedtuple("TableField", ["table", "field"])
-        number_failures = [0]
-        check_too_many = None
-        if max_failures < float("inf"):
-            def check_too_many(is_bad_row):
-                if is_bad_row:
-                    number_failures[0] += 1
-                    if number_failures[0] >= max_failures:
-                        return lambda row: False  # all future rows will be good (i.e. not bad, i.e. False)
         for table, type_row in self._true_data_types().items():
+            if tables is not None and table not in tables:
+                continue
             _table = getattr(pan_dat, table)
             for field, data_type in type_row.items():
-                def bad_row(row):
-                    data = row[field]
-                    return not data_type.valid_data(None if isnull(data) else data)
-                where_bad_rows = _faster_df_apply(_table, bad_row, trip_wire_check=check_too_many)
+                where_bad_rows = ~data_type.valid_data_series(_table[field])
+                if max_failures < float("inf"):
+                    # only the first failures up to max_failures are reported
+                    where_bad_rows, _ = _first_failures(where_bad_rows, max_failures - number_failures[0])
+                    number_failures[0] += _
                 if where_bad_rows.any():
                     rtn[TableField(table, field)] = _table[where_bad_rows].copy() if as_table else where_bad_rows
                 if number_failures[0] >= max_failures:
@@ -969,7 +1085,7 @@ class PanDatFactory(object):
         assert not set(self.find_data_type_failures(pan_dat)).intersection(real_replacements)
         return pan_dat
     def find_data_row_failures(self, pan_dat, as_table=True, exception_handling="__debug__",
-                               max_failures=float("inf")):
+                               max_failures=float("inf"), n_jobs=1):
         """
         Finds the data row failures for a ticdat object
 
@@ -982,7 +1098,8 @@ class PanDatFactory(object):
         :param exception_handling: One of "Handled as Failure",  "Unhandled" or "__debug__"
               "Handled as Failure": Any exception generated by calling a row predicate function will indicate a data
                                     failure for that row. (Similarly, predicate_kwargs_maker exceptions create an entry
-                                    in the returned failure dictionary).
+                                    in the returned failure dictionary). An exception generated by a vectorized
+                                    predicate indicates a data failure for every row of the table.
               "Unhandled": Exceptions resulting from calling a row predicate (or a predicate_kwargs_maker) will not be
                            handled by data_row_failures.
               "__debug__": Since "Handled as Failure" makes more sense for production runs and "Unhandled" makes more
@@ -992,6 +1109,12 @@ class PanDatFactory(object):
         :param max_failures: number. An upper limit on the number of failures to find. Will short circuit and return
                                      ASAP with a partial failure enumeration when this number is reached.
 
+        :param n_jobs: integer. The number of worker processes to shard the row predicates across (-1 means one per
+                       CPU). The workers are forked, and thus inherit pan_dat without it being pickled. The
+                       predicate_kwargs_makers are called before the checks are sharded. Ignored if max_failures is
+                       finite (since short circuiting is inherently sequential) or if processes can't be forked on
+                       this platform.
+
         :return: A dictionary constructed as follows:
 
         The keys are namedtuples with members "table", "predicate_name".
@@ -1009,28 +1132,34 @@ class PanDatFactory(object):
         and the latter will be a string describing the failure.
         """
         assert max_failures > 0, "max_failures should be a positive number"
-        number_failures = [0]
-        check_too_many_bool = check_too_many_msg = None
-        if max_failures < float("inf"):
-            def check_too_many_bool(is_bad_row):  # here _faster_df_apply is applying a function that
-                if is_bad_row:  # returns True when the row is bad and False o/wise (the boolean reverse of the
-                    number_failures[0] += 1 # of the row predicate)
-                    if number_failures[0] >= max_failures:  # all future rows will be good
-                        return lambda row: False  # which in this context is not bad (i.e. False)
-
-            def check_too_many_msg(true_or_msg):  # here _faster_df_apply is applying a function that
-                if true_or_msg is not True:  # returns True when the row is good and a string o/wise
-                    number_failures[0] += 1  # (i.e. _faster_df_applyu is using the actual row predicate)
-                    if number_failures[0] >= max_failures:  # all future rows will be good
-                        return lambda row: True  # which in this context is True
-
         msg = []
         verify(self.good_pan_dat_object(pan_dat, msg.append),
                "pan_dat not a good object for this factory : %s"%"\n".join(msg))
         verify(exception_handling in ["Handled as Failure", "Unhandled", "__debug__"],
                "bad exception_handling argument")
+        if n_jobs != 1 and max_failures == float("inf"):
+            predicate_kwargs_maker_results = self._predicate_kwargs_maker_results(pan_dat, exception_handling)
+            return self._sharded_find(lambda tbl_pn: self._find_data_row_failures(
+                pan_dat, as_table, exception_handling, max_failures, [0], predicates=[tbl_pn],
+                predicate_kwargs_maker_results=predicate_kwargs_maker_results),
+                [(t, pn) for t, row_predicates in self._all_data_row_predicates().items() for pn in row_predicates],
+                n_jobs)
+        return self._find_data_row_failures(pan_dat, as_table, exception_handling, max_failures, [0])
+    def _true_exception_handling(self, exception_handling):
         if exception_handling == "__debug__":
-            exception_handling = "Unhandled" if __debug__ else "Handled as Failure"
+            return "Unhandled" if __debug__ else "Handled as Failure"
+        return exception_handling
+    def _predicate_kwargs_maker_results(self, pan_dat, exception_handling):
+        # calls each predicate_kwargs_maker once, ahead of the row predicates being sharded across worker processes
+        exception_handling = self._true_exception_handling(exception_handling)
+        rtn = {}
+        for row_predicates in self._all_data_row_predicates().values():
+            for rpi in row_predicates.values():
+                if rpi.predicate_kwargs_maker:
+                    utils.predicate_kwargs_maker_result(rpi, pan_dat, exception_handling, rtn)
+        return rtn
+    def _all_data_row_predicates(self):
+        # the data row predicates, including the implicit predicate that checks the parameters table
         data_row_predicates = {k: dict(v) for k,v in self._data_row_predicates.items()}
         if self._parameters:
             def good_parameter(row):
@@ -1045,33 +1174,76 @@ class PanDatFactory(object):
                                   self._data_row_predicates.get("parameters", {}))
             data_row_predicates["parameters"] = data_row_predicates.get("parameters", {})
             data_row_predicates["parameters"][predicate_name] = RowPredicateInfo(good_parameter, None, "Boolean")
+        return data_row_predicates
+    def _find_data_row_failures(self, pan_dat, as_table, exception_handling, max_failures, number_failures,
+                                predicates=None, predicate_kwargs_maker_results=None):
+        # number_failures is a one element list counting the failures found so far, by this and any earlier checks
+        # predicates, if provided, restricts the (table, predicate name) pairs that are checked
+        check_too_many_bool = check_too_many_msg = None
+        if max_failures < float("inf"):
+            def check_too_many_bool(is_bad_row):  # here _faster_df_apply is applying a function that
+                if is_bad_row:  # returns True when the row is bad and False o/wise (the boolean reverse of the
+                    number_failures[0] += 1 # of the row predicate)
+                    if number_failures[0] >= max_failures:  # all future rows will be good
+                        return lambda row: False  # which in this context is not bad (i.e. False)
+
+            def check_too_many_msg(true_or_msg):  # here _faster_df_apply is applying a function that
+                if true_or_msg is not True:  # returns True when the row is good and a string o/wise
+                    number_failures[0] += 1  # (i.e. _faster_df_applyu is using the actual row predicate)
+                    if number_failures[0] >= max_failures:  # all future rows will be good
+                        return lambda row: True  # which in this context is True
 
+        exception_handling = self._true_exception_handling(exception_handling)
+        data_row_predicates = self._all_data_row_predicates()
+        def _error_column(df):
+            rtn = "Error Message"
+            _ = count(1)
+            while rtn in df.columns:
+                rtn = f"Error Message ({next(_)})"
+            return rtn
         rtn = {}
-        predicate_kwargs_maker_results = {}
-        TPN = clt.namedtuple("TablePredicateName", ["table", "predicate_name"])
-        PKEM = clt.namedtuple("PrimaryKeyErrorMessage", ["primary_key", "error_message"])
+        predicate_kwargs_maker_results = {} if predicate_kwargs_maker_results is None \
+                                         else predicate_kwargs_maker_results
+        TPN, PKEM = TablePredicateName, PrimaryKeyErrorMessage
         for tbl, row_predicates in data_row_predicates.items():
             _table = getattr(pan_dat, tbl)
             for pn, rpi in row_predicates.items():
+                if predicates is not None and (tbl, pn) not in predicates:
+                    continue
                 predicate_kwargs = {}
                 if rpi.predicate_kwargs_maker:
-                    if rpi.predicate_kwargs_maker not in predicate_kwargs_maker_results:
-                        if exception_handling == "Handled as Failure":
-                            try:
-                                _predicate_kwargs = rpi.predicate_kwargs_maker(pan_dat)
-                            except Exception as e:
-                                _predicate_kwargs = f"Exception<{e}>"
-                        else:
-                            _predicate_kwargs = rpi.predicate_kwargs_maker(pan_dat)
-                        predicate_kwargs_maker_results[rpi.predicate_kwargs_maker] = _predicate_kwargs
-                    predicate_kwargs = predicate_kwargs_maker_results[rpi.predicate_kwargs_maker]
+                    predicate_kwargs = utils.predicate_kwargs_maker_result(rpi, pan_dat, exception_handling,
+                                                                           predicate_kwargs_maker_results)
                 if not isinstance(predicate_kwargs, dict):
                     rtn[TPN(tbl, pn)] = PKEM('*', predicate_kwargs
                                         if (isinstance(predicate_kwargs, str) and "Exception<" in predicate_kwargs)
                                         else f"predicate_kwargs_maker failed to return a dict")
                     number_failures[0] += 1
                 else:
-                    if rpi.predicate_failure_response == "Boolean":
+                    if rpi.predicate_vectorized:
+                        if exception_handling == "Unhandled":
+                            predicate_result = utils.vectorized_predicate_result(_table, rpi.predicate,
+                                                                                 predicate_kwargs)
+                        else:
+                            try:
+                                predicate_result = utils.vectorized_predicate_result(_table, rpi.predicate,
+                                                                                     predicate_kwargs)
+                            except Exception as e:
+                                predicate_result = pd.Series([False if rpi.predicate_failure_response == "Boolean"
+                                                              else f"Exception<{e}>"] * len(_table),
+                                                             index=_table.index, dtype=object)
+                        where_bad_rows = utils.vectorized_predicate_failures(predicate_result,
+                                                                             rpi.predicate_failure_response)
+                        if max_failures < float("inf"):
+                            where_bad_rows, _ = _first_failures(where_bad_rows, max_failures - number_failures[0])
+                            number_failures[0] += _
+                        if where_bad_rows.any():
+                            if as_table and rpi.predicate_failure_response == "Error Message":
+                                rtn[TPN(tbl, pn)] = _df = _table[where_bad_rows].copy()
+                                _df[_error_column(_df)] = predicate_result[where_bad_rows].copy()
+                            else:
+                                rtn[TPN(tbl, pn)] = _table[where_bad_rows].copy() if as_table else where_bad_rows
+                    elif rpi.predicate_failure_response == "Boolean":
                         def _p(row):
                             try:
                                 return rpi.predicate(row, **predicate_kwargs)
@@ -1096,17 +1268,14 @@ class PanDatFactory(object):
                         if where_bad_rows.any():
                             if as_table:
                                 rtn[TPN(tbl, pn)] = _df = _table[where_bad_rows].copy()
-                                err_column = "Error Message"
-                                _ = count(1)
-                                while err_column in _df.columns:
-                                    err_column = f"Error Message ({next(_)})"
-                                _df[err_column] = predicate_result[where_bad_rows].copy()
+                                _df[_error_column(_df)] = predicate_result[where_bad_rows].copy()
                             else:
                                 rtn[TPN(tbl, pn)] = where_bad_rows
                 if number_failures[0] >= max_failures:
                     return rtn
         return rtn
-    def find_foreign_key_failures(self, pan_dat, verbosity="High", as_table=True, max_failures=float("inf")):
+    def find_foreign_key_failures(self, pan_dat, verbosity="High", as_table=True, max_failures=float("inf"),
+                                  n_jobs=1):
         """
         Finds the foreign key failures for a pandat object
 
@@ -1115,13 +1284,17 @@ class PanDatFactory(object):
         :param verbosity: either "High" or "Low"
 
         :param as_table: as_table boolean : if truthy then the values of the return dictionary will be the
-               failed rows themselves. Otherwise will return the a boolean list that indicates which rows
-               have failures. (For technical reasons, not returning a boolean Series like the
-               other find functions)
+               failed rows themselves. Otherwise will return the boolean Series that indicates which rows
+               have failures.
 
         :param max_failures: number. An upper limit on the number of failures to find. Will short circuit and return
                                      ASAP with a partial failure enumeration when this number is reached.
 
+        :param n_jobs: integer. The number of worker processes to shard the checks across (-1 means one per CPU).
+                       The workers are forked, and thus inherit pan_dat without it being pickled. Ignored if
+                       max_failures is finite (since short circuiting is inherently sequential) or if processes can't
+                       be forked on this platform.
+
         :return: A dictionary constructed as follows:
 
          The keys are namedtuples with members "native_table", "foreign_table",
@@ -1132,70 +1305,71 @@ class PanDatFactory(object):
 
          The values are DataFrames that contain the subset of native table rows that fail to find
          the foreign table matching defined by the associated returned key (or the
-         list that identifies these rows).
+         boolean Series that identifies these rows).
 
          For verbosity = 'Low' a simpler return object is created that doesn't use namedtuples
          and omits the foreign key cardinality.
         """
-        # note - the as_table argument is messy here because I'm applying an index to a copy of the table
-        # as a result, we provide the remove_foreign_key_failures companion function
         assert max_failures > 0, "max_failures should be a positive number"
         verify(verbosity in ["High", "Low"], "verbosity needs to be either 'High' or 'Low'")
+        msg  = []
+        verify(self.good_pan_dat_object(pan_dat, msg.append),
+               "pan_dat not a good object for this factory : %s"%"\n".join(msg))
+        if n_jobs != 1 and max_failures == float("inf"):
+            return self._find_foreign_key_failures(pan_dat, verbosity, as_table, max_failures, [0],
+                                                   rows=self._sharded_foreign_key_failure_rows(pan_dat, n_jobs))
+        return self._find_foreign_key_failures(pan_dat, verbosity, as_table, max_failures, [0])
+    def _sharded_foreign_key_failure_rows(self, pan_dat, n_jobs):
+        # the foreign key namedtuples can't be pickled, so the workers only return the failure rows
+        fks = self.foreign_keys
+        found = utils.fork_map(lambda fk: self._find_foreign_key_failure_rows(pan_dat, float("inf"), [0],
+                                                                               fks=[fk]).get(fk), fks, n_jobs)
+        return {fk: v for fk, v in zip(fks, found) if v is not None}
+    def _find_foreign_key_failures(self, pan_dat, verbosity, as_table, max_failures, number_failures, rows=None):
+        # number_failures is a one element list counting the failures found so far, by this and any earlier checks
+        # rows, if provided, are the already found failure rows (see _sharded_foreign_key_failure_rows)
         rtn = {}
-        for fk, rows in self._find_foreign_key_failure_rows(pan_dat, max_failures=max_failures).items():
+        rows = self._find_foreign_key_failure_rows(pan_dat, max_failures, number_failures) if rows is None else rows
+        for fk, rows in rows.items():
             native, foreign, mappings, card = fk
             rtn[fk] = getattr(pan_dat, native)[rows] if as_table else rows
         if verbosity == "Low":
             rtn = {tuple(k[:2]) + (tuple(k[2]),): v for k,v in rtn.items()}
         return rtn
-    def _find_foreign_key_failure_rows(self, pan_dat, max_failures=float("inf")):
-        msg  = []
-        verify(self.good_pan_dat_object(pan_dat, msg.append),
-               "pan_dat not a good object for this factory : %s"%"\n".join(msg))
-        number_failures = [0]
-        check_too_many = None
-        if max_failures < float("inf"):
-            def check_too_many(is_bad_row):
-                if is_bad_row:
-                    number_failures[0] += 1
-                    if number_failures[0] >= max_failures:
-                        return lambda row: False  # all future rows will be good (i.e. not bad, i.e. False)
-
+    def _find_foreign_key_failure_rows(self, pan_dat, max_failures, number_failures, fks=None):
+        # fks, if provided, restricts the foreign keys that are checked
         rtn = {}
         for fk in self.foreign_keys:
-            native, foreign, mappings, card = fk
-            child = getattr(pan_dat, native).copy(deep=True)
-            # makes sense to deep copy the possibly smaller drop_duplicates slice of the parent table
-            parent = getattr(pan_dat, foreign)
-            _ = 0
-            while any("_%s_"%_ in c for c in set(parent.columns).union(child.columns)):
-                _ += 1
-            magic_field = "_%s_"%_
-            if all(hasattr(mappings, _) for _ in ["native_field", "foreign_field"]):
-                parent = parent.drop_duplicates(mappings.foreign_field, inplace=False).copy(deep=True)
-                parent[mappings.native_field] = parent[mappings.foreign_field]
-                new_index = mappings.native_field
-            else:
-                parent = parent.drop_duplicates([_.foreign_field for _ in mappings], inplace=False).copy(deep=True)
-                for _ in mappings:
-                    parent[_.native_field] = parent[_.foreign_field]
-                new_index = [_.native_field for _ in mappings]
-            # sadly a join might knacker the row order, hence the ugliness with magic_field*2 for child
-            parent[magic_field] = True
-            child.insert(0, magic_field*2, range(0, len(child)))
-            parent.set_index(new_index, drop=True, inplace=True)
-            child.set_index(new_index, drop=True, inplace=True)
-            joined = child.join(parent, rsuffix=magic_field)
-            bad_rows = set(joined[joined[magic_field] != True][magic_field*2])
-            if bad_rows:
-                # I'm casting to list here because child is a copy that doesn't have the original index
-                # This is fixable, (i.e. we could return a Series with an index matching the original child table)
-                # but the fix isn't high priority.
-                rtn[fk] = list(_faster_df_apply(child, lambda row: row[magic_field*2] in bad_rows,
-                                                trip_wire_check=check_too_many))
+            if fks is not None and fk not in fks:
+                continue
+            where_bad_rows = self._foreign_key_failure_rows(pan_dat, fk)
+            if max_failures < float("inf"):
+                where_bad_rows, _ = _first_failures(where_bad_rows, max_failures - number_failures[0])
+                number_failures[0] += _
+            if where_bad_rows.any():
+                rtn[fk] = where_bad_rows
                 if number_failures[0] >= max_failures:
                     return rtn
         return rtn
+    def _foreign_key_failure_rows(self, pan_dat, fk):
+        native, foreign, mappings, card = fk
+        child, parent = getattr(pan_dat, native), getattr(pan_dat, foreign)
+        # a hashed membership test of the child keys against the parent keys. Neither table is copied, and the
+        # result is aligned with the index of the child table
+        if all(hasattr(mappings, _) for _ in ["native_field", "foreign_field"]):
+            return ~child[mappings.native_field].isin(parent[mappings.foreign_field])
+        # the child and parent key columns are given the same dtype, field by field, rather than leaving each to
+        # dtype inference. Numbers are compared as floats, so that 1 still matches 1.0
+        child_arrays, parent_arrays = [], []
+        for m in mappings:
+            c, p = child[m.native_field], parent[m.foreign_field]
+            dtype = float if all(pd.api.types.is_numeric_dtype(_) and not pd.api.types.is_bool_dtype(_)
+                                 for _ in (c.dtype, p.dtype)) else object
+            child_arrays.append(pd.Index(c.astype(dtype), dtype=dtype))
+            parent_arrays.append(pd.Index(p.astype(dtype), dtype=dtype))
+        child_keys = pd.MultiIndex.from_arrays(child_arrays)
+        parent_keys = pd.MultiIndex.from_arrays(parent_arrays)
+        return pd.Series(~child_keys.isin(parent_keys), index=child.index)
     def create_full_parameters_dict(self, dat):
         """
         create a fully populated dictionary of all the parameters
@@ -1216,28 +1390,44 @@ class PanDatFactory(object):
         df = dat.parameters[list(self.primary_key_fields["parameters"]) + list(self.data_fields["parameters"])]
         return dict(defaults, **{k: v for k,v in df.itertuples(index=False)})
 
-    def remove_foreign_key_failures(self, pan_dat):
+    def remove_foreign_key_failures(self, pan_dat, return_removal_counts=False):
         """
 
         Removes foreign key failures (i.e. child records with no parent table record)
 
         :param pan_dat: pandat object (will be side-effected)
 
+        :param return_removal_counts: boolean. If truthy, also return the number of rows removed from each table.
+
         :return: pan_dat, with the foreign key failures removed
                  Note that all foreign key removals are cascading. When a child removal results in
                  new foreign key failures, those failures are removed as well.
+                 If return_removal_counts is truthy, then returns a (pan_dat, dictionary) pair, where the
+                 dictionary maps table name to the number of rows removed from that table (for those tables
+                 that lost rows).
         """
-        remove_rows = self._find_foreign_key_failure_rows(pan_dat)
-        while remove_rows:
-            # just performing one bulk removal per iteration, since fks can intermingle in complicated ways
-            fk = next(iter(remove_rows))
-            native, foreign, mappings, card = fk
-            rows = remove_rows[fk]
-            setattr(pan_dat, native, getattr(pan_dat, native)[[not _ for _ in rows]].copy(deep=True))
-            remove_rows = self._find_foreign_key_failure_rows(pan_dat)
-
+        msg  = []
+        verify(self.good_pan_dat_object(pan_dat, msg.append),
+               "pan_dat not a good object for this factory : %s"%"\n".join(msg))
+        # the foreign keys are checked with parent tables ahead of their children. A foreign key only needs to be
+        # (re)checked when its parent table loses rows, so (absent circular foreign keys) each is checked once
+        ranks = utils.foreign_key_table_ranks(self.foreign_keys)
+        fk_order = {fk: (ranks[fk.native_table], i) for i, fk in enumerate(self.foreign_keys)}
+        to_check = set(self.foreign_keys)
+        removal_counts = clt.Counter()
+        while to_check:
+            fk = min(to_check, key=fk_order.get)
+            to_check.remove(fk)
+            where_bad_rows = self._foreign_key_failure_rows(pan_dat, fk)
+            if where_bad_rows.any():
+                table = getattr(pan_dat, fk.native_table)
+                setattr(pan_dat, fk.native_table, table.take(numpy.flatnonzero(~where_bad_rows.to_numpy())))
+                removal_counts[fk.native_table] += int(where_bad_rows.sum())
+                to_check.update(_ for _ in self.foreign_keys if _.foreign_table == fk.native_table)
+        if return_removal_counts:
+            return pan_dat, dict(removal_counts)
         return pan_dat
-    def find_duplicates(self, pan_dat, keep="first", as_table=True):
+    def find_duplicates(self, pan_dat, keep="first", as_table=True, n_jobs=1):
         """
         Find the duplicated rows based on the primary key fields.
 
@@ -1251,19 +1441,102 @@ class PanDatFactory(object):
                duplicated rows themselves. Otherwise will return the boolean Series that indicates which rows
                are duplicated rows.
 
+        :param n_jobs: integer. The number of worker processes to shard the tables across (-1 means one per CPU).
+                       The workers are forked, and thus inherit pan_dat without it being pickled. Ignored if
+                       processes can't be forked on this platform.
+
         :return: A dictionary whose keys are the table names and whose values are duplicated rows (or the
                  Series that identifies these rows)
         """
         msg  = []
         verify(self.good_pan_dat_object(pan_dat, msg.append),
                "pan_dat not a good object for this factory : %s"%"\n".join(msg))
+        if n_jobs != 1:
+            return self._sharded_find(lambda t: self._find_duplicates(pan_dat, keep, as_table, float("inf"), [0],
+                                                                      tables=[t]),
+                                      [t for t in self.all_tables if self.primary_key_fields.get(t)], n_jobs)
+        return self._find_duplicates(pan_dat, keep, as_table, float("inf"), [0])
+    def _find_duplicates(self, pan_dat, keep, as_table, max_failures, number_failures, tables=None):
+        # number_failures is a one element list counting the failures found so far, by this and any earlier checks
+        # tables, if provided, restricts the tables that are checked
         rtn = {}
         for t in self.all_tables:
-            if self.primary_key_fields.get(t):
+            if self.primary_key_fields.get(t) and (tables is None or t in tables):
                 dups = getattr(pan_dat, t).duplicated(list(self.primary_key_fields[t]), keep=keep)
+                if max_failures < float("inf"):
+                    dups, _ = _first_failures(dups, max_failures - number_failures[0])
+                    number_failures[0] += _
                 if dups.any():
                     rtn[t] = getattr(pan_dat, t)[list(dups)] if as_table else dups
+                if number_failures[0] >= max_failures:
+                    return rtn
         return rtn
+    def check_all(self, pan_dat, as_table=True, exception_handling="__debug__", max_failures=float("inf"),
+                  n_jobs=1):
+        """
+        Performs all the integrity checks for a pandat object at once. This is equivalent to calling
+        find_duplicates, find_data_type_failures, find_data_row_failures and find_foreign_key_failures, but
+        pan_dat is validated only once.
+
+        :param pan_dat: pandat object
+
+        :param as_table: See the find_ functions.
+
+        :param exception_handling: See find_data_row_failures.
+
+        :param max_failures: number. An upper limit on the total number of failures to find, across all the checks.
+                                     Will short circuit and return ASAP with a partial failure enumeration when this
+                                     number is reached.
+
+        :param n_jobs: integer. The number of worker processes to shard the checks across (-1 means one per CPU).
+                       The shards of all four checks are spread across the same workers. See the n_jobs argument
+                       of the find_ functions.
+
+        :return: A namedtuple with members "duplicates", "data_type_failures", "data_row_failures" and
+                 "foreign_key_failures". Each member is the dictionary returned by the corresponding find_ function.
+        """
+        assert max_failures > 0, "max_failures should be a positive number"
+        msg  = []
+        verify(self.good_pan_dat_object(pan_dat, msg.append),
+               "pan_dat not a good object for this factory : %s"%"\n".join(msg))
+        verify(exception_handling in ["Handled as Failure", "Unhandled", "__debug__"],
+               "bad exception_handling argument")
+        number_failures = [0]
+        checks = [lambda: self._find_duplicates(pan_dat, "first", as_table, max_failures, number_failures),
+                  lambda: self._find_data_type_failures(pan_dat, as_table, max_failures, number_failures),
+                  lambda: self._find_data_row_failures(pan_dat, as_table, exception_handling, max_failures,
+                                                       number_failures),
+                  lambda: self._find_foreign_key_failures(pan_dat, "High", as_table, max_failures, number_failures)]
+        IntegrityFailures = clt.namedtuple("IntegrityFailures", ["duplicates", "data_type_failures",
+                                                                 "data_row_failures", "foreign_key_failures"])
+        if n_jobs != 1 and max_failures == float("inf"):
+            predicate_kwargs_maker_results = self._predicate_kwargs_maker_results(pan_dat, exception_handling)
+            shards = [("duplicates", t) for t in self.all_tables if self.primary_key_fields.get(t)] + \
+                     [("data_type_failures", t) for t in self._true_data_types()] + \
+                     [("data_row_failures", (t, pn)) for t, row_predicates in self._all_data_row_predicates().items()
+                      for pn in row_predicates] + \
+                     [("foreign_key_failures", fk) for fk in self.foreign_keys]
+            def find(shard):
+                check, arg = shard
+                if check == "duplicates":
+                    return self._find_duplicates(pan_dat, "first", as_table, max_failures, [0], tables=[arg])
+                if check == "data_type_failures":
+                    return self._find_data_type_failures(pan_dat, as_table, max_failures, [0], tables=[arg])
+                if check == "data_row_failures":
+                    return self._find_data_row_failures(pan_dat, as_table, exception_handling, max_failures, [0],
+                        predicates=[arg], predicate_kwargs_maker_results=predicate_kwargs_maker_results)
+                # the foreign key namedtuples can't be pickled, so the workers only return the failure rows
+                return self._find_foreign_key_failure_rows(pan_dat, max_failures, [0], fks=[arg]).get(arg)
+            rtn, fk_rows = {_: {} for _ in IntegrityFailures._fields}, {}
+            for (check, arg), found in zip(shards, utils.fork_map(find, shards, n_jobs)):
+                if check != "foreign_key_failures":
+                    rtn[check].update(found)
+                elif found is not None:
+                    fk_rows[arg] = found
+            rtn["foreign_key_failures"] = self._find_foreign_key_failures(pan_dat, "High", as_table, max_failures,
+                                                                          [0], rows=fk_rows)
+            return IntegrityFailures(**rtn)
+        return IntegrityFailures(*[check() if number_failures[0] < max_failures else {} for check in checks])
     def copy_to_ampl(self, pan_dat, field_renamings = None, excluded_tables = None):
         """
         copies the pan_dat object into a new pan_dat object populated with amplpy.DataFrame objects
@@ -261,14 +261,18 @@ class PostgresTicFactory(_PostgresFactory):
         self._duplicate_focused_tdf = create_duplicate_focused_tdf(tic_dat_factory)
         super().__init__(tic_dat_factory)
 
-    def _read_data_cell(self, t, f, x):
-        return self.tdf._general_read_cell(t, f, x)
-
-    def _write_data_cell(self, t, f, x):
-        rtn = self.tdf._infinity_flag_write_cell(t, f, x)
-        if numericish(rtn):
-            rtn = float(rtn) if safe_apply(int)(rtn) != rtn else int(rtn)
-        return rtn
+    def _data_cell_reader(self, t, f):
+        reader = self.tdf._cell_reader(t, f)
+        return (lambda x: x) if reader is None else reader
+
+    def _data_cell_writer(self, t, f):
+        general = self.tdf._cell_writer(t, f)
+        def writer(x):
+            rtn = x if general is None else general(x)
+            if numericish(rtn):
+                rtn = float(rtn) if safe_apply(int)(rtn) != rtn else int(rtn)
+            return rtn
+        return writer
 
     def _Rtn(self, freeze_it):
         def _rtn(*args, **kwargs):
@@ -318,18 +322,18 @@ class PostgresTicFactory(_PostgresFactory):
         for table in set(tdf.all_tables).difference(missing_tables):
             rtn[table] = {} if tdf.primary_key_fields.get(table) else []
             assert tdf.primary_key_fields.get(table) or tdf.data_fields.get(table), "since no generic tables"
-            fields = [_pg_name(f) for f in tdf.primary_key_fields.get(table, ()) +
-                      tdf.data_fields.get(table, ())]
+            all_fields = tdf.compile().all_fields[table]
+            fields = [_pg_name(f) for f in all_fields]
+            readers = [self._data_cell_reader(table, f) for f in all_fields]
+            pk_len = len(tdf.primary_key_fields.get(table, ()))
             for row in engine.execute(f"Select {', '.join(fields)} from {schema}.{table}" +
                                       (f" where {active_fld} is True" if table in active_fld_tables else "")):
-                if tdf.primary_key_fields.get(table):
-                    pk = [self._read_data_cell(table, f, x) for f,x in
-                          zip(tdf.primary_key_fields[table], row[:len(tdf.primary_key_fields[table])])]
-                    data = [self._read_data_cell(table, f, x) for f, x in
-                            zip(tdf.data_fields[table], row[len(tdf.primary_key_fields[table]):])]
+                if pk_len:
+                    pk = [r(x) for r, x in zip(readers[:pk_len], row[:pk_len])]
+                    data = [r(x) for r, x in zip(readers[pk_len:], row[pk_len:])]
                     rtn[table][pk[0] if len(pk) == 1 else tuple(pk)] = data
                 else:
-                    rtn[table].append([self._read_data_cell(table, f, x) for f, x in zip(tdf.data_fields[table], row)])
+                    rtn[table].append([r(x) for r, x in zip(readers, row)])
 
         return rtn
 
@@ -367,17 +371,22 @@ class PostgresTicFactory(_PostgresFactory):
         for t in self._ordered_tables():
             _t = getattr(tic_dat, t)
             primarykeys = tuple(self.tdf.primary_key_fields.get(t, ()))
+            writers = {}
+            def write_cell(f, x):
+                if f not in writers:
+                    writers[f] = self._data_cell_writer(t, f)
+                return writers[f](x)
             for the_data in (_t.items() if primarykeys else _t):
                 if primarykeys:
                     pkrow, sqldatarow = the_data
                     # sqldatarow will always yield keys, values in TicDatFactory defined order
                     fields = primarykeys + tuple(sqldatarow.keys())
                     pkrow = (pkrow,) if len(primarykeys) == 1 else pkrow
-                    datarow = tuple(self._write_data_cell(t, f, x) for f,x in zip(primarykeys, pkrow)) + \
-                              tuple(self._write_data_cell(t, f, x) for f,x in sqldatarow.items())
+                    datarow = tuple(write_cell(f, x) for f,x in zip(primarykeys, pkrow)) + \
+                              tuple(write_cell(f, x) for f,x in sqldatarow.items())
                 else:
                     fields = tuple(the_data.keys())
-                    datarow = tuple(self._write_data_cell(t, f, x) for f,x in the_data.items())
+                    datarow = tuple(write_cell(f, x) for f,x in the_data.items())
                 assert len(datarow) == len(fields)
                 fields = list(map(_pg_name, fields))
                 if t in active_fld_tables:
@@ -184,23 +184,31 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
                         raise TDE("Unable to recognize field %s in table %s for file %s"%
                                   (field, table, db_file_path))
         return table_names
-    def _read_data_cell(self, t, f, x):
-        if stringish(x) and x.lower() in ("inf", "-inf") and self.tic_dat_factory.infinity_io_flag == "N/A" and \
-            not (t == "parameters" and self.tic_dat_factory.parameters):
-            return float(x)
-        if stringish(x) and x.lower() == "true":
-            return True
-        if stringish(x) and x.lower() == "false":
-            return False
-        return self.tic_dat_factory._general_read_cell(t, f, x)
+    def _data_cell_reader(self, t, f):
+        # resolved once per field, and then applied to every cell of that field
+        tdf = self.tic_dat_factory
+        general = tdf._cell_reader(t, f)
+        infinity_strings = tdf.infinity_io_flag == "N/A" and not (t == "parameters" and tdf.parameters)
+        def reader(x):
+            if stringish(x):
+                lower_x = x.lower()
+                if infinity_strings and lower_x in ("inf", "-inf"):
+                    return float(x)
+                if lower_x == "true":
+                    return True
+                if lower_x == "false":
+                    return False
+            return x if general is None else general(x)
+        return reader
     def _create_gen_obj(self, db_file_path, table, table_name):
         tdf = self.tic_dat_factory
         def tableObj() :
             assert (not tdf.primary_key_fields.get(table)) and (tdf.data_fields.get(table))
             with sql.connect(db_file_path) as con:
+                readers = [self._data_cell_reader(table, f) for f in tdf.data_fields[table]]
                 for row in con.execute("Select %s from [%s]"%
                         (", ".join(_brackets(tdf.data_fields[table])), table_name)):
-                    yield [self._read_data_cell(table, f, x) for f, x in zip(tdf.data_fields[table], row)]
+                    yield [r(x) for r, x in zip(readers, row)]
         return tableObj
     def _create_tic_dat(self, db_file_path):
         tdf = self.tic_dat_factory
@@ -219,19 +227,20 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
         tdf = self.tic_dat_factory
         rtn = {}
         for table in set(tdf.all_tables).difference(tdf.generator_tables).difference(missing_tables):
-            fields = tdf.primary_key_fields.get(table, ()) + tdf.data_fields.get(table, ())
+            fields = tdf.compile().all_fields.get(table, ())
             if not fields:
                 assert table in tdf.generic_tables
                 fields = tuple(x[1] for x in con.execute("PRAGMA table_info(%s)"%table))
             rtn[table]= {} if tdf.primary_key_fields.get(table, ())  else []
+            readers = [self._data_cell_reader(table, f) for f in fields]
+            pk_len = len(tdf.primary_key_fields.get(table, ()))
             for row in con.execute("Select %s from [%s]"%(", ".join(_brackets(fields)),
                                                           table_names[table])):
                 if table in tdf.generic_tables:
-                    rtn[table].append({f:self._read_data_cell(table, f, d) for f, d in zip(fields, row)})
+                    rtn[table].append({f:r(d) for f, r, d in zip(fields, readers, row)})
                 else:
-                    pkfs = tdf.primary_key_fields.get(table, ())
-                    pk = tuple(self._read_data_cell(table, f, x) for f, x in zip(pkfs, row[:len(pkfs)]))
-                    data = [self._read_data_cell(table, f, x) for f, x in zip(fields[len(pkfs):], row[len(pkfs):])]
+                    pk = tuple(r(x) for r, x in zip(readers[:pk_len], row[:pk_len]))
+                    data = [r(x) for r, x in zip(readers[pk_len:], row[pk_len:])]
                     if dictish(rtn[table]) :
                         rtn[table][pk[0] if len(pk) == 1 else tuple(pk)] = data
                     else :
@@ -275,22 +284,29 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
             str += ",\n".join(strl) + "\n);"
             rtn.append(str)
         return tuple(rtn)
-    def _write_data_cell(self, t, f, x):
-        if x is True or x is False:
-            return str(x)
-        return self.tic_dat_factory._infinity_flag_write_cell(t, f, x)
+    def _data_cell_writer(self, t, f):
+        general = self.tic_dat_factory._cell_writer(t, f)
+        def writer(x):
+            if x is True or x is False:
+                return str(x)
+            return x if general is None else general(x)
+        return writer
     def _get_data(self, tic_dat, as_sql):
         rtn = []
         for t in self.tic_dat_factory.all_tables:
             _t = getattr(tic_dat, t)
             if dictish(_t) :
                 primarykeys = tuple(self.tic_dat_factory.primary_key_fields[t])
+                writers = {}
                 for pkrow, sqldatarow in _t.items() :
                     _items = list(sqldatarow.items())
                     fields = primarykeys + tuple(x[0] for x in _items)
                     datarow = ((pkrow,) if len(primarykeys)==1 else pkrow) + tuple(x[1] for x in _items)
                     assert len(datarow) == len(fields)
-                    datarow = tuple(self._write_data_cell(t, f, x) for f,x in zip(fields, datarow))
+                    for f in fields:
+                        if f not in writers:
+                            writers[f] = self._data_cell_writer(t, f)
+                    datarow = tuple(writers[f](x) for f,x in zip(fields, datarow))
                     str = "INSERT INTO [%s] (%s) VALUES (%s)"%(t, ",".join(_brackets(fields)),
                           ",".join("%s" if as_sql else "?" for _ in fields))
                     if as_sql:
@@ -405,6 +405,26 @@ class TestPostres(unittest.TestCase):
         pg_tic_dat = pgtf.create_tic_dat(self.engine, test_schema)
         self.assertTrue(tdf._same_data(dat, pg_tic_dat))
 
+    def test_data_cell_converters(self):
+        if not self.can_run:
+            return
+        tdf = TicDatFactory(table=[["pkf"], ["df1", "df2"]])
+        tdf.set_data_type("table", "df2", min=-float("inf"), max=float("inf"), inclusive_max=True)
+        pgtf = tdf.pgsql
+        self.assertTrue([pgtf._data_cell_reader("table", "df1")(x) for x in [None, 1.5, "a"]] == [None, 1.5, "a"])
+        self.assertTrue([pgtf._data_cell_writer("table", "df1")(x) for x in [2.0, 2.5, "a", None]] ==
+                        [2, 2.5, "a", None])
+        self.assertTrue(isinstance(pgtf._data_cell_writer("table", "df1")(2.0), int))
+        tdf.set_infinity_io_flag(100)
+        self.assertTrue([pgtf._data_cell_reader("table", "df2")(x) for x in [100, -200, 5]] ==
+                        [float("inf"), -float("inf"), 5])
+        self.assertTrue([pgtf._data_cell_writer("table", "df2")(x) for x in [float("inf"), -float("inf"), 5.5]] ==
+                        [100, -100, 5.5])
+        tdf.set_infinity_io_flag(None)
+        tdf.set_data_type("table", "df2", min=0, max=float("inf"), inclusive_max=True)
+        self.assertTrue(pgtf._data_cell_reader("table", "df2")(None) == float("inf"))
+        self.assertTrue(pgtf._data_cell_writer("table", "df2")(float("inf")) is None)
+
     def test_dups(self):
         if not self.can_run:
             return
@@ -433,6 +433,30 @@ class TestCsv(unittest.TestCase):
         self.assertTrue(raw_tdf._same_data(dat_nums, dat_nums_2))
         self.assertTrue(raw_tdf._same_data(dat_strs, dat_strs_2))
 
+    def testHeaderResolution(self):
+        if not self.can_run:
+            return
+        tdf = TicDatFactory(table_one=[["a"], ["b", "c"]], table_two=[[], ["x", "y"]])
+        dir_path = makeCleanDir(os.path.join(_scratchDir, "header_resolution"))
+        def write(table, text):
+            with open(os.path.join(dir_path, table + ".csv"), "w") as f:
+                f.write(text)
+        write("table_one", "C,junk,A,B,junk\n5,1,k1,2,1\n\n6,1,k2,3,2\n7,1,k3\n")
+        write("table_two", "y,x\n")
+        dat = tdf.csv.create_tic_dat(dir_path)
+        self.assertTrue(dict(dat.table_one["k1"]) == {"b": 2, "c": 5} and len(dat.table_one) == 3)
+        self.assertTrue(dict(dat.table_one["k3"]) == {"b": None, "c": 7}) # short rows are padded with None
+        self.assertTrue(not tdf.csv.find_duplicates(dir_path) and not dat.table_two)
+        write("table_two", "y,X,x\n1,2,3\n")
+        self.assertTrue(self.firesException(lambda: tdf.csv.create_tic_dat(dir_path)))
+        write("table_two", "y,x,x\n1,2,3\n1,2,3\n") # as with csv.DictReader, the last duplicate is used
+        dat = tdf.csv.create_tic_dat(dir_path)
+        self.assertTrue([tuple(r.values()) for r in dat.table_two] == [(3, 1)] * 2)
+        write("table_one", "k1,2,5\nk1,3,6\n")
+        self.assertTrue(tdf.csv.find_duplicates(dir_path, headers_present=False) == {"table_one": {"k1": 2}})
+        write("table_one", "k1,2,5,7\n")
+        self.assertTrue(self.firesException(lambda: tdf.csv.create_tic_dat(dir_path, headers_present=False)))
+
 _scratchDir = TestCsv.__name__ + "_scratch"
 
 # Run the tests.
@@ -131,6 +131,13 @@ class TestPandas(unittest.TestCase):
         self.assertTrue(set(ticDat.inflow.columns) == {"quantity"})
         self.assertTrue(set(ticDat.nodes.columns) == {"name"})
 
+        # the cells of a DataFrame row share a dtype, and so ints are upcast to floats alongside float columns
+        tdf = TicDatFactory(t=[["k"], ["i", "f"]], s=[["k"], ["i", "s"]])
+        index = utils.pd.Index(["a", "b"], name="k")
+        dat = tdf.TicDat(t=DataFrame({"i": [1, 2], "f": [0.5, 1.5]}, index=index),
+                         s=DataFrame({"i": [1, 2], "s": ["x", "y"]}, index=index))
+        self.assertTrue(all(type(r["i"]) is float for r in dat.t.values()) and dat.t["b"]["i"] == 2)
+        self.assertTrue(all(type(r["i"]) is int for r in dat.s.values()))
 
 
     def testSilly(self):
@@ -5,9 +5,10 @@ import ticdat.utils as utils
 from ticdat.testing.ticdattestutils import fail_to_debugger, flagged_as_run_alone, netflowPandasData
 from ticdat.testing.ticdattestutils import netflowSchema, copy_to_pandas_with_reset, dietSchema, netflowData
 from ticdat.testing.ticdattestutils import addNetflowForeignKeys, sillyMeSchema, dietData, pan_dat_maker
-from ticdat.testing.ticdattestutils import addDietForeignKeys
+from ticdat.testing.ticdattestutils import addDietForeignKeys, firesException
 from ticdat.ticdatfactory import TicDatFactory
 import itertools
+import gc
 from math import isnan
 
 def _deep_anonymize(x)  :
@@ -369,7 +370,7 @@ class TestUtils(unittest.TestCase):
         fk_fails_3 = input_schema.find_foreign_key_failures(new_pan_dat, verbosity="Low", as_table=False)
         self.assertTrue({tuple(k)[:2] + (tuple(k[2]),): len(v) for k,v in fk_fails.items()} ==
                         {k:len(v) for k,v in fk_fails_2.items()} ==
-                        {k:v.count(True) for k,v in fk_fails_3.items()} ==
+                        {k:v.sum() for k,v in fk_fails_3.items()} ==
                         {('position_constraints', 'innings', ("Inning Group", "Inning Group")): 2,
                          ('position_constraints', 'positions', ("Position Group", "Position Group")): 2,
                          ('position_constraints', 'roster', ("Grade", "Grade")): 1})
@@ -747,6 +748,264 @@ class TestUtils(unittest.TestCase):
         errs = pdf.find_foreign_key_failures(pan_dat, max_failures=9)
         self.assertTrue(len(errs) == 1 and all(len(_) == 9 for _ in errs.values()))
 
+    def test_valid_data_series(self):
+        import datetime
+        type_dicts = [utils.TypeDictionary.safe_creator(*_) for _ in
+                      itertools.product([True, False], [True, False], [True, False], [-1, 0], [10, float("inf")],
+                                        [True, False], ["*", ("a", "b")], [True, False])]
+        type_dicts += [utils.TypeDictionary.safe_creator(0, 0, 0, 0, 0, 0, "*", _, datetime=True) for _ in (1, 0)]
+        all_series = [utils.pd.Series([1, 2.5, -1, 0, 10, 11, float("inf"), -float("inf"), None, float("nan")]),
+                      utils.pd.Series([1, 2, 3, -1, 10, 0]), utils.pd.Series([True, False]),
+                      utils.pd.Series(["a", 1, 2.0, None, True, "c", float("inf"), "2020-01-01", utils.numpy.int64(3),
+                                       datetime.datetime(2020, 1, 1), 10]),
+                      utils.pd.Series(utils.pd.to_datetime(["2020-01-01", None])),
+                      utils.pd.Series(["2020-01-01", "a", "b", None]), utils.pd.Series([], dtype=float),
+                      utils.pd.Series([1, 10**400, 2.5, -10**400], dtype=object)]
+        for type_dict, series in itertools.product(type_dicts, all_series):
+            self.assertTrue(type_dict.valid_data_series(series).tolist() ==
+                            [type_dict.valid_data(None if utils.pd.isnull(x) else x) for x in series])
+        pdf = PanDatFactory(t=[["a"], ["b"]])
+        pdf.set_data_type("t", "b", must_be_int=True)
+        dat = pdf.PanDat(t=DataFrame({"a": [1, 2, 3], "b": utils.pd.Series([1, 10**400, 2.5], dtype=object)}))
+        self.assertTrue(list(pdf.find_data_type_failures(dat)[("t", "b")]["b"]) == [2.5])
+
+    def test_read_write_adjustments(self):
+        import datetime
+        pdf = PanDatFactory(t=[["a"], ["b", "c", "d"]])
+        pdf.set_data_type("t", "c", datetime=True, nullable=True)
+        pdf.set_data_type("t", "d", number_allowed=False, strings_allowed="*", nullable=True)
+        pdf.set_infinity_io_flag(100)
+        dat = pdf.PanDat(t=DataFrame({"a": [1, 200, -300, "x"], "b": [1, "boo", 100, True],
+                                      "c": ["2020-01-01", None, "2020-01-01", "nope"],
+                                      "d": ["None", "none", "nOne!", 5]}))
+        pdf._general_post_read_adjustment(dat, push_parameters_to_be_valid=True, json_read=True)
+        self.assertTrue(list(dat.t["a"]) == [1, float("inf"), -float("inf"), "x"])
+        self.assertTrue(list(dat.t["b"]) == [1, "boo", float("inf"), True])
+        self.assertTrue(dat.t["c"][0] == dat.t["c"][2] == datetime.datetime(2020, 1, 1) and
+                        utils.pd.isnull(dat.t["c"][1]) and dat.t["c"][3] == "nope")
+        self.assertTrue(list(dat.t["d"]) == [None, None, "nOne!", 5])
+        written = pdf._pre_write_adjustment(dat)
+        self.assertTrue(list(written.t["a"]) == [1, 100, -100, "x"] and list(dat.t["a"])[1] == float("inf"))
+        pdf = PanDatFactory(t=[["a"], ["b"]])
+        pdf.set_infinity_io_flag(None)
+        pdf.set_data_type("t", "b", max=float("inf"), inclusive_max=True)
+        written = pdf._pre_write_adjustment(pdf.PanDat(t=DataFrame({"a": [1, 2], "b": [float("inf"), 3]})))
+        self.assertTrue(utils.pd.isnull(written.t["b"][0]) and written.t["b"][1] == 3)
+
+    def test_copy_on_write(self):
+        pdf, diet_dat = PanDatFactory(**dietSchema()), TicDatFactory(**dietSchema()).copy_tic_dat(dietData())
+        dat = pan_dat_maker(dietSchema(), diet_dat)
+        if int(utils.pd.__version__.split(".")[0]) < 2:
+            self.assertTrue(firesException(lambda : pdf.copy_pan_dat(dat, copy_on_write=True)))
+            return
+        with utils.pd.option_context("mode.copy_on_write", True):
+            dat2 = pdf.copy_pan_dat(dat, copy_on_write=True)
+            self.assertTrue(pdf._same_data(dat, dat2))
+            dat2.foods["cost"] += 1
+            self.assertFalse(pdf._same_data(dat, dat2))
+            self.assertTrue(pdf._same_data(dat, pan_dat_maker(dietSchema(), diet_dat)))
+
+    def test_vectorized_row_predicates(self):
+        pdf = PanDatFactory(**dietSchema())
+        pdf.add_data_row_predicate("categories", "minNutrition <= maxNutrition", "minmax")
+        pdf.add_data_row_predicate("foods", lambda df, limit: df["cost"] < limit, "cost",
+                                   predicate_kwargs_maker=lambda dat: {"limit": 2}, predicate_vectorized=True)
+        pdf.add_data_row_predicate("foods", "cost < @limit", "cost_expr", predicate_kwargs_maker=lambda dat: {"limit": 2})
+        pdf.add_data_row_predicate("foods", lambda df: df["cost"].where(df["cost"] < 2, "too pricey").where(
+                                   df["cost"] >= 2, True), "cost_msg", predicate_failure_response="Error Message",
+                                   predicate_vectorized=True)
+        pdf.add_data_row_predicate("foods", lambda df: df["no such field"] > 0, "oops", predicate_vectorized=True)
+        pdf = pdf.clone()
+        diet_dat = TicDatFactory(**dietSchema()).copy_tic_dat(dietData())
+        diet_dat.categories["fat"]["minNutrition"] = 100
+        dat = pan_dat_maker(dietSchema(), diet_dat)
+        expensive = {f for f, r in diet_dat.foods.items() if r["cost"] >= 2}
+        self.assertTrue(expensive)
+        fails = pdf.find_data_row_failures(dat, exception_handling="Handled as Failure")
+        self.assertTrue(set(fails) == {("categories", "minmax"), ("foods", "cost"), ("foods", "cost_expr"),
+                                       ("foods", "cost_msg"), ("foods", "oops")})
+        self.assertTrue(set(fails["categories", "minmax"]["name"]) == {"fat"})
+        for pn in ["cost", "cost_expr", "cost_msg"]:
+            self.assertTrue(set(fails["foods", pn]["name"]) == expensive)
+        self.assertTrue(set(fails["foods", "cost_msg"]["Error Message"]) == {"too pricey"})
+        self.assertTrue(len(fails["foods", "oops"]) == len(dat.foods))
+        self.assertTrue(firesException(lambda: pdf.find_data_row_failures(dat, exception_handling="Unhandled")))
+        fails = pdf.find_data_row_failures(dat, as_table=False, exception_handling="Handled as Failure",
+                                           max_failures=2)
+        self.assertTrue(sum(v.sum() for v in fails.values()) == 2)
+        pdf = PanDatFactory(**dietSchema())
+        pdf.add_data_row_predicate("foods", lambda df: (df["cost"] < 2).sort_values(), "sorted",
+                                   predicate_vectorized=True) # aligned by label, and not by position
+        dat.foods.index = [10 * i for i in range(len(dat.foods))]
+        fails = pdf.find_data_row_failures(dat)
+        self.assertTrue(set(fails["foods", "sorted"]["name"]) == expensive)
+        pdf.add_data_row_predicate("foods", lambda df: (df["cost"] < 2).reset_index(drop=True), "sorted",
+                                   predicate_vectorized=True)
+        self.assertTrue(firesException(lambda: pdf.find_data_row_failures(dat, exception_handling="Unhandled")))
+
+    def test_foreign_key_failure_series(self):
+        pdf = PanDatFactory(parent=[["A", "B"], ["C"]], child=[["X", "Y", "Z"], []], single=[["S"], []])
+        pdf.add_foreign_key("child", "parent", [["X", "A"], ["Y", "B"]])
+        pdf.add_foreign_key("single", "parent", ["S", "A"])
+        dat = pdf.PanDat(parent=DataFrame({"A": [1, 2, "x"], "B": ["a", "b", "c"], "C": [0, 0, 0]}),
+                         child=DataFrame({"X": [1, 2, 1.0, "x", 3], "Y": ["a", "a", "a", "c", "c"],
+                                          "Z": range(5)}, index=[10, 8, 6, 4, 2]),
+                         single=DataFrame({"S": [2, 3, "x", "y"]}, index=list("abcd")))
+        fails = pdf.find_foreign_key_failures(dat, verbosity="Low", as_table=False)
+        child_fails, single_fails = fails["child", "parent", (("X", "A"), ("Y", "B"))], fails["single", "parent", ("S", "A")]
+        self.assertTrue(list(child_fails.index) == [10, 8, 6, 4, 2] and
+                        list(child_fails) == [False, True, False, False, True])
+        self.assertTrue(list(single_fails.index) == list("abcd") and list(single_fails) == [False, True, False, True])
+        fails = pdf.find_foreign_key_failures(dat, verbosity="Low")
+        self.assertTrue(list(fails["child", "parent", (("X", "A"), ("Y", "B"))]["Z"]) == [1, 4])
+        self.assertTrue(sum(map(sum, pdf.find_foreign_key_failures(dat, as_table=False, max_failures=3).values())) == 3)
+        pdf.remove_foreign_key_failures(dat)
+        self.assertFalse(pdf.find_foreign_key_failures(dat))
+        self.assertTrue(list(dat.child["Z"]) == [0, 2, 3] and list(dat.single["S"]) == [2, "x"])
+        # multi field keys with int parent and float (or object) child columns, checked without dtype warnings
+        import warnings
+        dat = pdf.PanDat(parent=DataFrame({"A": [1, 2, 3], "B": [1.0, 2.0, 3.5], "C": [0, 0, 0]}),
+                         child=DataFrame({"X": [1.0, 2.0, 3.0, 4.0], "Y": [1, 2, 3, 1], "Z": range(4)}),
+                         single=DataFrame({"S": [1.0, 4.0]}))
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", FutureWarning)
+            fails = pdf.find_foreign_key_failures(dat, verbosity="Low")
+            self.assertTrue(list(fails["child", "parent", (("X", "A"), ("Y", "B"))]["Z"]) == [2, 3])
+            self.assertTrue(list(fails["single", "parent", ("S", "A")]["S"]) == [4.0])
+            dat.child["X"] = dat.child["X"].astype(object)
+            dat.child.loc[3, "X"] = "x"
+            fails = pdf.find_foreign_key_failures(dat, verbosity="Low")
+            self.assertTrue(list(fails["child", "parent", (("X", "A"), ("Y", "B"))]["Z"]) == [2, 3])
+
+    def test_remove_foreign_key_failures_cascade(self):
+        pdf = PanDatFactory(grand=[["G"], []], parent=[["P"], ["G"]], child=[["C"], ["P", "G"]],
+                            tree=[["Node"], ["Parent"]])
+        pdf.add_foreign_key("child", "parent", ["P", "P"])
+        pdf.add_foreign_key("child", "grand", ["G", "G"])
+        pdf.add_foreign_key("parent", "grand", ["G", "G"])
+        pdf.add_foreign_key("tree", "tree", ["Parent", "Node"])
+        ranks = utils.foreign_key_table_ranks(pdf.foreign_keys)
+        self.assertTrue(set(ranks) == set(pdf.all_tables) and ranks["grand"] < ranks["parent"] < ranks["child"])
+        def make_dat():
+            return pdf.PanDat(grand=DataFrame({"G": [1, 2]}),
+                              parent=DataFrame({"P": ["a", "b", "c"], "G": [1, 2, 3]}),
+                              child=DataFrame({"C": range(5), "P": ["a", "b", "c", "c", "d"], "G": [1, 1, 1, 3, 1]}),
+                              tree=DataFrame({"Node": ["r", "x", "y", "z"], "Parent": ["r", "r", "q", "y"]}))
+        dat, counts = pdf.remove_foreign_key_failures(make_dat(), return_removal_counts=True)
+        self.assertTrue(counts == {"parent": 1, "child": 3, "tree": 2})
+        self.assertFalse(pdf.find_foreign_key_failures(dat))
+        self.assertTrue(list(dat.child["C"]) == [0, 1] and list(dat.tree["Node"]) == ["r", "x"])
+        self.assertTrue(pdf._same_data(dat, pdf.remove_foreign_key_failures(make_dat())))
+        dat = make_dat()
+        pdf.remove_foreign_key_failures(dat)
+        dat, counts = pdf.remove_foreign_key_failures(dat, return_removal_counts=True)
+        self.assertTrue(counts == {})
+
+        circle = PanDatFactory(a=[["A"], ["B"]], b=[["B"], ["A"]], c=[["C"], ["A"]])
+        circle.add_foreign_key("c", "a", ["A", "A"])
+        circle.add_foreign_key("a", "b", ["B", "B"])
+        circle.add_foreign_key("b", "a", ["A", "A"])
+        self.assertTrue(utils.foreign_key_table_ranks(circle.foreign_keys)["c"] == 2)
+        dat = circle.PanDat(a=DataFrame({"A": [1, 2], "B": [1, 3]}), b=DataFrame({"B": [1, 2], "A": [1, 2]}),
+                            c=DataFrame({"C": [1, 2], "A": [1, 2]}))
+        dat, counts = circle.remove_foreign_key_failures(dat, return_removal_counts=True)
+        self.assertTrue(counts == {"a": 1, "b": 1, "c": 1})
+        self.assertTrue(list(dat.a["A"]) == list(dat.b["B"]) == list(dat.c["C"]) == [1])
+
+    def test_check_all(self):
+        pdf = PanDatFactory(**dietSchema())
+        pdf.add_foreign_key("nutritionQuantities", "foods", ["food", "name"])
+        pdf.add_foreign_key("nutritionQuantities", "categories", ["category", "name"])
+        pdf.set_data_type("foods", "cost", max=10)
+        pdf.add_data_row_predicate("categories", lambda row: row["minNutrition"] <= row["maxNutrition"], "minmax")
+        pdf.add_data_row_predicate("nutritionQuantities", "qty > 5")
+        diet_dat = TicDatFactory(**dietSchema()).copy_tic_dat(dietData())
+        diet_dat.foods["pizza"]["cost"] = 100
+        diet_dat.categories["fat"]["minNutrition"] = 100
+        diet_dat.nutritionQuantities["junk", "fat"] = 3
+        dat = pan_dat_maker(dietSchema(), diet_dat)
+        dat.foods = utils.pd.concat([dat.foods, dat.foods.iloc[:1]])
+        report = pdf.check_all(dat, as_table=False)
+        self.assertTrue(all(report))
+        for (k, v), (k2, v2) in zip(report.data_row_failures.items(),
+                                    pdf.find_data_row_failures(dat, as_table=False).items()):
+            self.assertTrue(k == k2 and list(v) == list(v2))
+        self.assertTrue(set(report.duplicates) == set(pdf.find_duplicates(dat)) == {"foods"})
+        self.assertTrue(set(report.foreign_key_failures) == set(pdf.find_foreign_key_failures(dat)))
+        for max_failures in [1, 2, 5]:
+            report = pdf.check_all(dat, as_table=False, max_failures=max_failures)
+            self.assertTrue(sum(v.sum() for r in report for v in r.values()) == max_failures)
+
+    def test_n_jobs(self):
+        pdf = PanDatFactory(**dietSchema())
+        pdf.add_data_row_predicate("categories", lambda row: row["minNutrition"] <= row["maxNutrition"], "minmax")
+        pdf.add_data_row_predicate("nutritionQuantities", lambda row, small: row["qty"] > small or "small",
+                                   predicate_kwargs_maker=lambda dat: {"small": len(dat.foods) / 2},
+                                   predicate_failure_response="Error Message")
+        pdf.add_data_row_predicate("foods", "cost < 2")
+        diet_dat = TicDatFactory(**dietSchema()).copy_tic_dat(dietData())
+        diet_dat.categories["fat"]["minNutrition"] = 100
+        dat = pan_dat_maker(dietSchema(), diet_dat)
+        for as_table in [True, False]:
+            fails = pdf.find_data_row_failures(dat, as_table=as_table)
+            fails_2 = pdf.find_data_row_failures(dat, as_table=as_table, n_jobs=2)
+            self.assertTrue(len(fails) == 3 and list(fails) == list(fails_2))
+            self.assertTrue(all(fails[k].equals(fails_2[k]) for k in fails))
+        pdf.set_data_type("foods", "cost", max=10)
+        addDietForeignKeys(pdf)
+        diet_dat.foods["pizza"]["cost"] = 100
+        diet_dat.nutritionQuantities["junk", "fat"] = 3
+        dat = pan_dat_maker(dietSchema(), diet_dat)
+        dat.foods = utils.pd.concat([dat.foods, dat.foods.iloc[:2]], ignore_index=True)
+        def same(fails, fails_2):
+            return list(fails) == list(fails_2) and all(fails[k].equals(fails_2[k]) for k in fails)
+        for as_table in [True, False]:
+            self.assertTrue(same(pdf.find_duplicates(dat, as_table=as_table),
+                                 pdf.find_duplicates(dat, as_table=as_table, n_jobs=2)))
+            self.assertTrue(same(pdf.find_data_type_failures(dat, as_table=as_table),
+                                 pdf.find_data_type_failures(dat, as_table=as_table, n_jobs=2)))
+            self.assertTrue(same(pdf.find_foreign_key_failures(dat, as_table=as_table),
+                                 pdf.find_foreign_key_failures(dat, as_table=as_table, n_jobs=-1)))
+            report, report_2 = pdf.check_all(dat, as_table=as_table), pdf.check_all(dat, as_table=as_table, n_jobs=2)
+            self.assertTrue(all(report) and all(same(r, r_2) for r, r_2 in zip(report, report_2)))
+        self.assertTrue(sum(map(len, pdf.check_all(dat, n_jobs=2, max_failures=3))) <= 3)
+
+    def test_same_data_multiset(self):
+        pdf = PanDatFactory(sol=[[], ["a", "b", "x"]], p=[["a"], ["x"]], g="*")
+        rows = [[i % 7, "s%s" % (i % 5), i / 3] for i in range(200)]
+        def make(sol, p=((1, 1.5), (2, 2.5)), g=None):
+            return pdf.PanDat(sol=sol, p=list(p), g=DataFrame({"c": [1, 2], "d": ["x", "y"]} if g is None else g))
+        dat = make(rows)
+        self.assertTrue(pdf._same_data(dat, make(rows[::-1], p=((2, 2.5), (1, 1.5)),
+                                                 g=DataFrame({"d": ["y", "x"], "c": [2, 1]}))))
+        self.assertFalse(pdf._same_data(dat, make(rows[:-1] + [rows[0]])))
+        nearly = [[a, b, x * (1 + 1e-9)] for a, b, x in rows]
+        self.assertFalse(pdf._same_data(dat, make(nearly)))
+        self.assertTrue(pdf._same_data(dat, make(nearly), epsilon=1e-6))
+        self.assertTrue(pdf._same_data(dat, make([[float(a), b, x] for a, b, x in rows]))) # 1 == 1.0
+        nans = [[a, b, float("nan") if a == 3 else x] for a, b, x in rows]
+        self.assertFalse(pdf._same_data(make(nans), make(nans[::-1])))
+        self.assertTrue(pdf._same_data(make(nans), make(nans[::-1]), nans_are_same_for_data_rows=True))
+
+    def test_good_pan_dat_object_memo(self):
+        pdf = PanDatFactory(**dietSchema())
+        dat = pan_dat_maker(dietSchema(), TicDatFactory(**dietSchema()).copy_tic_dat(dietData()))
+        self.assertTrue(pdf.good_pan_dat_object(dat) and dat in pdf._good_objects)
+        self.assertTrue(pdf.good_pan_dat_object(dat))
+        dat.foods["extra"] = 1
+        self.assertTrue(pdf.good_pan_dat_object(dat))
+        dat.foods.drop(columns=["cost"], inplace=True)
+        self.assertFalse(pdf.good_pan_dat_object(dat))
+        dat.foods = DataFrame({"name": ["pizza"], "cost": [1]})
+        self.assertTrue(pdf.good_pan_dat_object(dat))
+        dat.foods.rename(columns={"cost": "price"}, inplace=True)
+        self.assertFalse(pdf.good_pan_dat_object(dat))
+        dat = pan_dat_maker(dietSchema(), TicDatFactory(**dietSchema()).copy_tic_dat(dietData()))
+        self.assertTrue(pdf.good_pan_dat_object(dat) and len(pdf._good_objects) == 1)
+        del dat
+        gc.collect()
+        self.assertFalse(pdf._good_objects) # the memo doesn't keep the data object alive
+
 # Run the tests.
 if __name__ == "__main__":
     if not DataFrame :
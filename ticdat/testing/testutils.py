@@ -9,6 +9,8 @@ from ticdat.testing.ticdattestutils import assertTicDatTablesSame, DEBUG, addNet
 from ticdat.testing.ticdattestutils import spacesSchema, spacesData, clean_denormalization_errors, get_testing_file_path
 import os
 import itertools
+import gc
+import time
 import shutil
 import json
 try:
@@ -1598,6 +1600,617 @@ class TestUtils(unittest.TestCase):
         errs = tdf.find_foreign_key_failures(dat, max_failures=9)
         self.assertTrue(len(errs) == 1 and all(len(_.native_pks) == 9 for _ in errs.values()))
 
+    def test_row_factory(self):
+        row_class = utils.td_row_factory("table", ["pk"], ["one", "two", "three"], {"two": 2})
+        self.assertTrue(row_class((1, 2, 3)).values() == row_class([1, 2, 3]).values() == (1, 2, 3))
+        self.assertTrue(dict(row_class({"one": 1}).items()) == {"one": 1, "two": 2, "three": 0})
+        row = row_class({"three": 3})
+        self.assertTrue(row_class(row).values() == (0, 2, 3) and row.keys() is row_class(row).keys())
+        self.assertTrue(list(row) == ["one", "two", "three"] and len(row) == 3 and "two" in row)
+        for bad in [(1, 2), {"four": 4}, 1]:
+            self.assertTrue(firesException(lambda : row_class(bad)))
+        self.assertTrue(firesException(lambda : row["four"]))
+        self.assertTrue(firesException(lambda : row.__setitem__("four", 4)))
+        self.assertFalse(hasattr(row, "_dataFrozen") and row._dataFrozen)
+        row["one"] = 11
+        row.some_link = "linked"
+        self.assertTrue(row["one"] == 11 and row.some_link == "linked")
+        row._dataFrozen = row._attributesFrozen = True
+        self.assertTrue(firesException(lambda : row.__setitem__("one", 1)))
+        self.assertTrue(firesException(lambda : setattr(row, "another_link", "linked")))
+        self.assertTrue(utils.td_row_factory("table", ["pk"], ["one"])(7).values() == (7,))
+
+    def test_columnar_tables(self):
+        tdf = TicDatFactory(**dietSchema())
+        tdf_c = TicDatFactory(**dietSchema())
+        tdf_c.set_columnar_tables(["foods", "categories", "nutritionQuantities"])
+        self.assertTrue(firesException(lambda : tdf_c.set_columnar_tables(["nope"])))
+        dat = tdf.copy_tic_dat(dietData())
+        dat_c = tdf_c.copy_tic_dat(dat)
+        self.assertTrue(tdf._same_data(dat, dat_c) and tdf_c._same_data(dat_c, tdf_c.copy_tic_dat(dat_c)))
+        self.assertTrue(dat_c.foods["hamburger"]["cost"] == dat.foods["hamburger"]["cost"])
+        dat_c.foods["hamburger"]["cost"] = dat.foods["hamburger"]["cost"] = 3.5
+        dat_c.foods["new food"]["cost"] = dat.foods["new food"]["cost"] = 1.5
+        self.assertTrue(dat_c.foods["new food"] is not dat_c.foods["new food"])
+        del(dat_c.nutritionQuantities["milk", "fat"])
+        del(dat.nutritionQuantities["milk", "fat"])
+        self.assertTrue(tdf._same_data(dat, dat_c))
+        self.assertTrue(dat_c.nutritionQuantities.pop(("ice cream", "fat")) ==
+                        dict(dat.nutritionQuantities.pop(("ice cream", "fat")).items()))
+        self.assertTrue(firesException(lambda : dat_c.foods["new food"]["nope"]))
+        if pd:
+            pan_dat, pan_dat_c = tdf.copy_to_pandas(dat), tdf_c.copy_to_pandas(dat_c)
+            for t in tdf.all_tables:
+                self.assertTrue(getattr(pan_dat, t).sort_index().equals(getattr(pan_dat_c, t).sort_index()))
+            self.assertTrue(tdf._same_data(dat, tdf_c.TicDat(**{t:getattr(pan_dat_c, t)
+                                                                 for t in tdf.all_tables})))
+        tdf_c.freeze_me(dat_c)
+        self.assertTrue(firesException(lambda : dat_c.foods["hamburger"].__setitem__("cost", 1)))
+        self.assertTrue(firesException(lambda : dat_c.foods.__setitem__("not a food", 1)))
+        self.assertTrue(firesException(lambda : dat_c.foods["not a food"]))
+        self.assertTrue(dat_c.foods["hamburger"]["cost"] == 3.5)
+
+    def test_from_columns(self):
+        tdf = TicDatFactory(**dietSchema())
+        dat = tdf.copy_tic_dat(dietData())
+        columns = {t: {f: [] for f in tdf.primary_key_fields[t] + tdf.data_fields[t]} for t in tdf.all_tables}
+        for t in tdf.all_tables:
+            for pk, row in getattr(dat, t).items():
+                for f, v in list(zip(tdf.primary_key_fields[t], pk if utils.containerish(pk) else (pk,))) + \
+                            list(row.items()):
+                    columns[t][f].append(v)
+        self.assertTrue(tdf._same_data(dat, tdf.TicDat.from_columns(**columns)))
+        tdf_c = TicDatFactory(**dietSchema())
+        tdf_c.set_columnar_tables(["nutritionQuantities"])
+        self.assertTrue(tdf._same_data(dat, tdf_c.TicDat.from_columns(**columns)))
+        self.assertTrue(firesException(lambda : tdf.TicDat.from_columns(foods={"name": ["a", "a"], "cost": [1, 2]})))
+        self.assertTrue(firesException(lambda : tdf.TicDat.from_columns(foods={"name": ["a", "b"], "cost": [1]})))
+        self.assertTrue(firesException(lambda : tdf.TicDat.from_columns(foods={"name": ["a"]})))
+        self.assertTrue(firesException(lambda : tdf.TicDat.from_columns(food={"name": ["a"], "cost": [1]})))
+        for t in [tdf, tdf_c]: # a container isn't a key for a single field primary key, as per __setitem__
+            self.assertTrue(firesException(lambda : t.TicDat.from_columns(foods={"name": [("a", "b")],
+                                                                                 "cost": [1]})))
+        if pd:
+            bad_index = pd.Index([("a", "b")], tupleize_cols=False, name="name")
+            self.assertTrue(firesException(lambda : tdf.TicDat(foods=pd.DataFrame({"cost": [1]}, index=bad_index))))
+        tdf = TicDatFactory(pks=[["a", "b"], ["c"]], no_pks=[[], ["a", "b"]])
+        dat = tdf.TicDat.from_columns(pks={"a": [1, 2], "b": [3, 4], "c": [5, 6]},
+                                      no_pks={"a": [1, 1], "b": [2, 2]})
+        self.assertTrue(tdf._same_data(dat, tdf.TicDat(pks={(1, 3): 5, (2, 4): 6}, no_pks=[[1, 2], [1, 2]])))
+        if pd:
+            import numpy
+            dat = tdf.TicDat.from_columns(no_pks=numpy.array([(1, 2.5)], dtype=[("b", "i8"), ("a", "f8")]))
+            self.assertTrue(list(dat.no_pks[0].items()) == [("a", 2.5), ("b", 1)])
+            self.assertTrue(type(dat.no_pks[0]["b"]) is int)
+
+    def test_freeze_flags(self):
+        tdf = TicDatFactory(**dietSchema())
+        addDietForeignKeys(tdf)
+        tdf.enable_foreign_key_links()
+        dat, unfrozen = tdf.copy_tic_dat(dietData(), freeze_it=True), tdf.copy_tic_dat(dietData())
+        row = dat.foods["pizza"]
+        self.assertTrue(row._dataFrozen and "_dataFrozen" not in row.__dict__)
+        self.assertTrue(firesException(lambda : row.__setitem__("cost", 1)))
+        self.assertTrue(firesException(lambda : setattr(row, "some_link", "linked")))
+        self.assertTrue(firesException(lambda : dat.foods.__setitem__("not a food", {})))
+        links = row.nutritionQuantities
+        self.assertTrue(links and firesException(lambda : links.__setitem__("not a category", {})))
+        unfrozen.foods["pizza"]["cost"] = 1
+        unfrozen.foods["pizza"].nutritionQuantities["not a category"] = {}
+        self.assertTrue(unfrozen.foods["pizza"]["cost"] == 1)
+
+        tdf = TicDatFactory(pks=[["a"], []], no_pks=[[], ["a", "b"]], no_data=[["a"], []])
+        dat = tdf.freeze_me(tdf.TicDat(pks=[1, 2], no_pks=[[1, 2], [3, 4]], no_data=[1]))
+        self.assertTrue(len(dat.no_pks) == 2 and dat.no_pks[1]["b"] == 4 and dat.pks[1] == {})
+        for f in [lambda : dat.no_pks.append([5, 6]), lambda : dat.no_pks.__delitem__(0),
+                  lambda : dat.no_pks.__setitem__(0, [5, 6]), lambda : dat.no_pks[0].__setitem__("a", 5),
+                  lambda : dat.pks.__setitem__(3, {})]:
+            self.assertTrue(firesException(f))
+        self.assertTrue(len(dat.no_pks) == 2 and dat.no_pks[0]["a"] == 1)
+
+    def test_copy_on_write(self):
+        tdf = TicDatFactory(**dietSchema())
+        base = tdf.freeze_me(tdf.copy_tic_dat(dietData()))
+        scenario = tdf.copy_tic_dat(base, copy_on_write=True)
+        self.assertTrue(tdf._same_data(base, scenario))
+        self.assertTrue(scenario.foods["pizza"]._data is base.foods["pizza"]._data)
+        scenario.foods["pizza"]["cost"] += 1
+        scenario.foods["new food"] = {"cost": 2}
+        self.assertTrue(scenario.foods["pizza"]["cost"] == base.foods["pizza"]["cost"] + 1)
+        self.assertTrue(scenario.foods["hamburger"]._data is base.foods["hamburger"]._data)
+        self.assertTrue("new food" not in base.foods and tdf._same_data(dietData(), base))
+        self.assertTrue(tdf.copy_tic_dat(scenario, freeze_it=True, copy_on_write=True)._isFrozen)
+        frozen = tdf.copy_tic_dat(base, freeze_it=True, copy_on_write=True)
+        self.assertTrue(all(getattr(frozen, t) is getattr(base, t) for t in tdf.all_tables))
+        self.assertTrue(tdf.good_tic_dat_object(frozen) and tdf._same_data(base, frozen))
+        self.assertTrue(firesException(lambda : frozen.foods.__setitem__("pizza", {"cost": 3})))
+        self.assertTrue(firesException(lambda : frozen.foods["pizza"].__setitem__("cost", 3)))
+        self.assertTrue(tdf.copy_tic_dat(frozen).foods is not base.foods)
+
+        unfrozen = tdf.copy_tic_dat(dietData())
+        scenario = tdf.copy_tic_dat(unfrozen, copy_on_write=True)
+        unfrozen.foods["pizza"]["cost"] += 1
+        scenario.foods["chicken"]["cost"] += 1
+        self.assertTrue(scenario.foods["pizza"]["cost"] + 1 == unfrozen.foods["pizza"]["cost"])
+        self.assertTrue(scenario.foods["chicken"]["cost"] - 1 == unfrozen.foods["chicken"]["cost"])
+        self.assertTrue(firesException(lambda : tdf.copy_tic_dat(dietData(), copy_on_write=True)))
+
+        tdf = TicDatFactory(no_pks=[[], ["a", "b"]])
+        dat = tdf.TicDat(no_pks=[[1, 2], [3, 4]])
+        dat_ = tdf.copy_tic_dat(dat, copy_on_write=True)
+        dat_.no_pks[0]["a"] = 5
+        dat_.no_pks.append([6, 7])
+        self.assertTrue([r["a"] for r in dat.no_pks] == [1, 3] and [r["a"] for r in dat_.no_pks] == [5, 3, 6])
+
+    def test_lazy_foreign_key_links(self):
+        tdf = TicDatFactory(**dietSchema())
+        addDietForeignKeys(tdf)
+        tdf.enable_foreign_key_links()
+        dat = tdf.copy_tic_dat(dietData())
+        self.assertFalse(any("nutritionQuantities" in vars(r) for r in dat.foods.values()))
+        self.assertTrue(dat.foods["chicken"].nutritionQuantities["protein"] is
+                        dat.nutritionQuantities["chicken", "protein"])
+        self.assertTrue(all("nutritionQuantities" in vars(r) for r in dat.foods.values()))
+        self.assertFalse(any("nutritionQuantities" in vars(r) for r in dat.categories.values()))
+        self.assertTrue(firesException(lambda : dat.foods["chicken"].not_a_link))
+        dat.nutritionQuantities["chicken", "fat"]["qty"] = 1000
+        del dat.nutritionQuantities["chicken", "protein"]
+        self.assertTrue(tdf.drop_foreign_key_links(dat) is dat)
+        self.assertFalse(any("nutritionQuantities" in vars(r) for r in dat.foods.values()))
+        self.assertTrue("protein" not in dat.foods["chicken"].nutritionQuantities)
+        self.assertTrue(dat.categories["fat"].nutritionQuantities["chicken"]["qty"] == 1000)
+        # rebuilding the links reuses their classes, rather than piling up new ones
+        classes = list(dat._all_data_dicts)
+        for _ in range(3):
+            tdf.drop_foreign_key_links(dat)
+            self.assertTrue(dat.foods["chicken"].nutritionQuantities["fat"]["qty"] == 1000)
+            self.assertTrue(dat.categories["fat"].nutritionQuantities["chicken"]["qty"] == 1000)
+        self.assertTrue(dat._all_data_dicts == classes)
+        dat = tdf.freeze_me(dat)
+        tdf.drop_foreign_key_links(dat)
+        self.assertTrue(dat.foods["chicken"].nutritionQuantities["fat"]["qty"] == 1000)
+        self.assertTrue(firesException(lambda : dat.foods["chicken"].nutritionQuantities.__setitem__("x", {})))
+
+    def test_indexes(self):
+        tdf = TicDatFactory(**netflowSchema())
+        tdf.add_index("arcs", ["source"])
+        tdf.add_index("cost", ["destination", "commodity"])
+        tdf.add_index("arcs", ["capacity"])
+        self.assertTrue(firesException(lambda : tdf.add_index("arcs", ["nope"])))
+        self.assertTrue(firesException(lambda : tdf.add_index("arcs", ["source"])))
+        self.assertTrue(firesException(lambda : tdf.set_columnar_tables(["arcs"])))
+        self.assertTrue(tdf.clone().indexes == tdf.indexes)
+        dat = tdf.copy_tic_dat(netflowData())
+        def scan(table, **field_values):
+            _all_fields = tdf.primary_key_fields[table] + tdf.data_fields[table]
+            return sorted(k for k, r in getattr(dat, table).items()
+                          if all(dict(zip(_all_fields, (k if utils.containerish(k) else (k,)) + r.values()))[f] == v
+                                 for f, v in field_values.items()))
+        def check_all():
+            for node in dat.nodes:
+                self.assertTrue(sorted(dat.arcs.lookup(source=node)) == scan("arcs", source=node))
+                for commodity in dat.commodities:
+                    self.assertTrue(sorted(dat.cost.lookup(commodity=commodity, destination=node)) ==
+                                    scan("cost", commodity=commodity, destination=node))
+            for capacity in {r["capacity"] for r in dat.arcs.values()}.union([12345]):
+                self.assertTrue(sorted(dat.arcs.lookup(capacity=capacity)) == scan("arcs", capacity=capacity))
+        check_all()
+        self.assertTrue(dat.arcs.lookup(source="not a node") == [])
+        self.assertTrue(firesException(lambda : dat.arcs.lookup(destination="Boston")))
+        dat.arcs["Boston", "Seattle"] = {"capacity": 12345}
+        del dat.arcs["Detroit", "Boston"]
+        dat.cost.pop(next(iter(dat.cost)))
+        dat.arcs["Denver", "Boston"]["capacity"] = 12345
+        check_all()
+        dat = tdf.freeze_me(tdf.copy_tic_dat(dat))
+        check_all()
+        # edits mixed with lookups, with the indexes kept up to date row by row
+        dat = tdf.copy_tic_dat(dat)
+        check_all()
+        for i, (k, r) in enumerate(sorted(dat.arcs.items())):
+            r["capacity"] = 12345 if i % 2 else r["capacity"] + 1
+            check_all()
+        for k in list(dat.cost)[::3]:
+            dat.cost[k]["cost"] += 1
+            self.assertTrue(k in dat.cost.lookup(commodity=k[0], destination=k[2]))
+        dat.arcs["Boston", "Seattle"] = {"capacity": 54321}
+        dat.arcs["Boston", "Seattle"]["capacity"] = 12345
+        check_all()
+        dat.arcs.pop(("Boston", "Seattle"))
+        dat.arcs["Detroit", "Boston"] = {}
+        dat.arcs["Detroit", "Boston"]["capacity"] = 777
+        check_all()
+        self.assertTrue(dat.arcs.lookup(capacity=777) == [("Detroit", "Boston")])
+        tdf.change_token(dat)
+        dat.arcs["Detroit", "Boston"]["capacity"] = 778
+        check_all()
+        self.assertTrue(dat.arcs.lookup(capacity=777) == [])
+        # the other dict editing routines keep the built indexes current as well
+        dat = tdf.copy_tic_dat(dat)
+        check_all()
+        dat.arcs.pop(("Detroit", "Boston"))
+        dat.arcs.pop(("Detroit", "Boston"), None)
+        dat.arcs.popitem()
+        dat.arcs.setdefault(("Boston", "Seattle"), {"capacity": 888})
+        dat.arcs.setdefault(("Boston", "Seattle"), {"capacity": 999})
+        dat.arcs.update({("Seattle", "Boston"): {"capacity": 888}, ("Denver", "Boston"): {"capacity": 999}})
+        dat.cost.update([(k, {"cost": 1}) for k in list(dat.cost)[::4]])
+        check_all()
+        self.assertTrue(sorted(dat.arcs.lookup(capacity=888)) == [("Boston", "Seattle"), ("Seattle", "Boston")])
+        dat.arcs["Seattle", "Boston"]["capacity"] = 999
+        check_all()
+        self.assertTrue(sorted(dat.arcs.lookup(capacity=999)) == [("Denver", "Boston"), ("Seattle", "Boston")])
+        dat.arcs.clear()
+        self.assertTrue(dat.arcs.lookup(capacity=999) == [])
+        check_all()
+
+    def test_slicer_backends(self):
+        if not utils.numpy:
+            return
+        indicies = list(itertools.product([1, 2.5, "a"], [(1, 2, 3), (2, 3, 4)], [4, 5, 6], ["x", 1]))[::-1]
+        slicers = [utils.Slicer(indicies, backend="dict"), utils.Slicer(indicies, backend="numpy"),
+                   utils.Slicer(indicies, backend="numpy", memory_budget=1)]
+        self.assertTrue(not slicers[0]._numpy and slicers[1]._numpy)
+        for _ in range(2):
+            for args in itertools.product(*[[1, 2.5, "a", "*", "no"], [(1, 2, 3), "*"], [5, "*"], ["x", "*"]]):
+                self.assertTrue(slicers[0].slice(*args) == slicers[1].slice(*args) == slicers[2].slice(*args))
+        self.assertTrue(len(slicers[1]._pattern_indexes) == 16 and len(slicers[2]._pattern_indexes) == 1)
+        slicers[1].clear()
+        self.assertFalse(slicers[1]._pattern_indexes)
+        self.assertTrue(slicers[1].slice("a", "*", 6, 1) == [("a", (2, 3, 4), 6, 1), ("a", (1, 2, 3), 6, 1)])
+        self.assertTrue(utils.Slicer([], backend="numpy").slice(1, 2) == [])
+        self.assertTrue(firesException(lambda : utils.Slicer(indicies, backend="nope")))
+
+    def test_vectorized_row_predicates(self):
+        if not utils.DataFrame:
+            return
+        tdf = TicDatFactory(**dietSchema())
+        tdf.add_data_row_predicate("categories", "minNutrition <= maxNutrition", "minmax")
+        tdf.add_data_row_predicate("nutritionQuantities", lambda df: (df["category"] == "fat") | (df["qty"] > 5),
+                                   "qty", predicate_vectorized=True)
+        tdf.add_data_row_predicate("nutritionQuantities", lambda df, small: (df["qty"] > small).where(
+                                   df["qty"] > small, "small"), "qty_msg", predicate_vectorized=True,
+                                   predicate_kwargs_maker=lambda dat: {"small": 5},
+                                   predicate_failure_response="Error Message")
+        tdf = tdf.clone()
+        dat = tdf.copy_tic_dat(dietData())
+        dat.categories["fat"]["minNutrition"] = 100
+        fails = tdf.find_data_row_failures(dat)
+        self.assertTrue(fails["categories", "minmax"] == ("fat",))
+        small = {k for k, r in dat.nutritionQuantities.items() if r["qty"] <= 5}
+        self.assertTrue(small and set(fails["nutritionQuantities", "qty"]) == {k for k in small if k[1] != "fat"})
+        self.assertTrue(set(fails["nutritionQuantities", "qty_msg"]) == {(k, "small") for k in small})
+        self.assertTrue(sum(map(len, tdf.find_data_row_failures(dat, max_failures=2).values())) == 2)
+
+        tdf = TicDatFactory(table=[[], ["a", "b"]])
+        tdf.add_data_row_predicate("table", "a < b")
+        tdf.add_data_row_predicate("table", lambda df: df["c"] > 0, "oops", predicate_vectorized=True)
+        dat = tdf.TicDat(table=[[1, 2], [3, 2], [0, 1], [5, 5]])
+        fails = tdf.find_data_row_failures(dat, exception_handling="Handled as Failure")
+        self.assertTrue(fails["table", 0] == (1, 3) and fails["table", "oops"] == (0, 1, 2, 3))
+        self.assertTrue(firesException(lambda: tdf.find_data_row_failures(dat, exception_handling="Unhandled")))
+        tdf = TicDatFactory(table=[[], ["a", "b"]])
+        tdf.add_data_row_predicate("table", lambda df: (df["a"] < df["b"]).sort_values(), "sorted",
+                                   predicate_vectorized=True) # aligned by label, and not by position
+        tdf.add_data_row_predicate("table", lambda df: (df["a"] < df["b"]).reset_index(drop=True).shift(10),
+                                   "misaligned", predicate_vectorized=True)
+        fails = tdf.find_data_row_failures(dat, exception_handling="Handled as Failure")
+        self.assertTrue(fails["table", "sorted"] == (1, 3) and fails["table", "misaligned"] == (0, 1, 2, 3))
+    def test_foreign_key_set_caching(self):
+        tdf = TicDatFactory(parent=[["Id"], ["Code", "Name"]], child=[["Id"], ["Code"]], plain=[[], ["Name"]],
+                            kid=[["Id"], ["Name"]])
+        tdf.add_foreign_key("child", "parent", ["Code", "Code"])
+        tdf.add_foreign_key("kid", "plain", ["Name", "Name"])
+        dat = tdf.TicDat(parent=[[1, "a", "x"], [2, "b", "y"]], child=[[1, "a"], [2, "b"], [3, "c"]],
+                         plain=[["x"], ["y"]], kid=[[1, "x"], [2, "z"]])
+        def fails():
+            return {k[0]: set(v.native_pks) for k, v in tdf.find_foreign_key_failures(dat).items()}
+        self.assertTrue(fails() == {"child": {3}, "kid": {2}})
+        cached = {k: v[2] for k, v in dat._foreign_key_sets.items()}
+        self.assertTrue(set(cached) == {("parent", ("Code",)), ("plain", ("Name",))})
+        self.assertTrue(fails() == {"child": {3}, "kid": {2}})
+        self.assertTrue(all(dat._foreign_key_sets[k][2] is v for k, v in cached.items()))
+        dat.parent[2]["Name"] = "w" # not a foreign key field, so the key set is still good
+        dat.parent[1]["Code"] = "c"
+        dat.plain.append({"Name": "z"})
+        self.assertTrue(fails() == {"child": {1}})
+        dat.parent[3] = ["a", "x"]
+        dat.plain[0]["Name"] = "q"
+        self.assertTrue(fails() == {"kid": {1}})
+        del dat.parent[1]
+        dat.plain[0] = {"Name": "x"}
+        self.assertTrue(fails() == {"child": {3}})
+        dat = tdf.freeze_me(dat)
+        self.assertTrue(fails() == {"child": {3}})
+        self.assertTrue(set(tdf.remove_foreign_key_failures(tdf.copy_tic_dat(dat)).child) == {1, 2})
+    def test_remove_foreign_key_failures_worklist(self):
+        tdf = TicDatFactory(grand=[["G"], []], parent=[["P"], ["G"]], child=[[], ["P", "G"]],
+                            tree=[["Node"], ["Parent"]])
+        tdf.add_foreign_key("child", "parent", ["P", "P"])
+        tdf.add_foreign_key("child", "grand", ["G", "G"])
+        tdf.add_foreign_key("parent", "grand", ["G", "G"])
+        tdf.add_foreign_key("tree", "tree", ["Parent", "Node"])
+        def make_dat():
+            return tdf.TicDat(grand=[[1], [2]], parent=[["a", 1], ["b", 2], ["c", 3]],
+                              child=[["a", 1], ["b", 1], ["c", 1], ["c", 3], ["d", 1]],
+                              tree=[["r", "r"], ["x", "r"], ["y", "q"], ["z", "y"]])
+        dat, removed = tdf.remove_foreign_key_failures(make_dat(), return_removed_keys=True)
+        self.assertTrue({k: set(v) for k, v in removed.items()} ==
+                        {"parent": {"c"}, "child": {2, 3, 4}, "tree": {"y", "z"}})
+        self.assertFalse(tdf.find_foreign_key_failures(dat))
+        self.assertTrue([tuple(r.values()) for r in dat.child] == [("a", 1), ("b", 1)])
+        self.assertTrue(tdf._same_data(dat, tdf.remove_foreign_key_failures(make_dat())))
+        self.assertTrue(tdf.remove_foreign_key_failures(dat, return_removed_keys=True)[1] == {})
+        dat, removed = tdf.remove_foreign_key_failures(make_dat(), propagate=False, return_removed_keys=True)
+        self.assertTrue({k: set(v) for k, v in removed.items()} ==
+                        {"parent": {"c"}, "child": {3, 4}, "tree": {"y"}})
+        self.assertTrue(set(tdf.find_foreign_key_failures(dat, verbosity="Low")) ==
+                        {("child", "parent", ("P", "P")), ("tree", "tree", ("Parent", "Node"))})
+
+        deep = tdf.TicDat(tree=[[0, "nope"]] + [[i, i-1] for i in range(1, 1100)])
+        deep, removed = tdf.remove_foreign_key_failures(deep, return_removed_keys=True)
+        self.assertTrue(not deep.tree and len(removed["tree"]) == 1100) # deeper than the recursion limit
+    def test_check_all(self):
+        tdf = TicDatFactory(**dietSchema())
+        addDietForeignKeys(tdf)
+        tdf.set_data_type("foods", "cost", max=10)
+        tdf.add_data_row_predicate("categories", lambda row: row["minNutrition"] <= row["maxNutrition"], "minmax")
+        tdf.add_data_row_predicate("nutritionQuantities", lambda row: row["qty"] > 5 or "small",
+                                   predicate_failure_response="Error Message")
+        dat = tdf.copy_tic_dat(dietData())
+        dat.foods["pizza"]["cost"] = 100
+        dat.categories["fat"]["minNutrition"] = 100
+        dat.nutritionQuantities["pizza", "junk"] = 7
+        dat.nutritionQuantities["junk", "fat"] = 3
+        report = tdf.check_all(dat)
+        self.assertTrue(report.data_type_failures == tdf.find_data_type_failures(dat))
+        self.assertTrue(report.data_row_failures == tdf.find_data_row_failures(dat))
+        self.assertTrue(report.foreign_key_failures == tdf.find_foreign_key_failures(dat))
+        self.assertTrue(all(report))
+        for max_failures in [1, 2, 5]:
+            report = tdf.check_all(dat, max_failures=max_failures)
+            self.assertTrue(sum(len(v.pks) for v in report.data_type_failures.values()) +
+                            sum(len(v) for v in report.data_row_failures.values()) +
+                            sum(len(v.native_pks) for v in report.foreign_key_failures.values()) == max_failures)
+        tdf = TicDatFactory(**dietSchema())
+        self.assertFalse(any(tdf.check_all(tdf.copy_tic_dat(dietData()))))
+    def test_n_jobs(self):
+        tdf = TicDatFactory(**dietSchema())
+        addDietForeignKeys(tdf)
+        tdf.set_data_type("foods", "cost", max=10)
+        tdf.set_data_type("categories", "maxNutrition", max=1000)
+        tdf.add_data_row_predicate("categories", lambda row: row["minNutrition"] <= row["maxNutrition"], "minmax")
+        tdf.add_data_row_predicate("nutritionQuantities", lambda row, small: row["qty"] > small or "small",
+                                   predicate_kwargs_maker=lambda dat: {"small": len(dat.foods) / 2},
+                                   predicate_failure_response="Error Message")
+        dat = tdf.copy_tic_dat(dietData())
+        dat.foods["pizza"]["cost"] = 100
+        dat.categories["fat"]["minNutrition"] = 100
+        dat.nutritionQuantities["junk", "fat"] = 3
+        for n_jobs in [2, -1]:
+            self.assertTrue(tdf.find_data_type_failures(dat, n_jobs=n_jobs) == tdf.find_data_type_failures(dat))
+            self.assertTrue(tdf.find_data_row_failures(dat, n_jobs=n_jobs) == tdf.find_data_row_failures(dat))
+            self.assertTrue(tdf.find_foreign_key_failures(dat, n_jobs=n_jobs) == tdf.find_foreign_key_failures(dat))
+            self.assertTrue(tdf.check_all(dat, n_jobs=n_jobs) == tdf.check_all(dat) and all(tdf.check_all(dat)))
+        self.assertTrue(len(tdf.find_data_row_failures(dat, n_jobs=2, max_failures=1)) == 1)
+        self.assertTrue(sum(map(len, tdf.check_all(dat, n_jobs=2, max_failures=2))) == 2)
+        self.assertTrue(firesException(lambda: tdf.find_data_type_failures(dat, n_jobs=0)))
+    def test_change_tracking(self):
+        tdf = TicDatFactory(**dietSchema())
+        addDietForeignKeys(tdf)
+        tdf.set_data_type("foods", "cost", max=10)
+        tdf.add_data_row_predicate("nutritionQuantities", lambda row: row["qty"] != 13, "not13")
+        tdf.add_data_row_predicate("foods", lambda row, most: row["cost"] <= most, "cheapish",
+                                   predicate_kwargs_maker=lambda dat: {"most": 2})
+        def fk_fails(since=None):
+            return {k.native_table: set(v.native_pks) for k, v in
+                    tdf.find_foreign_key_failures(dat, since=since).items()}
+        dat = tdf.copy_tic_dat(dietData())
+        self.assertTrue(firesException(lambda: tdf.find_data_type_failures(dat, since=0)))
+        token = tdf.change_token(dat)
+        self.assertTrue(tdf.change_token(dat) == token)
+        for since in [None, token]:
+            self.assertFalse(tdf.find_data_type_failures(dat, since=since))
+            self.assertFalse(tdf.find_foreign_key_failures(dat, since=since))
+        self.assertTrue(set(tdf.find_data_row_failures(dat, since=token)) == {("foods", "cheapish")})
+        dat.foods["pizza"]["cost"] = 100
+        dat.nutritionQuantities["milk", "fat"]["qty"] = 13
+        dat.nutritionQuantities["junk", "fat"] = 13
+        self.assertTrue(tdf.change_token(dat) > token)
+        self.assertTrue(tdf.find_data_type_failures(dat, since=token) == tdf.find_data_type_failures(dat))
+        # the failed rows are gathered into sets, so their order in the returned tuples isn't repeatable
+        row_fails = lambda since=None: {k: set(v) for k, v in tdf.find_data_row_failures(dat, since=since).items()}
+        self.assertTrue(row_fails(token) == row_fails())
+        self.assertTrue(fk_fails(token) == fk_fails() == {"nutritionQuantities": {("junk", "fat")}})
+        token = tdf.change_token(dat)
+        self.assertFalse(tdf.find_data_type_failures(dat, since=token))
+        self.assertFalse(tdf.find_foreign_key_failures(dat, since=token))
+        self.assertTrue(set(tdf.find_data_row_failures(dat, since=token)) == {("foods", "cheapish")})
+        del dat.nutritionQuantities["junk", "fat"]
+        dat.foods.pop("hamburger")
+        self.assertTrue(fk_fails(token) == {"nutritionQuantities": {("hamburger", c) for c in dat.categories}})
+        self.assertFalse(tdf.find_data_type_failures(dat, since=token))
+        token = tdf.change_token(dat)
+        dat.foods["hamburger"] = {"cost": 2.49}
+        dat.nutritionQuantities["hamburger", "fat"]["qty"] = 26
+        dat.categories.clear()
+        self.assertTrue(fk_fails(token) == fk_fails() == {"nutritionQuantities": set(dat.nutritionQuantities)})
+        # repeated edits of the same rows don't grow the change log, and the older tokens still see them
+        log_size = len(dat._change_tracking[0]._positions)
+        old_token, token = token, tdf.change_token(dat)
+        for i in range(1000):
+            dat.foods["pizza"]["cost"] = i
+            dat.foods["milk"] = {"cost": i}
+        self.assertTrue(len(dat._change_tracking[0]._positions) <= log_size + 2)
+        mid_token = tdf.change_token(dat)
+        dat.foods["milk"]["cost"] = 1
+        self.assertTrue(tdf._dirty_keys(dat, old_token)["foods"].issuperset({"pizza", "milk", "hamburger"}))
+        self.assertTrue(tdf._dirty_keys(dat, token)["foods"] == {"pizza", "milk"})
+        self.assertTrue(tdf._dirty_keys(dat, mid_token)["foods"] == {"milk"})
+        self.assertTrue(tdf._dirty_keys(dat, tdf.change_token(dat))["foods"] == set())
+        dat = tdf.freeze_me(tdf.copy_tic_dat(dat))
+        token = tdf.change_token(dat)
+        self.assertTrue(token == 0 and not tdf.find_foreign_key_failures(dat, since=token))
+        self.assertTrue(firesException(lambda: tdf.find_data_type_failures(dat, since=1)))
+
+        tdf = TicDatFactory(parent=[["Name"], []], kids=[[], ["Parent"]])
+        tdf.add_foreign_key("kids", "parent", ["Parent", "Name"])
+        dat = tdf.TicDat(parent=[["a"], ["b"]], kids=[["a"], ["b"]])
+        token = tdf.change_token(dat)
+        self.assertFalse(tdf.find_foreign_key_failures(dat, since=token))
+        dat.kids[0]["Parent"] = "c"
+        self.assertTrue(tdf.find_foreign_key_failures(dat, since=token) == tdf.find_foreign_key_failures(dat))
+    def test_same_data_multiset(self):
+        tdf = TicDatFactory(sol=[[], ["a", "b", "x"]])
+        tdf.set_generator_tables(["sol"])
+        rows = [[i % 7, "s%s" % (i % 5), i / 3] for i in range(200)]
+        dat = tdf.TicDat(sol=rows)
+        self.assertTrue(tdf._same_data(dat, tdf.TicDat(sol=rows[::-1])))
+        self.assertFalse(tdf._same_data(dat, tdf.TicDat(sol=rows[:-1] + [rows[0]])))
+        self.assertTrue(tdf._same_data(tdf.TicDat(sol=[[1, "a", 1]] * 2 + [[2, "b", 2]]),
+                                       tdf.TicDat(sol=[[2, "b", 2], [1, "a", 1.0], [1, "a", 1]])))
+        self.assertFalse(tdf._same_data(tdf.TicDat(sol=[[1, "a", 1]] * 2 + [[2, "b", 2]]),
+                                        tdf.TicDat(sol=[[1, "a", 1]] + [[2, "b", 2]] * 2)))
+        nearly = [[a, b, x * (1 + 1e-9)] for a, b, x in rows]
+        self.assertFalse(tdf._same_data(dat, tdf.TicDat(sol=nearly)))
+        self.assertTrue(tdf._same_data(dat, tdf.TicDat(sol=nearly[::-1]), epsilon=1e-6))
+        self.assertFalse(tdf._same_data(dat, tdf.TicDat(sol=nearly[:-1] + [[0, "s1", 100]]), epsilon=1e-6))
+        tdf = TicDatFactory(sol=[[], ["a", "b", "x"]])
+        nans = [[a, b, float("nan") if a == 3 else x] for a, b, x in rows]
+        self.assertFalse(tdf._same_data(tdf.TicDat(sol=nans), tdf.TicDat(sol=nans[::-1])))
+        self.assertTrue(tdf._same_data(tdf.TicDat(sol=nans), tdf.TicDat(sol=nans[::-1]),
+                                       nans_are_same_for_data_rows=True))
+        tdf = TicDatFactory(t=[[], ["x"]]) # the pairing can't be greedy, since nearly the same isn't transitive
+        for rows in [[[1.02], [1.0]], [[1.0], [1.02]]]:
+            self.assertTrue(tdf._same_data(tdf.TicDat(t=rows), tdf.TicDat(t=[[1.01], [1.035]]), epsilon=0.025))
+            self.assertTrue(tdf._same_data(tdf.TicDat(t=rows), tdf.TicDat(t=[[1.0], [0.98]]), epsilon=0.025))
+            self.assertFalse(tdf._same_data(tdf.TicDat(t=rows), tdf.TicDat(t=[[1.01], [1.05]]), epsilon=0.025))
+        tdf = TicDatFactory(t=[[], ["x", "y"]])
+        self.assertTrue(tdf._same_data(tdf.TicDat(t=[[1.02, [1]], [1.0, [1]]]),
+                                       tdf.TicDat(t=[[1.01, [1]], [1.035, [1]]]), epsilon=0.025)) # unhashable rows
+        # identical rows are paired up as one group, so many duplicates don't make the pairing search blow up
+        dups = lambda last, n=5000: tdf.TicDat(t=[["s", 1.0]] * n + [["t", last], ["s", last]])
+        start = time.time()
+        self.assertTrue(tdf._same_data(dups(2.0), dups(2.0000001), epsilon=1e-6))
+        self.assertFalse(tdf._same_data(dups(2.0), dups(2.1), epsilon=1e-6))
+        self.assertFalse(tdf._same_data(dups(2.0), dups(1.0000001), epsilon=1e-6))
+        self.assertTrue(tdf._same_data(dups(1.0), dups(1.0000001), epsilon=1e-6))
+        self.assertTrue(time.time() - start < 10)
+    def test_good_tic_dat_object_memo(self):
+        tdf = TicDatFactory(**dietSchema())
+        self.assertTrue(tdf.good_tic_dat_object(dietData(), row_checking="generous") and
+                        not tdf._good_objects) # tdf hasn't been used yet, so its schema can still change
+        dat = tdf.copy_tic_dat(dietData())
+        self.assertTrue(tdf.good_tic_dat_object(dat) and set(tdf._good_objects[dat]) == {"strict"})
+        dict.__setitem__(dat.foods, "bad", "not a row") # bypasses the table, and thus isn't noticed
+        self.assertTrue(tdf.good_tic_dat_object(dat) and tdf.good_tic_dat_object(dat, row_checking="generous"))
+        dat.foods["ok"] = {"cost": 1}
+        self.assertFalse(tdf.good_tic_dat_object(dat))
+        del dat.foods["bad"]
+        self.assertTrue(tdf.good_tic_dat_object(dat))
+        dat.foods.update({"bad": {"not a field": 1}})
+        self.assertFalse(tdf.good_tic_dat_object(dat))
+        dat = tdf.freeze_me(tdf.copy_tic_dat(dietData()))
+        self.assertTrue(tdf.good_tic_dat_object(dat) and tdf._good_objects[dat]["strict"][1] ==
+                        (None,) * len(tdf.all_tables))
+        dat = tdf.copy_tic_dat(dietData())
+        dat.foods = {"pizza": {"cost": 1}} # a plain dict has no version, so nothing is memoized
+        self.assertTrue(tdf.good_tic_dat_object(dat, row_checking="generous") and dat not in tdf._good_objects)
+        tdf = TicDatFactory(**dietSchema())
+        tdf.add_foreign_key("nutritionQuantities", "foods", ["food", "name"])
+        tdf.enable_foreign_key_links() # the link builders of the rows refer back to the TicDat object
+        dat = tdf.copy_tic_dat(dietData())
+        self.assertTrue(tdf.good_tic_dat_object(dat) and len(tdf._good_objects) == 1)
+        del dat
+        gc.collect()
+        self.assertFalse(tdf._good_objects) # the memo doesn't keep the data object alive
+    def test_compile(self):
+        tdf = TicDatFactory(**dietSchema())
+        compiled = tdf.compile()
+        self.assertTrue(compiled is tdf.compile())
+        self.assertTrue(compiled.all_fields["nutritionQuantities"] == ("food", "category", "qty"))
+        self.assertTrue(compiled.field_positions["categories"]["maxNutrition"] == 2)
+        self.assertFalse(compiled.foreign_keys)
+        self.assertTrue(set(compiled.data_types) == set(tdf.all_tables))
+        self.assertTrue(compiled.data_types["foods"]["name"].valid_data("pizza") and
+                        not compiled.data_types["foods"]["name"].valid_data(None))
+        tdf.add_foreign_key("nutritionQuantities", "foods", ["food", "name"])
+        self.assertFalse(compiled is tdf.compile())
+        compiled = tdf.compile()
+        self.assertTrue(compiled.foreign_keys == tdf.foreign_keys and len(compiled.foreign_keys) == 1)
+        fk = compiled.foreign_keys[0]
+        self.assertTrue(compiled.foreign_keys_by_native["nutritionQuantities"] == {fk})
+        self.assertTrue(compiled.foreign_key_plans[fk] == (("name",), ("food",), True))
+        self.assertTrue(compiled.foreign_key_ranks["foods"] < compiled.foreign_key_ranks["nutritionQuantities"])
+        tdf.set_data_type("foods", "cost", min=0, max=10)
+        self.assertFalse(compiled is tdf.compile())
+        self.assertTrue(tdf.compile().data_types["foods"]["cost"].valid_data(5) and
+                        not tdf.compile().data_types["foods"]["cost"].valid_data(11))
+        dat = tdf.copy_tic_dat(dietData())
+        dat.foods["pizza"]["cost"] = 11
+        self.assertTrue(set(tdf.find_data_type_failures(dat)) == {("foods", "cost")})
+    def test_cell_converters(self):
+        tdf = TicDatFactory(**dietSchema())
+        self.assertTrue(tdf._cell_reader("foods", "cost") is None and tdf._cell_writer("foods", "cost") is None)
+        self.assertTrue(tdf._general_read_cell("foods", "cost", 1e12) == 1e12)
+        tdf.set_infinity_io_flag(999)
+        self.assertTrue(tdf._cell_reader("foods", "cost") is tdf._cell_reader("foods", "cost"))
+        self.assertTrue([tdf._general_read_cell("foods", "cost", x) for x in [1e12, -999, 5, "a"]] ==
+                        [float("inf"), -float("inf"), 5, "a"])
+        self.assertTrue([tdf._infinity_flag_write_cell("foods", "cost", x) for x in [float("inf"), 5, None]] ==
+                        [999, 5, None])
+        tdf.set_infinity_io_flag(None)
+        self.assertTrue(tdf._cell_reader("foods", "name") is None and tdf._cell_writer("foods", "cost") is None)
+        tdf.set_data_type("foods", "cost", max=float("inf"), inclusive_max=True)
+        self.assertTrue(tdf._general_read_cell("foods", "cost", None) == float("inf") and
+                        tdf._infinity_flag_write_cell("foods", "cost", float("inf")) is None)
+        tdf.set_data_type("foods", "cost", min=-float("inf"), inclusive_min=True, max=float("inf"),
+                          inclusive_max=True)
+        self.assertTrue(tdf._general_read_cell("foods", "cost", 3) == 3) # only a None read is ambiguous
+        self.assertTrue(self.firesException(lambda: tdf._general_read_cell("foods", "cost", None)))
+        tdf = TicDatFactory(parameters=[["Key"], ["Value"]])
+        tdf.add_parameter("Big", 0, max=float("inf"), inclusive_max=True)
+        tdf.set_infinity_io_flag(999)
+        self.assertTrue(tdf._cell_reader("parameters", "Value") is None and
+                        tdf._infinity_flag_write_cell("parameters", "Value", float("inf")) == "inf")
+    def test_slicer_add_remove(self):
+        import random
+        rand = random.Random(0)
+        backends = ["auto", "dict"] + (["numpy"] if utils.numpy else [])
+        indicies = [(rand.randint(0, 5), rand.choice("abc"), (rand.randint(0, 2),)) for _ in range(200)]
+        slicers = [utils.Slicer(indicies, backend=_) for _ in backends]
+        all_args = list(itertools.product(*[list(range(7)) + ["*"], ["a", "b", "c", "d", "*"],
+                                           [(0,), (1,), (2,), (3,), "*"]]))
+        def check():
+            for args in rand.sample(all_args, 40):
+                expected = [t for t in indicies if all(a == "*" or a == x for a, x in zip(args, t))]
+                for slicer in slicers:
+                    self.assertTrue(slicer.slice(*args) == expected)
+        check()
+        for _ in range(3000):
+            if indicies and rand.random() < 0.5:
+                t = rand.choice(indicies)
+                indicies.remove(t) # the Slicer also removes the first occurrence
+                for slicer in slicers:
+                    slicer.remove(*t)
+            else:
+                t = (rand.randint(0, 6), rand.choice("abcd"), (rand.randint(0, 3),))
+                indicies.append(t)
+                for slicer in slicers:
+                    slicer.add(*t)
+            if rand.random() < 0.02:
+                check()
+        check()
+        for slicer in slicers:
+            self.assertTrue(firesException(lambda : slicer.remove("not", "an", "index")))
+            self.assertTrue(firesException(lambda : slicer.add(1, 2)))
+        slicer = utils.Slicer([], backend="numpy" if utils.numpy else "dict")
+        slicer.add(1, 2)
+        slicer.add(1, 3)
+        self.assertTrue(slicer.slice(1, "*") == [(1, 2), (1, 3)])
+        slicer.remove(1, 2)
+        self.assertTrue(slicer.slice(1, "*") == [(1, 3)])
+
 _scratchDir = TestUtils.__name__ + "_scratch"
 
 # Run the tests.
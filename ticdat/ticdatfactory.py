@@ -6,7 +6,7 @@ import collections as clt
 from collections import namedtuple, defaultdict
 import ticdat.utils as utils
 from ticdat.utils import verify, freezable_factory, FrozenDict, FreezeableDict
-from ticdat.utils import dictish, containerish, deep_freeze, lupish, safe_apply
+from ticdat.utils import dictish, containerish, deep_freeze, lupish, safe_apply, stringish
 from ticdat.utils import ForeignKey, ForeignKeyMapping, TypeDictionary, RowPredicateInfo
 from string import ascii_uppercase as uppercase
 from itertools import count
@@ -18,6 +18,7 @@ import ticdat.jsontd as json
 from ticdat.pgtd import PostgresTicFactory
 import sys
 import math
+import weakref
 try:
     import amplpy
 except:
@@ -25,6 +26,23 @@ except:
 
 pd, DataFrame = utils.pd, utils.DataFrame # if pandas not installed will be falsey
 
+# the namedtuples returned by the find_ functions are defined here, so that they can be pickled back from the
+# worker processes (see the n_jobs arguments)
+TableField = namedtuple("TableField", ["table", "field"])
+ValuesPks = namedtuple("ValuesPks", ["bad_values", "pks"])
+TablePredicateName = namedtuple("TablePredicateName", ["table", "predicate_name"])
+PrimaryKeyErrorMessage = namedtuple("PrimaryKeyErrorMessage", ["primary_key", "error_message"])
+ForeignKeyFailures = namedtuple("ForeignKeyFailures", ("native_values", "native_pks"))
+
+# see TicDatFactory.compile
+CompiledSchema = namedtuple("CompiledSchema", ["all_fields", "field_positions", "foreign_keys",
+                                               "foreign_keys_by_native", "foreign_key_ranks", "foreign_key_plans",
+                                               "data_types"])
+# foreign_fields are the foreign table fields matched by a foreign key (in the field order of the foreign table), and
+# native_fields the native table fields that map to them. unpack_single is True if the foreign fields are the lone
+# primary key field of the foreign table (so that a native value can be looked up directly in the foreign table)
+ForeignKeyPlan = namedtuple("ForeignKeyPlan", ["foreign_fields", "native_fields", "unpack_single"])
+
 def _keylen(k) :
     if not utils.containerish(k) :
         return 1
@@ -34,6 +52,26 @@ def _keylen(k) :
         rtn = 0
     return rtn
 
+class _ChangeLog(object):
+    # the change log of a tracked ticdat object (see TicDatFactory.change_token). The entries are
+    # (table, primary key) pairs, with None standing in for the whole table. Each entry is kept only at the position
+    # of its latest edit, so the log grows with the number of distinct rows edited rather than the number of edits
+    def __init__(self):
+        self._count = 0
+        self._positions = clt.OrderedDict() # entry -> position of its latest edit, in position order
+    def append(self, entry):
+        self._positions.pop(entry, None)
+        self._positions[entry] = self._count
+        self._count += 1
+    def __len__(self):
+        return self._count
+    def since(self, position):
+        # the entries edited at or after position, latest first
+        for entry in reversed(self._positions):
+            if self._positions[entry] < position:
+                return
+            yield entry
+
 class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl_prepend"})) :
     """
     Primary class for ticdat library. This class is constructed with a schema.
@@ -141,6 +179,12 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
     def generator_tables(self):
         return deep_freeze(self._generator_tables)
     @property
+    def columnar_tables(self):
+        return deep_freeze(self._columnar_tables)
+    @property
+    def indexes(self):
+        return deep_freeze(self._indexes)
+    @property
     def default_values(self):
         return deep_freeze(self._default_values)
     @property
@@ -201,6 +245,7 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                                                                      min, max, must_be_int, strings_allowed, nullable,
                                                                      datetime)
         self._none_as_infinity_bias_cache.clear()
+        self._compiled.clear()
 
     def clear_data_type(self, table, field):
         """
@@ -220,10 +265,11 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                "The data types can't be changed after a TicDatFactory has been used.")
         del(self._data_types[table][field])
         self._none_as_infinity_bias_cache.clear()
+        self._compiled.clear()
 
     def add_data_row_predicate(self, table, predicate, predicate_name=None,
                                predicate_kwargs_maker=None,
-                               predicate_failure_response="Boolean"):
+                               predicate_failure_response="Boolean", predicate_vectorized=False):
         """
         The purpose of calling add_data_row_predicate is to prepare for a future call to find_data_row_failures.
         See https://bit.ly/3e9pdCP for more details on these two functions.
@@ -255,6 +301,15 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                                            a clean row by returning True (the one and only literal True in Python)
                                            and a dirty row by returning a non-empty string (which is an error message).
 
+        :param predicate_vectorized: boolean. If truthy, then predicate checks the entire table at once, instead of
+                                     being called once per row. The table is passed as a DataFrame with a column
+                                     for each field (so pandas is required). predicate is then either a
+                                     DataFrame.eval expression string (e.g. "min_supply <= max_supply", with any
+                                     predicate_kwargs available as @ variables) or a function that accepts this
+                                     DataFrame (along with any predicate_kwargs) and returns a Series with an entry for
+                                     each row. These entries follow predicate_failure_response, exactly as the
+                                     row-by-row return values would. An expression string implies predicate_vectorized.
+
         See find_data_row_failures for details on handling exceptions thrown by predicate or predicate_kwargs_maker.
         :return:
         """
@@ -269,7 +324,10 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                 self._data_row_predicates[table].pop(predicate_name, None)
             return
 
-        verify(callable(predicate), "predicate should be a one argument function")
+        predicate_vectorized = bool(predicate_vectorized or stringish(predicate))
+        verify(callable(predicate) or stringish(predicate),
+               "predicate should be a one argument function or a DataFrame.eval expression string")
+        verify(not predicate_vectorized or DataFrame, "pandas needs to be installed to use vectorized row predicates")
         verify(not predicate_kwargs_maker or callable(predicate_kwargs_maker),
                "predicate_kwargs_maker should be a one argument function")
         verify(predicate_failure_response in ["Boolean", "Error Message"],
@@ -277,7 +335,8 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         if predicate_name is None:
             predicate_name = next(i for i in count() if i not in self._data_row_predicates[table])
         self._data_row_predicates[table][predicate_name] = RowPredicateInfo(predicate, predicate_kwargs_maker,
-                                                                            predicate_failure_response)
+                                                                            predicate_failure_response,
+                                                                            predicate_vectorized)
 
     def add_parameter(self, name, default_value, number_allowed = True,
                       inclusive_min = True, inclusive_max = False, min = 0, max = float("inf"),
@@ -333,6 +392,7 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
             verify(td.valid_data(default_value), f"{default_value} is not a legal default value for parameter {name}")
         ParameterInfo = namedtuple("ParameterInfo", ["type_dictionary", "default_value"])
         self._parameters[name] = ParameterInfo(td, default_value)
+        self._compiled.clear()
 
     def set_default_value(self, table, field, default_value):
         """
@@ -352,6 +412,7 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         verify(field in self.data_fields[table], "%s does not refer to a data field for %s"%(field, table))
         verify(utils.acceptable_default(default_value), "%s can not be used as a default value"%default_value)
         self._default_values[table][field] = default_value
+        self._compiled.clear()
 
     def set_default_values(self, **tableDefaults):
         """
@@ -376,6 +437,7 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                 %k)
             verify(all(utils.acceptable_default(_v) for _v in v.values()), "some default values are unacceptable")
             self._default_values[k] = dict(self._default_values[k], **v)
+        self._compiled.clear()
     def set_generator_tables(self, g):
         """
         sets which tables are to be generator tables. Generator tables are represented as generators
@@ -396,6 +458,60 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         verify(not any(self.primary_key_fields.get(t) for t in g),
                "Can not make generators from tables with primary keys")
         self._generator_tables[:] = [_ for _ in g]
+        self._compiled.clear()
+    def set_columnar_tables(self, c):
+        """
+        sets which tables are to use columnar storage. Rather than creating a separate row object for every
+        primary key, a columnar table keeps its primary keys in a hash index and stores each data field in its own
+        column (a typed array.array when the data allows, a list otherwise). The table still behaves like a dict
+        mapping primary keys to rows, i.e. dat.table[pk]["field"] reads and writes as usual, but the rows it serves
+        are light weight views onto the columns. This greatly reduces the memory footprint of large tables, and
+        speeds up copy_to_pandas.
+
+        Columnar tables need to have primary key fields, and are skipped over when creating foreign key links
+        (see enable_foreign_key_links), since their rows can't hold link attributes.
+
+        :param c: An iterable of table names.
+
+        :return:
+        """
+        verify(not self._has_been_used,
+               "The columnar tables can't be changed after a TicDatFactory has been used.")
+        verify(containerish(c) and set(c).issubset(self.all_tables),
+               "columnar_tables should be a container of table names")
+        verify(not set(c).intersection(self.generic_tables),
+               "Columnar tables cannot refer to generic tables.")
+        verify(all(self.primary_key_fields.get(t) for t in c),
+               "Can only use columnar storage for tables with primary keys")
+        verify(not set(c).intersection(self._indexes), "Columnar tables cannot have secondary indexes.")
+        self._columnar_tables[:] = [_ for _ in c]
+        self._compiled.clear()
+    def add_index(self, table, fields):
+        """
+        adds a secondary index to a table, so that the rows matching particular values for some fields can be
+        found without scanning the table. For ex.
+        tdf.add_index("arcs", ["source"])
+        allows the primary keys of the arcs leaving "Boston" to be found with
+        dat.arcs.lookup(source="Boston")
+        The index is built the first time it is used, and kept up to date as rows are added to or removed from
+        the table. Editing an indexed data field of a row causes the index to be rebuilt the next time it is used.
+
+        :param table: a table with primary key fields. Can't be a columnar table.
+
+        :param fields: a container of fields of table (primary key fields or data fields)
+
+        :return:
+        """
+        verify(not self._has_been_used,
+               "The indexes can't be changed after a TicDatFactory has been used.")
+        verify(self.primary_key_fields.get(table) and table not in self.generic_tables,
+               "%s is not a table with primary key fields"%table)
+        verify(table not in self._columnar_tables, "Columnar tables cannot have secondary indexes.")
+        verify(containerish(fields) and fields and set(fields).issubset(self._allFields(table)) and
+               len(set(fields)) == len(fields), "fields should be a container of distinct fields of %s"%table)
+        verify(frozenset(fields) not in map(frozenset, self._indexes.get(table, ())),
+               "%s already has an index on these fields"%table)
+        self._indexes.setdefault(table, []).append(tuple(fields))
     def clear_foreign_keys(self, native_table = None):
         """
         create a TicDatFactory
@@ -413,8 +529,11 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                 deleteme.append((nt,ft))
         for nt, ft in deleteme:
             del(self._foreign_keys[nt,ft])
+        self._compiled.clear()
     @property
     def foreign_keys(self):
+        return self.compile().foreign_keys
+    def _compile_foreign_keys(self):
         rtn = []
         for (native,foreign), nativeforeignmappings in self._foreign_keys.items():
             for n_f_mapping in nativeforeignmappings :
@@ -432,10 +551,65 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         assert len(rtn) == len(set(rtn))
         return tuple(rtn)
     def _foreign_keys_by_native(self):
-        rtn = clt.defaultdict(list)
-        for fk in self.foreign_keys:
-            rtn[fk.native_table].append(fk)
-        return utils.FrozenDict({k:frozenset(v) for k,v in rtn.items()})
+        return self.compile().foreign_keys_by_native
+    def compile(self):
+        """
+        Precomputes the schema metadata that the readers, writers and integrity checks consult over and over. This
+        snapshot is built automatically the first time it is needed, and is discarded whenever the schema changes.
+        Thus, calling compile directly is only needed to pay the (small) cost of building the snapshot up front.
+
+        :return: a namedtuple with the following members.
+
+         --> all_fields - maps each table (other than the generic tables) to its primary key fields followed by
+                          its data fields
+
+         --> field_positions - maps each table to a dict of field -> position in all_fields
+
+         --> foreign_keys - the same as the foreign_keys property
+
+         --> foreign_keys_by_native - maps each native table to the frozenset of its foreign keys
+
+         --> foreign_key_ranks - maps each table to its rank amongst the foreign keys (parent tables rank ahead of
+                                 their children, see utils.foreign_key_table_ranks)
+
+         --> foreign_key_plans - maps each foreign key to a namedtuple with members "foreign_fields",
+                                 "native_fields" and "unpack_single", which describes how the native values are
+                                 looked up in the foreign table
+
+         --> data_types - maps table -> field -> data type, as checked by find_data_type_failures. (I.e. including
+                          the temporary filter that excludes only Null for primary key fields with no data type).
+        """
+        if "schema" not in self._compiled:
+            all_fields = {t: self.primary_key_fields[t] + self.data_fields[t]
+                          for t in self.all_tables if t not in self.generic_tables}
+            foreign_keys = self._compile_foreign_keys()
+            foreign_keys_by_native = clt.defaultdict(list)
+            for fk in foreign_keys:
+                foreign_keys_by_native[fk.native_table].append(fk)
+            foreign_key_plans = {}
+            for fk in foreign_keys:
+                foreign_to_native = fk.foreigntonativemapping()
+                ffs = tuple(_ff for _ff in all_fields[fk.foreign_table] if _ff in foreign_to_native)
+                foreign_key_plans[fk] = ForeignKeyPlan(ffs, tuple(foreign_to_native[_ff] for _ff in ffs),
+                    ffs == self.primary_key_fields[fk.foreign_table] and len(ffs) == 1)
+            data_types = {t: dict(v) for t, v in self._data_types.items() if v}
+            untyped_pk = TypeDictionary.safe_creator(number_allowed=True, inclusive_min=True, inclusive_max=True,
+                                                     min=-float("inf"), max=float("inf"), must_be_int=False,
+                                                     strings_allowed='*', nullable=False, datetime=False)
+            for t, pks in self.primary_key_fields.items():
+                for pk in pks:
+                    if pk not in data_types.get(t, ()):
+                        data_types.setdefault(t, {})[pk] = untyped_pk
+            self._compiled["schema"] = CompiledSchema(
+                all_fields=FrozenDict(all_fields),
+                field_positions=FrozenDict({t: FrozenDict({f: i for i, f in enumerate(fs)})
+                                            for t, fs in all_fields.items()}),
+                foreign_keys=foreign_keys,
+                foreign_keys_by_native=FrozenDict({k: frozenset(v) for k, v in foreign_keys_by_native.items()}),
+                foreign_key_ranks=FrozenDict(utils.foreign_key_table_ranks(foreign_keys)),
+                foreign_key_plans=FrozenDict(foreign_key_plans),
+                data_types=FrozenDict({t: FrozenDict(v) for t, v in data_types.items()}))
+        return self._compiled["schema"]
     def enable_foreign_key_links(self):
         """
         call to enable foreign key links. For ex. a TicDat object made from
@@ -445,10 +619,24 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                 dat.nutritionQuantities["chicken", "protein"])
         Note that by default, TicDatFactories don't create foreign key links since doing so
         can slow down TicDat creation.
+        The links for a given foreign key are built the first time any of them is accessed, so
+        foreign keys that are never walked cost nothing. See also drop_foreign_key_links.
 
         :return:
         """
         self._foreign_key_links_enabled[:] = [True]
+    def drop_foreign_key_links(self, tic_dat):
+        """
+        drops the foreign key links that have been built for a TicDat object, freeing the memory they use.
+        Any link that is subsequently accessed will be rebuilt, reflecting the current data in tic_dat.
+
+        :param tic_dat: a TicDat object created by this factory
+
+        :return: tic_dat
+        """
+        verify(isinstance(tic_dat, self.TicDat), "tic_dat needs to be a TicDat object created by this factory")
+        tic_dat._drop_foreign_links()
+        return tic_dat
     def add_foreign_key(self, native_table, foreign_table, mappings):
         """
         Adds a foreign key relationship to the schema.  Adding a foreign key doesn't block
@@ -490,6 +678,7 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
             print(f"*** A circular foreign key relationship will be creating by adding the {native_table} to " +
                   f"{foreign_table} connection")
         self._foreign_keys[native_table, foreign_table].add(tuple(_mappings.items()))
+        self._compiled.clear()
 
     def _simple_fk(self, ftbl, fk):
         assert ftbl in self.all_tables
@@ -519,7 +708,9 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                                              foreigntobridge.items() if bf in bridgetonative)
                         fkSet = self._foreign_keys[nativetable, bfk.foreign_table]
                         if newnativeft not in fkSet and self._simple_fk(bfk.foreign_table, newnativeft):
-                            return fkSet.add(newnativeft) or True
+                            fkSet.add(newnativeft)
+                            self._compiled.clear()
+                            return True
         while findderivedforeignkey():
             pass
         for (nativetable, foreigntable), nativeforeignmappings in self._foreign_keys.items():
@@ -611,6 +802,8 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         self._data_types = clt.defaultdict(dict)
         self._data_row_predicates = clt.defaultdict(dict)
         self._generator_tables = []
+        self._columnar_tables = []
+        self._indexes = {}
         self._foreign_keys = clt.defaultdict(set)
         self.all_tables = frozenset(init_fields)
         # using list for truthiness to work around freezing headaches
@@ -626,38 +819,247 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
             assert containerish(primarykey)
             primarykey = primarykey or  self.primary_key_fields.get(tablename, ())
             keylen = len(primarykey)
+            if rowfactory_ is None and tablename in self._columnar_tables:
+                return utils.td_columnar_table_factory(tablename, primarykey, self.data_fields[tablename],
+                                                       self.default_values.get(tablename, {}))
+            # each table class gets its own row class, so that the table and its rows can be frozen together by
+            # flipping class level flags (see _TicDat._freeze)
             rowfactory = rowfactory_ or datarowfactory(tablename)
+            # counts the edits that might change the key sets that foreign keys into this table are checked against
+            # (see find_foreign_key_failures)
+            version = [0]
+            fk_fields = frozenset() if rowfactory_ is not None else \
+                        frozenset(f for fk in self.foreign_keys if fk.foreign_table == tablename
+                                  for f in fk.foreigntonativemapping() if f not in primarykey)
             if keylen > 0 :
+                indexes = self._indexes.get(tablename, ()) if rowfactory_ is None else ()
+                index_data = {} # fields -> {field values -> {primary key : None}}, each one built on demand
+                def index_value_getter(fields):
+                    pk_posns = {f: primarykey.index(f) for f in fields if f in primarykey}
+                    def get_value(key, row):
+                        key = (key,) if keylen == 1 else key
+                        return tuple(key[pk_posns[f]] if f in pk_posns else row[f] for f in fields)
+                    return get_value
+                index_value_getters = {fields: index_value_getter(fields) for fields in indexes}
+                watched_fields = fk_fields.union(f for fields in indexes for f in fields if f not in primarykey)
+                # holds the TicDat change log once change tracking has been enabled (see change_token)
+                change_log = []
+                # id(row) -> primary key, maintained only while tracking changes or while some index is built,
+                # since an edited row doesn't know its own primary key
+                row_keys = {}
+                def track_row(key, old_row, new_row):
+                    if old_row is not None:
+                        row_keys.pop(id(old_row), None)
+                    if new_row is not None:
+                        row_keys[id(new_row)] = key
+                def log_change(key, old_row, new_row):
+                    change_log[0].append((tablename, key))
+                    track_row(key, old_row, new_row)
+                def on_watched_edit(row, field, old_value):
+                    if field in watched_fields:
+                        version[0] += 1
+                        for fields in indexes:
+                            if field in fields and fields in index_data:
+                                if id(row) not in row_keys:
+                                    index_data.pop(fields)
+                                    continue
+                                idx, key = index_data[fields], row_keys[id(row)]
+                                new_v = index_value_getters[fields](key, row)
+                                old_v = tuple(old_value if f == field else v for f, v in zip(fields, new_v))
+                                if old_v != new_v:
+                                    bucket = idx[old_v]
+                                    del bucket[key]
+                                    if not bucket:
+                                        del idx[old_v]
+                                    idx.setdefault(new_v, {})[key] = None
+                    if change_log and id(row) in row_keys:
+                        change_log[0].append((tablename, row_keys[id(row)]))
+                if watched_fields:
+                    rowfactory._watched_fields = watched_fields
+                    rowfactory._on_watched_edit = staticmethod(on_watched_edit)
+                def update_indexes(key, old_row, new_row):
+                    for fields, idx in index_data.items():
+                        get_value = index_value_getters[fields]
+                        if old_row is not None:
+                            v = get_value(key, old_row)
+                            bucket = idx[v]
+                            del bucket[key]
+                            if not bucket:
+                                del idx[v]
+                        if new_row is not None:
+                            idx.setdefault(get_value(key, new_row), {})[key] = None
+                def note_edit(key, old_row, new_row):
+                    # keeps the built indexes, the change log and row_keys current for a single row edit
+                    if index_data:
+                        update_indexes(key, old_row, new_row)
+                    if change_log:
+                        log_change(key, old_row, new_row)
+                    elif index_data:
+                        track_row(key, old_row, new_row)
                 class TicDatDict (FreezeableDict) :
-                    def __init__(self, *_args, **_kwargs):
-                        super(TicDatDict, self).__init__(*_args, **_kwargs)
-                        alldatadicts.append(self)
+                    _rowfactory = staticmethod(rowfactory)
+                    _version = property(lambda self: version[0])
+                    def _track_changes(self, log):
+                        if not change_log:
+                            change_log.append(log)
+                            row_keys.clear()
+                            row_keys.update((id(r), k) for k, r in dict.items(self))
+                            # every data field can change the outcome of a validation
+                            rowfactory._watched_fields = watched_fields.union(
+                                superself.data_fields.get(tablename, ()))
+                            rowfactory._on_watched_edit = staticmethod(on_watched_edit)
                     def __setitem__(self, key, value):
                         verify(containerish(key) ==  (keylen > 1) and
                                (keylen == 1 or keylen == len(key)),
                                "inconsistent key length for %s"%tablename)
-                        return super(TicDatDict, self).__setitem__(key, rowfactory(value))
+                        version[0] += 1
+                        if not (index_data or change_log):
+                            return super(TicDatDict, self).__setitem__(key, rowfactory(value))
+                        old_row, new_row = dict.get(self, key), rowfactory(value)
+                        super(TicDatDict, self).__setitem__(key, new_row)
+                        note_edit(key, old_row, new_row)
                     def __getitem__(self, item):
                         if (item not in self) and (not getattr(self, "_dataFrozen", False)):
                             self[item] = rowfactory({})
                         return super(TicDatDict, self).__getitem__(item)
+                    def __delitem__(self, key):
+                        version[0] += 1
+                        old_row = dict.get(self, key)
+                        super(TicDatDict, self).__delitem__(key)
+                        note_edit(key, old_row, None)
+                    # the remaining dict editing routines don't go through __setitem__/__delitem__
+                    def pop(self, key, *args):
+                        version[0] += 1
+                        is_present = key in self
+                        old_row = dict.get(self, key)
+                        rtn = super(TicDatDict, self).pop(key, *args)
+                        if is_present:
+                            note_edit(key, old_row, None)
+                        return rtn
+                    def popitem(self):
+                        version[0] += 1
+                        rtn = super(TicDatDict, self).popitem()
+                        note_edit(rtn[0], rtn[1], None)
+                        return rtn
+                    def clear(self):
+                        version[0] += 1
+                        index_data.clear()
+                        old_rows = list(dict.items(self)) if change_log else ()
+                        rtn = super(TicDatDict, self).clear()
+                        for k, r in old_rows:
+                            log_change(k, r, None)
+                        return rtn
+                    def update(self, *args, **kwargs):
+                        if index_data or change_log:
+                            for k, v in dict(*args, **kwargs).items():
+                                self[k] = v
+                            return
+                        version[0] += 1
+                        return super(TicDatDict, self).update(*args, **kwargs)
+                    def setdefault(self, key, default=None):
+                        if key not in self:
+                            self[key] = {} if default is None else default
+                        return dict.__getitem__(self, key)
+                    def lookup(self, **field_values):
+                        """
+                        find the rows that match some field values, using one of the indexes added with
+                        TicDatFactory.add_index
+
+                        :param field_values: the field name -> value pairs to match. The field names need to
+                                             be the fields of an index of this table.
+
+                        :return: a list of the primary keys of the matching rows
+                        """
+                        fields = next((_ for _ in indexes if set(_) == set(field_values)), None)
+                        verify(fields, "%s has no index on %s. See TicDatFactory.add_index"%
+                                       (tablename, tuple(field_values)))
+                        if fields not in index_data:
+                            # built lazily, as bulk loads bypass __setitem__
+                            idx, get_value = {}, index_value_getters[fields]
+                            if not (index_data or change_log):
+                                # row_keys might have gone stale while nothing needed it
+                                row_keys.clear()
+                                row_keys.update((id(r), k) for k, r in dict.items(self))
+                            for k, r in dict.items(self):
+                                idx.setdefault(get_value(k, r), {})[k] = None
+                            index_data[fields] = idx
+                        return list(index_data[fields].get(tuple(field_values[f] for f in fields), ()))
                 assert dictish(TicDatDict)
+                alldatadicts.append(TicDatDict)
                 return TicDatDict
-            class TicDatDataList(clt.abc.MutableSequence):
+            # holds the TicDat change log once change tracking has been enabled (see change_token). Rows are
+            # identified by their position, which any insertion or deletion shifts, so every change marks the
+            # whole table as changed.
+            change_log = []
+            def note_change():
+                version[0] += 1
+                if change_log:
+                    change_log[0].append((tablename, None))
+            def on_watched_edit(row, field, old_value):
+                if field in fk_fields:
+                    version[0] += 1
+                if change_log:
+                    change_log[0].append((tablename, None))
+            if fk_fields:
+                rowfactory._watched_fields = fk_fields
+                rowfactory._on_watched_edit = staticmethod(on_watched_edit)
+            class TicDatDataList(freezable_factory(clt.abc.MutableSequence, "_attributesFrozen")):
+                _rowfactory = staticmethod(rowfactory)
+                _version = property(lambda self: version[0])
+                _dataFrozen = False
                 def __init__(self, *_args):
                     self._list = list()
                     self.extend(list(_args))
+                def _track_changes(self, log):
+                    if not change_log:
+                        change_log.append(log)
+                        rowfactory._watched_fields = fk_fields.union(superself.data_fields.get(tablename, ()))
+                        rowfactory._on_watched_edit = staticmethod(on_watched_edit)
+                def _verify_not_frozen(self):
+                    if self._dataFrozen :
+                        raise utils.TicDatError("Can't edit a frozen " + self.__class__.__name__)
                 def __len__(self): return len(self._list)
                 def __getitem__(self, i): return self._list[i]
-                def __delitem__(self, i): del self._list[i]
+                def __delitem__(self, i):
+                    self._verify_not_frozen()
+                    note_change()
+                    del self._list[i]
                 def __setitem__(self, i, v):
+                    self._verify_not_frozen()
+                    note_change()
                     self._list[i] = rowfactory(v)
                 def insert(self, i, v):
+                    self._verify_not_frozen()
+                    note_change()
                     self._list.insert(i, rowfactory(v))
                 def __repr__(self):
                     return "td:" + self._list.__repr__()
             assert containerish(TicDatDataList) and not dictish(TicDatDataList)
+            alldatadicts.append(TicDatDataList)
             return TicDatDataList
+        def bulkpopulatedtable(alldatadicts, tablename, keys, data_columns):
+            # populate a table in a single pass from parallel sequences whose shape has already been verified
+            # keys is None for tables without primary key fields
+            tableclass = ticdattablefactory(alldatadicts, tablename)
+            if keys is None:
+                return tableclass(*zip(*data_columns))
+            keylen = len(superself.primary_key_fields[tablename])
+            # the same key check as TicDatDict.__setitem__, which dict.update bypasses
+            verify(not any(map(containerish, keys)) if keylen == 1 else
+                   all(containerish(k) and len(k) == keylen for k in keys),
+                   "inconsistent key length for %s"%tablename)
+            rtn = tableclass()
+            if getattr(rtn, "_columnar", False):
+                rtn._load_columns(keys, data_columns)
+                return rtn
+            drf = tableclass._rowfactory
+            rows = map(drf, zip(*data_columns)) if data_columns else (drf(()) for _ in keys)
+            dict.update(rtn, zip(keys, rows))
+            return rtn
+        def columnarrowdata(tablename):
+            # columnar tables verify the row data themselves and don't need row objects
+            if tablename in self._columnar_tables:
+                return lambda x : x
         def generatorfactory(data, tablename) :
             assert tablename in self.generator_tables
             drf = datarowfactory(tablename)
@@ -669,26 +1071,21 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
             def _freeze(self):
                 if getattr(self, "_isFrozen", False) :
                     return
+                # Every table (and every foreign key link dictionary) has its own class, as does every table's row
+                # class. The rows and tables consult class level flags, so freezing never needs to touch the rows.
+                # (The rows of columnar tables are views that consult their table directly).
+                table_classes = list(self._all_data_dicts)
                 for t in set(superself.all_tables).difference(superself.generic_tables):
                     _t = getattr(self, t)
                     if utils.dictish(_t) or utils.containerish(_t) :
-                        for v in getattr(_t, "values", lambda : _t)() :
-                            if not getattr(v, "_dataFrozen", False) :
-                                v._dataFrozen =True
-                                v._attributesFrozen = True
-                            else : # we freeze the data-less ones off the bat as empties
-                                assert (len(v) == 0) and v._attributesFrozen
-                        if utils.dictish(_t) :
-                            _t._dataFrozen  = True
-                            _t._attributesFrozen = True
-                        elif utils.containerish(_t) :
-                            setattr(self, t, tuple(_t))
+                        table_classes.append(type(_t))
                     else :
                         assert callable(_t) and t in superself.generator_tables
-                for _t in getattr(self, "_allDataDicts", ()) :
-                    if utils.dictish(_t) and not getattr(_t, "_attributesFrozen", False) :
-                        _t._dataFrozen  = True
-                        _t._attributesFrozen = True
+                for cls in table_classes:
+                    for cls_ in (cls, getattr(cls, "_rowfactory", None)):
+                        if isinstance(cls_, type):
+                            cls_._dataFrozen = True
+                            cls_._attributesFrozen = True
                 self._isFrozen = True
             def __repr__(self):
                 tlen = lambda t: utils.safe_apply(len)(getattr(self, t))
@@ -696,10 +1093,58 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         class TicDat(_TicDat) :
             def _generatorfactory(self, data, tableName):
                 return generatorfactory(data, tableName)
+            @classmethod
+            def from_columns(cls, **init_columns):
+                """
+                create a TicDat object from parallel column sequences. The shape and primary key uniqueness of
+                each table is verified once, rather than verifying each row individually.
+
+                :param init_columns: a mapping of table names to columns. Each column entry is either a dict that
+                                     maps every field of the table (primary key fields and data fields) to a
+                                     sequence of values, or a numpy structured array whose names are the fields of
+                                     the table. All the sequences for a table need to be the same length.
+                                     Generic tables can be passed any dict of columns.
+
+                ex: ```dat = tdf.TicDat.from_columns(foods = {"name": ["pizza", "milk"], "cost": [2.5, 0.9]})```
+
+                :return: a TicDat object populated by the columns
+                """
+                rtn = cls()
+                for t, columns in init_columns.items():
+                    verify(t in superself.all_tables, "Unexpected table name %s"%t)
+                    if getattr(getattr(columns, "dtype", None), "names", None):
+                        columns = {f: columns[f] for f in columns.dtype.names}
+                    verify(dictish(columns), "The columns for %s should be a dict or a structured array"%t)
+                    if t in superself.generic_tables:
+                        setattr(rtn, t, DataFrame(dict(columns)))
+                        continue
+                    pks, dfs = superself.primary_key_fields[t], superself.data_fields[t]
+                    verify(set(columns) == set(pks + dfs), "The columns for %s should be %s"%(t, pks + dfs))
+                    columns = {f: c.tolist() if hasattr(c, "tolist") else list(c) for f,c in columns.items()}
+                    verify(len(set(map(len, columns.values()))) == 1,
+                           "The columns for %s need to be the same length"%t)
+                    data_columns = [columns[f] for f in dfs]
+                    if t in superself.generator_tables:
+                        setattr(rtn, t, generatorfactory(list(zip(*data_columns)), t))
+                    elif not pks:
+                        setattr(rtn, t, bulkpopulatedtable(rtn._all_data_dicts, t, None, data_columns))
+                    else:
+                        keys = columns[pks[0]] if len(pks) == 1 else list(zip(*(columns[f] for f in pks)))
+                        table = bulkpopulatedtable(rtn._all_data_dicts, t, keys, data_columns)
+                        verify(len(table) == len(keys), "Duplicate primary key values found for %s"%t)
+                        setattr(rtn, t, table)
+                if init_columns:
+                    rtn._try_make_foreign_links()
+                return rtn
             def __init__(self, **init_tables):
                 superself._trigger_has_been_used()
                 self._all_data_dicts = []
                 self._made_foreign_links = False
+                self._foreign_links = []
+                # (foreign table, linkname) -> link dict class, reused when the links are rebuilt
+                self._foreign_link_classes = {}
+                self._foreign_key_sets = {} # see find_foreign_key_failures
+                self._change_tracking = None # see change_token
                 for t in init_tables :
                     verify(t in superself.all_tables, "Unexpected table name %s"%t)
                     if t in superself.generic_tables:
@@ -713,7 +1158,8 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                     if pd and isinstance(v, pd.Series):
                         v = DataFrame(v)
                         v.rename(columns = {v.columns[0] : superself.data_fields[t][0]}, inplace=True)
-                    if DataFrame and isinstance(v, DataFrame):
+                    if DataFrame and isinstance(v, DataFrame) and v.empty:
+                      # DataFrame.apply has special handling for empty frames, which is retained as is
                       row_dict = lambda r : {df:r[df] for df in superself.data_fields.get(t, ())}
                       setattr(self, t, ticdattablefactory(self._all_data_dicts, t)())
                       if superself.primary_key_fields.get(t) :
@@ -722,6 +1168,15 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                           v.apply(add_row, axis=1)
                       else :
                           v.apply(lambda r : getattr(self, t).append(row_dict(r)), axis=1)
+                    elif DataFrame and isinstance(v, DataFrame):
+                      # the cells are given the dtype of the rows DataFrame.apply would pass (so that, e.g., ints are
+                      # upcast to floats alongside float columns). tolist() converts a whole column (or the whole
+                      # index) to Python objects in one go
+                      row_dtype = v.iloc[0].dtype
+                      data_columns = [(v[df] if row_dtype == object else v[df].astype(row_dtype, copy=False)).tolist()
+                                      for df in superself.data_fields.get(t, ())]
+                      keys = v.index.tolist() if superself.primary_key_fields.get(t) else None
+                      setattr(self, t, bulkpopulatedtable(self._all_data_dicts, t, keys, data_columns))
                     elif superself.primary_key_fields.get(t) and not utils.dictish(v):
                          pklen = len(superself.primary_key_fields[t])
                          def handle_row_dict(r):
@@ -729,8 +1184,10 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                                  return r
                              return [r.get(k, 0) for k in superself.primary_key_fields[t] +
                                       superself.data_fields.get(t,[])]
-                         drf = datarowfactory(t) # lots of verification inside the datarowfactory
-                         setattr(self, t, ticdattablefactory(self._all_data_dicts, t)(
+                         tableclass = ticdattablefactory(self._all_data_dicts, t)
+                         # lots of verification inside the row factory
+                         drf = columnarrowdata(t) or tableclass._rowfactory
+                         setattr(self, t, tableclass(
                              {r if not utils.containerish(r) else
                               (r[0] if pklen == 1 else tuple(r[:pklen])):
                               drf([] if not utils.containerish(r) else r[pklen:])
@@ -742,9 +1199,10 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                                 (len(_k) == len(superself.primary_key_fields.get(t, ())) > 1)
                                 or len(superself.primary_key_fields.get(t, ())) == 1),
                            "Unexpected number of primary key fields for %s"%t)
-                     drf = datarowfactory(t) # lots of verification inside the datarowfactory
-                     setattr(self, t, ticdattablefactory(self._all_data_dicts, t)(
-                                    {_k : drf(v[_k] if utils.dictish(v) else ()) for _k in v}))
+                     tableclass = ticdattablefactory(self._all_data_dicts, t)
+                     # lots of verification inside the row factory
+                     drf = columnarrowdata(t) or tableclass._rowfactory
+                     setattr(self, t, tableclass({_k : drf(v[_k] if utils.dictish(v) else ()) for _k in v}))
                     elif t in superself.generator_tables :
                         setattr(self, t, generatorfactory(v, t))
                     else :
@@ -767,52 +1225,76 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                 assert not self._made_foreign_links, "call once"
                 self._made_foreign_links = True
                 can_link_w_me = lambda t : t not in superself.generator_tables and \
+                                           t not in superself.columnar_tables and \
                                            superself.primary_key_fields.get(t)
                 for fk in superself.foreign_keys :
-                    t = fk.native_table
-                    if can_link_w_me(t):
-                      if can_link_w_me(fk.foreign_table)  :
-                        nativefields = fk.nativefields()
-                        linkname = superself._linkName[t, fk.foreign_table, frozenset(nativefields)]
+                    if can_link_w_me(fk.native_table) and can_link_w_me(fk.foreign_table):
+                        linkname = superself._linkName[fk.native_table, fk.foreign_table,
+                                                       frozenset(fk.nativefields())]
                         if linkname not in ("keys", "items", "values") :
-                            ft = getattr(self, fk.foreign_table)
-                            foreign_pk = superself.primary_key_fields[fk.foreign_table]
-                            local_pk = superself.primary_key_fields[t]
-                            assert all(pk for pk in (foreign_pk, local_pk))
-                            reversemapping  = fk.foreigntonativemapping()
-                            if len(nativefields) == 1:
-                                assert set(foreign_pk) =={fk.mapping.foreign_field}
-                            else:
-                                assert set(foreign_pk) == {_.foreign_field for _ in fk.mapping}
-                            appendage_fk = fk.cardinality == "one-to-one"
-                            tablefields = superself.primary_key_fields.get(t, ()) + \
-                                          superself.data_fields.get(t, ())
-                            local_posn = {x:tablefields.index(reversemapping[x])
-                                             for x in foreign_pk}
-                            unused_local_posn = {i for i,_ in enumerate(tablefields) if i not in
-                                                    local_posn.values()}
-                            if not appendage_fk :
-                                new_pk = tuple(x for x in local_pk if x not in nativefields)
-                                new_data_dct = ticdattablefactory(self._all_data_dicts, linkname,
-                                                new_pk, lambda x : x)
-                                for row in ft.values() :
-                                    setattr(row, linkname, new_data_dct())
-                            for key,row in getattr(self, t).items() :
-                                keyrow = ((key,) if not containerish(key) else key) + \
-                                         tuple(row[x] for x in superself.data_fields[t])
-                                lookup = tuple(keyrow[local_posn[x]] for x in foreign_pk)
-                                linkrow = ft.get(lookup[0] if len(lookup) ==1 else lookup, None)
-                                if linkrow is not None :
-                                    if appendage_fk :
-                                        # the attribute is simply a reference to the mapping table
-                                        assert not hasattr(linkrow, linkname)
-                                        setattr(linkrow, linkname,row)
-                                    else :
-                                        _key = keyrow[:-len(row)] if row else keyrow
-                                        _key = tuple(x for i,x in enumerate(_key)
-                                                     if i in unused_local_posn)
-                                        getattr(linkrow, linkname)\
-                                            [_key[0] if len(_key) == 1 else _key] = row
+                            # the link attributes are built for the entire foreign table the first time any
+                            # foreign table row is asked for one of them
+                            builder = lambda fk=fk, linkname=linkname : self._make_foreign_link(fk, linkname)
+                            self._foreign_links.append((fk.foreign_table, linkname, builder))
+                            type(getattr(self, fk.foreign_table))._rowfactory._lazy_links[linkname] = builder
+            def _make_foreign_link(self, fk, linkname):
+                t = fk.native_table
+                nativefields = fk.nativefields()
+                ft = getattr(self, fk.foreign_table)
+                foreign_pk = superself.primary_key_fields[fk.foreign_table]
+                local_pk = superself.primary_key_fields[t]
+                assert all(pk for pk in (foreign_pk, local_pk))
+                reversemapping  = fk.foreigntonativemapping()
+                if len(nativefields) == 1:
+                    assert set(foreign_pk) =={fk.mapping.foreign_field}
+                else:
+                    assert set(foreign_pk) == {_.foreign_field for _ in fk.mapping}
+                appendage_fk = fk.cardinality == "one-to-one"
+                tablefields = superself.compile().all_fields[t]
+                local_posn = {x:tablefields.index(reversemapping[x])
+                                 for x in foreign_pk}
+                unused_local_posn = {i for i,_ in enumerate(tablefields) if i not in
+                                        local_posn.values()}
+                # links are derived data, and are thus attached with object.__setattr__ even if self is frozen
+                if not appendage_fk :
+                    if (fk.foreign_table, linkname) not in self._foreign_link_classes:
+                        new_pk = tuple(x for x in local_pk if x not in nativefields)
+                        self._foreign_link_classes[fk.foreign_table, linkname] = ticdattablefactory(
+                            self._all_data_dicts, linkname, new_pk, lambda x : x)
+                    new_data_dct = self._foreign_link_classes[fk.foreign_table, linkname]
+                    # a reused class might have been frozen along with self, and is refrozen once it is repopulated,
+                    # even if the repopulating fails part way
+                    new_data_dct._dataFrozen = new_data_dct._attributesFrozen = False
+                try:
+                    if not appendage_fk :
+                        for row in ft.values() :
+                            object.__setattr__(row, linkname, new_data_dct())
+                    for key,row in getattr(self, t).items() :
+                        keyrow = ((key,) if not containerish(key) else key) + \
+                                 tuple(row[x] for x in superself.data_fields[t])
+                        lookup = tuple(keyrow[local_posn[x]] for x in foreign_pk)
+                        linkrow = ft.get(lookup[0] if len(lookup) ==1 else lookup, None)
+                        if linkrow is not None :
+                            if appendage_fk :
+                                # the attribute is simply a reference to the mapping table
+                                assert linkname not in vars(linkrow)
+                                object.__setattr__(linkrow, linkname, row)
+                            else :
+                                _key = keyrow[:-len(row)] if row else keyrow
+                                _key = tuple(x for i,x in enumerate(_key)
+                                             if i in unused_local_posn)
+                                getattr(linkrow, linkname)\
+                                    [_key[0] if len(_key) == 1 else _key] = row
+                finally:
+                    if not appendage_fk and getattr(self, "_isFrozen", False):
+                        new_data_dct._dataFrozen = new_data_dct._attributesFrozen = True
+            def _drop_foreign_links(self):
+                for ft, linkname, builder in self._foreign_links:
+                    rowclass = type(getattr(self, ft))._rowfactory
+                    if linkname not in rowclass._lazy_links:
+                        for row in getattr(self, ft).values():
+                            vars(row).pop(linkname, None)
+                        rowclass._lazy_links[linkname] = builder
 
         self.TicDat = TicDat
         self.xls = xls.XlsTicFactory(self)
@@ -825,6 +1307,8 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         self._parameters = {}
         self._infinity_io_flag = ["N/A"]
         self._none_as_infinity_bias_cache = {}
+        self._compiled = {} # see compile
+        self._good_objects = weakref.WeakKeyDictionary() # see good_tic_dat_object
         self._isFrozen=True
 
     @property
@@ -864,6 +1348,7 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
            "infinity_io_flag needs to be 'N/A' (to indicate it isn't being used), or None, or a positive finite number")
         self._infinity_io_flag[0] = value
         self._none_as_infinity_bias_cache.clear()
+        self._compiled.clear()
 
     def _general_read_cell(self, t, f, x):
         '''
@@ -873,22 +1358,46 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         :param x: cell value which might need to be adjusted
         :return: x, adjusted as required
         '''
+        reader = self._cell_reader(t, f)
+        return x if reader is None else reader(x)
+    def _cell_reader(self, t, f):
+        '''
+        we expect other routines inside ticdat to access this routine, even though it starts with _
+        readers should resolve this once per field, and not once per cell
+        :param t: table name
+        :param f: field name
+        :return: a function that adjusts a cell value as per _general_read_cell, or None if no adjustment is needed
+        '''
+        readers = self._compiled.setdefault("cell_readers", {})
+        if (t, f) not in readers:
+            readers[t, f] = self._make_cell_reader(t, f)
+        return readers[t, f]
+    def _make_cell_reader(self, t, f):
         assert t in self.all_tables
         if t == "parameters": # infinity flagging doesn't apply to parameters table, see set_infinity_flag __doc__
+            return None
+        flag = self.infinity_io_flag
+        fld_type = self._data_types.get(t, {}).get(f)
+        is_datetime = bool(fld_type and fld_type.datetime)
+        flag_is_number = utils.numericish(flag)
+        # _none_as_infinity_bias is resolved lazily, since it can object to a field that never reads a None
+        none_might_flag = flag is None and bool(self.data_types.get(t, {}).get(f))
+        if not (is_datetime or flag_is_number or none_might_flag):
+            return None
+        def reader(x):
+            if is_datetime and not (x is None or (utils.pd and utils.pd.isnull(x))):
+                adjusted = utils.dateutil_adjuster(x)
+                if adjusted is not None:
+                    return adjusted
+            if flag_is_number and utils.numericish(x):
+                if x >= flag:
+                    return float("inf")
+                if x <= -flag:
+                    return float("-inf")
+            if x is None and none_might_flag and utils.numericish(self._none_as_infinity_bias(t, f)):
+                return float("inf") * self._none_as_infinity_bias(t, f)
             return x
-        # SPEED IS IMPORTANT HERE!!!!
-        if self._data_types.get(t, {}).get(f) and self._data_types[t][f].datetime and \
-                (not (x is None or (utils.pd and utils.pd.isnull(x)))) and \
-                utils.dateutil_adjuster(x) is not None:
-            return utils.dateutil_adjuster(x)
-        if utils.numericish(self.infinity_io_flag) and utils.numericish(x):
-            if x >= self.infinity_io_flag:
-                return float("inf")
-            if x <= -self.infinity_io_flag:
-                return float("-inf")
-        if x is None and self.infinity_io_flag is None and utils.numericish(self._none_as_infinity_bias(t, f)):
-            return float("inf") * self._none_as_infinity_bias(t, f)
-        return x
+        return reader
     def _infinity_flag_write_cell(self, t, f, x):
         """
         we expect other routines inside ticdat to access this routine, even though it starts with _
@@ -897,14 +1406,32 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         :param x: cell value which might need to be adjusted
         :return: x, adjusted as required
         """
-        if t == "parameters" and self._parameters: # SPEED IS IMPORTANT
+        writer = self._cell_writer(t, f)
+        return x if writer is None else writer(x)
+    def _cell_writer(self, t, f):
+        """
+        we expect other routines inside ticdat to access this routine, even though it starts with _
+        writers should resolve this once per field, and not once per cell
+        :param t: table name
+        :param f: field name
+        :return: a function that adjusts a cell value as per _infinity_flag_write_cell, or None if no adjustment
+                 is needed
+        """
+        writers = self._compiled.setdefault("cell_writers", {})
+        if (t, f) not in writers:
+            writers[t, f] = self._make_cell_writer(t, f)
+        return writers[t, f]
+    def _make_cell_writer(self, t, f):
+        if t == "parameters" and self._parameters:
             # I will assume a parameters table without parameters specification is just a naive developer
-            return None if x is None or (utils.pd and utils.pd.isnull(x)) else str(x)
-        if self.infinity_io_flag is None and (self._none_as_infinity_bias(t, f) or float("nan"))*float("inf") == x:
-            return None
-        if utils.numericish(self.infinity_io_flag) and utils.numericish(x):
-            return max(min(x, self.infinity_io_flag), -self.infinity_io_flag)
-        return x
+            return lambda x: None if x is None or (utils.pd and utils.pd.isnull(x)) else str(x)
+        flag = self.infinity_io_flag
+        if flag is None and self._none_as_infinity_bias(t, f):
+            none_flagged = self._none_as_infinity_bias(t, f) * float("inf")
+            return lambda x: None if x == none_flagged else x
+        if utils.numericish(flag):
+            return lambda x: max(min(x, flag), -flag) if utils.numericish(x) else x
+        return None
     def _none_as_infinity_bias(self, t, f):
         if self.infinity_io_flag is not None:
             return None
@@ -969,6 +1496,38 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
 
         :return: True if the dataObj can be converted to a TicDat data object. False otherwise.
         """
+        # a passing result is memoized for as long as the snapshot of the tables of data_obj doesn't change
+        snapshot = self._good_object_snapshot(data_obj)
+        memo = safe_apply(lambda: self._good_objects.setdefault(data_obj, {}))() if snapshot else None
+        if memo and any(utils.same_snapshot(memo.get(_), snapshot) for _ in {row_checking, "strict"}):
+            return True
+        rtn = self._good_tic_dat_object(data_obj, bad_message_handler, row_checking)
+        if rtn and memo is not None:
+            memo[row_checking] = snapshot
+        return rtn
+    def _good_object_snapshot(self, data_obj):
+        # utils.make_snapshot of the tables (and their versions) of data_obj, or None if a good_tic_dat_object
+        # result can't be memoized. The snapshot only weakly references the tables, since a table can refer back to
+        # data_obj (i.e. via its foreign key links) and thus would otherwise keep data_obj in self._good_objects.
+        # Once this factory has been used its schema can't change, and the tables generated by this factory (or a
+        # similar one) can't be edited without bumping their versions. (The tables of frozen objects can't be edited
+        # at all, and generic tables are only checked for being DataFrames).
+        if not self._has_been_used:
+            return None
+        frozen = getattr(data_obj, "_isFrozen", False)
+        tables, versions = [], []
+        for t in sorted(self.all_tables):
+            table = getattr(data_obj, t, None)
+            tables.append(table)
+            if frozen or getattr(table, "_columnar", False) or \
+                    (t in self.generic_tables and DataFrame and isinstance(table, DataFrame)):
+                versions.append(None)
+            elif hasattr(table, "_version"):
+                versions.append(table._version)
+            else:
+                return None
+        return utils.make_snapshot(tables, versions)
+    def _good_tic_dat_object(self, data_obj, bad_message_handler, row_checking):
         rtn = True
         for t in self.all_tables:
             if not hasattr(data_obj, t) :
@@ -1142,6 +1701,20 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         return rtn
     def _same_data(self, obj1, obj2, epsilon = 0, nans_are_same_for_data_rows = False,
                    empty_strings_can_be_nan = False):
+        """
+        are two TicDat objects for this schema the same?
+        tables with primary keys are the same if they have the same keys, and the rows for each key are the same.
+        tables without primary keys are compared as multisets of rows. I.e. they are the same if their rows can be
+        paired one to one, regardless of order, so a duplicated row needs to appear equally often in both tables.
+        This is deliberate. Through version 0.2.20.1, it was enough for every row to have some matching row in the
+        other table, which (for example) treated rows [a, a, b] as the same as rows [a, b, b].
+        :param obj1: TicDat object
+        :param obj2: TicDat object
+        :param epsilon: two numbers are the same if their utils.per_error is less than epsilon
+        :param nans_are_same_for_data_rows: if truthy, then two NaN cells are the same
+        :param empty_strings_can_be_nan: if truthy, then the empty string counts as NaN
+        :return: True if obj1 and obj2 are the same, False otherwise
+        """
         is_nan = lambda x : (x == "" and empty_strings_can_be_nan) or safe_apply(math.isnan)(x) or (pd and pd.isnull(x))
         assert self.good_tic_dat_object(obj1, row_checking="generous") and \
                self.good_tic_dat_object(obj2, row_checking="generous")
@@ -1168,6 +1741,62 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
             if dictish(r1) :
                 return list(r1.values()) == containerize(r2)
             return containerize(r1) == containerize(r2)
+        nan, number = object(), object() # placeholders for hashing
+        def hashable_row(r, fields):
+            # the row values as a hashable tuple (in field order for dict rows), or None if there isn't one
+            if dictish(r):
+                if set(r) != set(fields):
+                    return None
+                rtn = tuple(r[f] for f in fields)
+            else:
+                rtn = tuple(r) if containerish(r) else (r,)
+            if safe_apply(hash)(rtn) is None:
+                return None
+            if nans_are_same_for_data_rows:
+                return tuple(nan if safe_apply(is_nan)(v) else v for v in rtn)
+            # otherwise, NaN isn't the same as anything (even the identical object)
+            return tuple(object() if safe_apply(lambda x: bool(x != x))(v) else v for v in rtn)
+        def grid(v):
+            # nearly the same numbers (see utils.per_error) almost always share a cell of this logarithmic grid
+            v = safe_apply(float)(v)
+            if v is None or math.isnan(v):
+                return nan
+            if math.isinf(v) or abs(v) <= 1e-10:
+                return v if math.isinf(v) else 0
+            return (v > 0, math.floor(math.log(abs(v)) / math.log1p(epsilon)))
+        def same_rows(rows1, rows2, fields):
+            # compares the rows of keyless tables as multisets. If the rows are exactly the same (as found by hashing)
+            # then no pairing needs to be searched for. Otherwise, the distinct rows (each with its count) are paired
+            # up with augmenting paths (nearly the same isn't transitive, so a greedy pairing could miss a valid one),
+            # offering each row its exact match first, then the rows in the same tolerance grid cell, then the rows
+            # that differ only in numbers
+            hashed1, hashed2 = [[hashable_row(r, fields) for r in rows] for rows in (rows1, rows2)]
+            if any(h is None for h in hashed1 + hashed2):
+                return utils.has_perfect_matching(range(len(rows1)), lambda i: (
+                    j for j, r2 in enumerate(rows2) if samerow(rows1[i], r2)))
+            counts1, counts2 = clt.Counter(hashed1), clt.Counter(hashed2)
+            if counts1 == counts2:
+                return True
+            if epsilon == 0:
+                return False
+            row1, row2 = [dict(zip(hashed, rows)) for hashed, rows in ((hashed1, rows1), (hashed2, rows2))]
+            buckets = lambda h: (tuple(grid(v) if utils.numericish(v) else v for v in h),
+                                 tuple(number if utils.numericish(v) else v for v in h))
+            indexed2 = clt.defaultdict(list)
+            for h in counts2:
+                for b in buckets(h):
+                    indexed2[b].append(h)
+            def candidates(h):
+                if h in counts2:
+                    yield h
+                checked = {h}
+                for b in buckets(h):
+                    for h2 in indexed2[b]:
+                        if h2 not in checked:
+                            checked.add(h2)
+                            if samerow(row1[h], row2[h2]):
+                                yield h2
+            return utils.has_perfect_matching(counts1, candidates, counts1.__getitem__, counts2.__getitem__)
         for t in self.all_tables :
             t1 = getattr(obj1, t)
             t2 = getattr(obj2, t)
@@ -1181,11 +1810,11 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                         return False
             else :
                 _iter = lambda x : x if containerish(x) else x()
-                if not len(list(_iter(t1))) == len(list(_iter(t2))) :
+                rows1, rows2 = list(_iter(t1)), list(_iter(t2)) # generator tables are materialized only once
+                if not len(rows1) == len(rows2) :
+                    return False
+                if not same_rows(rows1, rows2, self.data_fields.get(t, ())):
                     return False
-                for r1 in _iter(t1):
-                    if not any (samerow(r1, r2) for r2 in _iter(t2)) :
-                        return False
         return True
     def clone(self, table_restrictions=None):
         """
@@ -1198,15 +1827,21 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         full_schema = utils.clone_a_anchillary_info_schema(self.schema(include_ancillary_info=True), table_restrictions)
         rtn = TicDatFactory.create_from_full_schema(full_schema)
         rtn.set_generator_tables(self.generator_tables)
+        rtn.set_columnar_tables([t for t in self.columnar_tables if t in rtn.all_tables])
+        for t, indexes in self.indexes.items():
+            if t in rtn.all_tables:
+                for fields in indexes:
+                    rtn.add_index(t, fields)
         for tbl, row_predicates in self._data_row_predicates.items():
             if table_restrictions is None or tbl in table_restrictions:
                 for pn, rpi in row_predicates.items():
                     rtn.add_data_row_predicate(tbl, predicate=rpi.predicate, predicate_name=pn,
                                                predicate_kwargs_maker=rpi.predicate_kwargs_maker,
-                                               predicate_failure_response=rpi.predicate_failure_response)
+                                               predicate_failure_response=rpi.predicate_failure_response,
+                                               predicate_vectorized=rpi.predicate_vectorized)
         rtn.enable_foreign_key_links() if self._foreign_key_links_enabled else None
         return rtn
-    def copy_tic_dat(self, tic_dat, freeze_it = False):
+    def copy_tic_dat(self, tic_dat, freeze_it = False, copy_on_write = False):
         """
         copies the tic_dat object into a new tic_dat object
         performs a deep copy
@@ -1215,13 +1850,52 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
 
         :param freeze_it: boolean. should the returned object be frozen?
 
+        :param copy_on_write: boolean. If truthy, the data rows of the returned object share their data with the
+                              rows of tic_dat. A row's data is only copied when either it, or the row it shares
+                              with, is edited. The returned object still has its own tables and its own (small)
+                              row objects, since rows are handed out by reference and edited in place, and thus a
+                              table can't know which of its rows are about to be edited. The exception is when
+                              tic_dat is frozen and freeze_it is truthy, in which case the tables themselves are
+                              shared, as neither object can ever be edited. Requires tic_dat to be a TicDat object
+                              created by this factory, and can't be used when foreign key links are enabled.
+
         :return: a deep copy of the tic_dat argument
         """
         msg  = []
         verify(self.good_tic_dat_object(tic_dat, msg.append, row_checking="generous"),
                "tic_dat not a good object for this factory : %s"%"\n".join(msg))
+        if copy_on_write:
+            rtn = self._copy_on_write(tic_dat, freeze_it)
+            return freeze_me(rtn) if freeze_it else rtn
         rtn = self.TicDat(**{t:getattr(tic_dat, t) for t in self.all_tables})
-        return self.freeze_me(rtn) if freeze_it else rtn
+        # rtn was built and verified by TicDat, no need to re-validate it just to freeze it
+        return freeze_me(rtn) if freeze_it else rtn
+    def _copy_on_write(self, tic_dat, freeze_it):
+        verify(isinstance(tic_dat, self.TicDat), "copy_on_write requires a TicDat object created by this factory")
+        verify(not self._foreign_key_links_enabled, "copy_on_write can't be used with foreign key links")
+        if freeze_it and getattr(tic_dat, "_isFrozen", False):
+            # neither object can be edited, so there is nothing to copy on write
+            shared = set(self.all_tables).difference(self.generic_tables, self.generator_tables)
+            rtn = self.TicDat(**{t:getattr(tic_dat, t) for t in self.all_tables if t not in shared})
+            for t in shared:
+                setattr(rtn, t, getattr(tic_dat, t))
+            return rtn
+        unshareable = set(self.generic_tables).union(self.generator_tables, self.columnar_tables)
+        shareable = [t for t in self.all_tables if self.data_fields.get(t) and t not in unshareable]
+        rtn = self.TicDat(**{t:getattr(tic_dat, t) for t in self.all_tables if t not in shareable})
+        for t in shareable:
+            src, dst = getattr(tic_dat, t), getattr(rtn, t)
+            share_data = type(dst)._rowfactory._share_data
+            if not getattr(tic_dat, "_isFrozen", False):
+                # the rows of tic_dat can still be edited, so they too need to copy their data before editing it
+                mark_shared = type(src)._rowfactory._mark_shared
+                for row in (src.values() if dictish(src) else src):
+                    mark_shared(row)
+            if dictish(dst):
+                dict.update(dst, ((k, share_data(row)) for k, row in src.items()))
+            else:
+                dst._list.extend(map(share_data, src))
+        return rtn
     def copy_from_ampl_variables(self, ampl_variables):
         """
         copies the solution results from ampl_variables into a new ticdat object
@@ -1401,6 +2075,16 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
             elif len(tdtable) == 0 :
                 df = DataFrame([], columns = self.primary_key_fields.get(tname,tuple()) +
                                                 self.data_fields.get(tname, tuple()))
+            elif getattr(tdtable, "_columnar", False):
+                pks = self.primary_key_fields[tname]
+                dfs = self.data_fields.get(tname, tuple())
+                keys = tdtable._keys
+                columns = {f: keys if len(pks) == 1 else [k[i] for k in keys] for i,f in enumerate(pks)}
+                columns.update({f: tdtable._column(f) for f in dfs})
+                df = DataFrame(columns, columns=pks + dfs)
+                df.set_index(list(pks), inplace=True,
+                             drop= bool(dfs if drop_pk_columns == None else drop_pk_columns))
+                utils.Sloc.add_sloc(df)
             elif dictish(tdtable):
                 pks = self.primary_key_fields[tname]
                 dfs = self.data_fields.get(tname, tuple())
@@ -1429,7 +2113,58 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         verify(self.good_tic_dat_object(tic_dat, msg.append),
                "tic_dat not a good object for this factory : %s"%"\n".join(msg))
         return freeze_me(tic_dat)
-    def find_foreign_key_failures(self, tic_dat, verbosity="High", max_failures=float("inf")):
+    def change_token(self, tic_dat):
+        """
+        Starts tracking the edits made to a ticdat object (if it isn't tracked already), and returns a token that
+        marks the current point in its change log. The token can be passed as the since argument of
+        find_data_type_failures, find_data_row_failures and find_foreign_key_failures, so that only the rows that
+        might have changed since the token was issued are re-examined.
+
+        The edits made through the tables (inserting, replacing and deleting rows) and through the rows (setting
+        field values) are tracked. Tables without primary key fields, columnar tables, and tables that have been
+        replaced outright are always re-examined in full. The change log grows with the number of distinct
+        rows edited, not with the number of edits.
+
+        :param tic_dat: ticdat object
+
+        :return: an integer change token
+        """
+        assert self.good_tic_dat_object(tic_dat), "tic_dat not a good object for this factory"
+        verify(hasattr(tic_dat, "_change_tracking"), "tic_dat needs to be a TicDat object created by a TicDatFactory")
+        if tic_dat._change_tracking is None:
+            if getattr(tic_dat, "_isFrozen", False):
+                return 0 # a frozen ticdat object can't change
+            log, tracked = _ChangeLog(), {}
+            for t in self.all_tables.difference(self.generic_tables, self.generator_tables):
+                table = getattr(tic_dat, t)
+                if hasattr(table, "_track_changes"):
+                    table._track_changes(log)
+                    tracked[t] = table
+            # the change log, the tracked tables, and the foreign key dependents (see _foreign_key_dependents)
+            tic_dat._change_tracking = (log, tracked, {})
+        return len(tic_dat._change_tracking[0])
+    def _dirty_keys(self, tic_dat, since):
+        # maps each tracked table to the set of primary keys of the rows inserted, edited or deleted since the since
+        # change token, or to None if the whole table needs to be re-examined. Tables that aren't tracked map to None
+        # via dict.get
+        tracking = getattr(tic_dat, "_change_tracking", None)
+        if tracking is None and getattr(tic_dat, "_isFrozen", False):
+            verify(since == 0, "since isn't a change token for tic_dat. See change_token")
+            return {t: set() for t in self.all_tables}
+        verify(tracking is not None, "change tracking hasn't been started for tic_dat. See change_token")
+        log, tracked, _ = tracking
+        verify(isinstance(since, int) and 0 <= since <= len(log),
+               "since isn't a change token for tic_dat. See change_token")
+        rtn = {t: set() if getattr(tic_dat, t) is table else None for t, table in tracked.items()}
+        for t, key in log.since(since):
+            if rtn[t] is not None:
+                if key is None:
+                    rtn[t] = None
+                else:
+                    rtn[t].add(key)
+        return rtn
+    def find_foreign_key_failures(self, tic_dat, verbosity="High", max_failures=float("inf"), n_jobs=1,
+                                  since=None):
         """
         Finds the foreign key failures for a ticdat object
 
@@ -1440,6 +2175,15 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
 
         :param verbosity: either "High" or "Low"
 
+        :param n_jobs: integer. The number of worker processes to shard the checks across (-1 means one per CPU).
+                       The workers are forked, and thus inherit tic_dat without it being pickled. Ignored if
+                       max_failures is finite (since short circuiting is inherently sequential) or if processes can't
+                       be forked on this platform.
+
+        :param since: a token returned by change_token. If provided, only the native table rows that were inserted
+                      or edited since the token was issued (along with the native table rows that referenced foreign
+                      table rows deleted since then) are re-examined, and only their failures are returned.
+
         :return: A dictionary constructed as follow (for verbosity = 'High'):
 
          The keys are namedtuples with members "native_table", "foreign_table",
@@ -1466,67 +2210,133 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         verify(verbosity in ["High", "Low"], "verbosity needs to be either 'High' or 'Low'")
         assert self.good_tic_dat_object(tic_dat), "tic_dat not a good object for this factory"
         assert max_failures > 0, "max_failures should be a positive number"
+        dirty = None if since is None else self._dirty_keys(tic_dat, since)
+        if n_jobs != 1 and max_failures == float("inf"):
+            # the foreign key namedtuples can't be pickled, so the workers only return the failures
+            fks = self.foreign_keys
+            found = utils.fork_map(lambda fk: self._find_foreign_key_failures(
+                tic_dat, "High", max_failures, [0], self._full_rows_getter(tic_dat), fks=[fk], dirty=dirty).get(fk),
+                fks, n_jobs)
+            rtn = {fk: v for fk, v in zip(fks, found) if v}
+            if verbosity == "Low":
+                rtn = {tuple(k[:2]) + (tuple(k[2]),): tuple(v) for k,v in rtn.items()}
+            return rtn
+        return self._find_foreign_key_failures(tic_dat, verbosity, max_failures, [0], self._full_rows_getter(tic_dat),
+                                               dirty=dirty)
+    def _sharded_find(self, find, shards, n_jobs):
+        # merges the dictionaries returned by calling find for each shard, with the calls spread across n_jobs
+        # forked worker processes
+        rtn = {}
+        for _ in utils.fork_map(find, shards, n_jobs):
+            rtn.update(_)
+        return rtn
+    def _find_foreign_key_failures(self, tic_dat, verbosity, max_failures, number_failures, full_rows, fks=None,
+                                   dirty=None):
+        # number_failures is a one element list counting the failures found so far, by this and any earlier checks
+        # fks, if provided, restricts the foreign keys that are checked
+        # dirty, if provided, restricts the rows that are checked (see _dirty_keys)
         rtn_values, rtn_pks = clt.defaultdict(set), clt.defaultdict(set)
-
-        def getcell(tblname, native_pk, native_data_row, field_name):
-             assert field_name in self.primary_key_fields.get(tblname, ()) + \
-                                  self.data_fields.get(tblname, ())
-             if [field_name] == list(self.primary_key_fields.get(tblname, ())):
-                 return native_pk
-             if field_name in native_data_row:
-                 return native_data_row[field_name]
-             return native_pk[self.primary_key_fields[tblname].index(field_name)]
-
-        table_data = defaultdict(set)
-        def get_table_data(tblname, fields):
-            if fields == self.primary_key_fields.get(tblname, ()):
-                return getattr(tic_dat, tblname)
-            if (tblname, fields) not in table_data:
-                add_here = table_data[tblname, fields]
-                tbl = getattr(tic_dat, tblname)
-                for k,v in (tbl.items() if dictish(tbl) else enumerate(tbl)):
-                    add_here.add(tuple(getcell(tblname, k, v, f) for f in fields))
-            return table_data[tblname, fields]
-        number_failures = [0] if max_failures < float("inf") else None
         def populate_rtn():
             def inc_failures_trips_end():
-                if number_failures:
-                    number_failures[0] += 1
-                    return number_failures[0] >= max_failures
-            for native, fks in self._foreign_keys_by_native().items():
-                def getcell_(native_pk, native_data_row, field_name):
-                     return getcell(native, native_pk, native_data_row, field_name)
-                for fk in fks:
-                    foreign_to_native = fk.foreigntonativemapping()
-                    for native_pk, native_data_row in (getattr(tic_dat, native).items()
-                                if dictish(getattr(tic_dat, native))
-                                else enumerate(getattr(tic_dat, native))):
-                        ffs = tuple(_ff for _ff in self.primary_key_fields.get(fk.foreign_table, ()) +
-                                    self.data_fields.get(fk.foreign_table, ())
-                                    if _ff in foreign_to_native)
-                        foreign_look_up = tuple(getcell_(native_pk, native_data_row, foreign_to_native[_ff])
-                                            for _ff in ffs)
-                        if ffs == self.primary_key_fields.get(fk.foreign_table) and len(ffs)==1:
-                            foreign_look_up = foreign_look_up[0]
-                        foreign_look_into = get_table_data(fk.foreign_table, ffs)
-                        if foreign_look_up not in foreign_look_into:
-                            rtn_pks[fk].add(native_pk)
-                            if type(fk.mapping) is ForeignKeyMapping :
-                                rtn_values[fk].add(getcell_(native_pk, native_data_row,
-                                                            fk.mapping.native_field))
-                            else:
-                                rtn_values[fk].add(tuple(getcell_(native_pk,
-                                                    native_data_row, _.native_field) for _ in fk.mapping))
-                            if inc_failures_trips_end():
-                                return
+                number_failures[0] += 1
+                return number_failures[0] >= max_failures
+            for native, native_fks in self._foreign_keys_by_native().items():
+                for fk in native_fks:
+                    if fks is not None and fk not in fks:
+                        continue
+                    for native_pk, native_values in self._foreign_key_failure_rows(tic_dat, fk, full_rows, dirty):
+                        rtn_pks[fk].add(native_pk)
+                        rtn_values[fk].add(native_values)
+                        if inc_failures_trips_end():
+                            return
         populate_rtn()
         assert set(rtn_pks) == set(rtn_values)
-        RtnType = namedtuple("ForeignKeyFailures", ("native_values", "native_pks"))
-
-        rtn = {k:RtnType(tuple(rtn_values[k]), tuple(rtn_pks[k])) for k in rtn_pks}
+        rtn = {k:ForeignKeyFailures(tuple(rtn_values[k]), tuple(rtn_pks[k])) for k in rtn_pks}
         if verbosity == "Low":
             rtn = {tuple(k[:2]) + (tuple(k[2]),): tuple(v) for k,v in rtn.items()}
         return rtn
+    def _foreign_key_set(self, tic_dat, table, fields):
+        # the set of the fields values of the rows of table (or table itself, if fields is the primary key)
+        tbl = getattr(tic_dat, table)
+        if fields == self.primary_key_fields.get(table, ()):
+            return tbl
+        # the key sets are cached with the tic_dat, and are only rebuilt once the table has been edited
+        key_sets = getattr(tic_dat, "_foreign_key_sets", {})
+        version = getattr(tbl, "_version", None)
+        cached = key_sets.get((table, fields))
+        if cached and cached[0] is tbl and version is not None and cached[1] == version:
+            return cached[2]
+        get_values = self._fields_getter(table, fields)
+        rtn = {get_values(k, v) for k,v in (tbl.items() if dictish(tbl) else enumerate(tbl))}
+        key_sets[table, fields] = (tbl, version, rtn)
+        return rtn
+    def _foreign_key_failure_rows(self, tic_dat, fk, full_rows=None, dirty=None):
+        # generates (primary key, native field values) for each native table row that fails fk. For tables
+        # without a primary key, the row position serves as the primary key
+        # dirty, if provided, restricts the rows that are checked (see _dirty_keys)
+        native, (ffs, look_up_fields, unpack_single) = fk.native_table, self.compile().foreign_key_plans[fk]
+        # the native field positions are resolved once per foreign key, rather than once per cell
+        get_look_up = self._fields_getter(native, look_up_fields, unpack_single=unpack_single)
+        get_native_values = self._fields_getter(native, fk.nativefields(),
+                                                unpack_single=type(fk.mapping) is ForeignKeyMapping)
+        foreign_look_into = self._foreign_key_set(tic_dat, fk.foreign_table, ffs)
+        native_table = getattr(tic_dat, native)
+        rows = (full_rows(native) if full_rows else
+                native_table.items() if dictish(native_table) else enumerate(native_table))
+        changed_parents = dirty.get(fk.foreign_table) if dirty is not None else None
+        if dirty is not None and dirty.get(native) is not None and changed_parents is not None and \
+                (not changed_parents or ffs == self.primary_key_fields.get(fk.foreign_table)):
+            # a native row can only change its status if it was edited, or if it referenced a parent row that has
+            # since been deleted. (The old values of edited parent data fields aren't known, hence the restriction
+            # to foreign keys into primary keys when parent rows have changed)
+            lost = {k for k in changed_parents if k not in foreign_look_into}
+            check = dirty[native] if not lost else \
+                    dirty[native].union(self._foreign_key_dependents(tic_dat, fk, get_look_up, lost)) \
+                    if dictish(native_table) else None
+            if check is not None:
+                rows = ((pk, dict.__getitem__(native_table, pk)) for pk in check if pk in native_table)
+        for native_pk, native_data_row in rows:
+            if get_look_up(native_pk, native_data_row) not in foreign_look_into:
+                yield native_pk, get_native_values(native_pk, native_data_row)
+    def _foreign_key_dependents(self, tic_dat, fk, get_look_up, lost):
+        # the primary keys of the native table rows whose foreign key look up values are in lost. The look up values
+        # of the native rows are indexed along with the change tracking, and the index is updated incrementally
+        log, _, dependents = tic_dat._change_tracking
+        native_table = getattr(tic_dat, fk.native_table)
+        cached = dependents.get(fk)
+        changed = self._dirty_keys(tic_dat, cached[0]).get(fk.native_table) if cached else None
+        if changed is None:
+            values, pks = {}, clt.defaultdict(set)
+            for pk, row in dict.items(native_table):
+                values[pk] = get_look_up(pk, row)
+                pks[values[pk]].add(pk)
+        else:
+            _, values, pks = cached
+            for pk in changed:
+                if pk in values:
+                    v = values.pop(pk)
+                    pks[v].discard(pk)
+                    if not pks[v]:
+                        del pks[v]
+                if pk in native_table:
+                    values[pk] = get_look_up(pk, dict.__getitem__(native_table, pk))
+                    pks[values[pk]].add(pk)
+        dependents[fk] = (len(log), values, pks)
+        return set().union(*(pks[v] for v in lost if v in pks))
+    def _fields_getter(self, table, fields, unpack_single=False):
+        # a function that maps the (primary key, data row) of a table row to the tuple of values for fields
+        # (or to the lone value, if unpack_single). For tables without a primary key, the row position serves as the
+        # primary key
+        pks = self.primary_key_fields.get(table, ())
+        posns = tuple((True, pks.index(f)) if f in pks else (False, f) for f in fields)
+        if len(pks) == 1:
+            get = lambda key, row: tuple(key if is_pk else row[p] for is_pk, p in posns)
+        else:
+            get = lambda key, row: tuple(key[p] if is_pk else row[p] for is_pk, p in posns)
+        if unpack_single:
+            assert len(fields) == 1
+            return lambda key, row: get(key, row)[0]
+        return get
     def create_full_parameters_dict(self, dat):
         """
         create a fully populated dictionary of all the parameters
@@ -1544,7 +2354,7 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                     for dt in [utils.dateutil_adjuster(df)]}
         return dict(defaults, **{k: v[self.data_fields["parameters"][0]] for k,v in dat.parameters.items()})
 
-    def remove_foreign_key_failures(self, tic_dat, propagate=True):
+    def remove_foreign_key_failures(self, tic_dat, propagate=True, return_removed_keys=False):
         """
         Removes foreign key failures (i.e. child records with no parent table record)
 
@@ -1553,22 +2363,49 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         :param propagate boolean: remove cascading failures? (if removing the child record
                                   results in new failures, should those be removed as well?)
 
+        :param return_removed_keys: boolean. If truthy, also return which rows were removed from each table.
+
         :return: tic_dat, with the foreign key failures removed
+                 If return_removed_keys is truthy, then returns a (tic_dat, dictionary) pair. The dictionary maps
+                 each table that lost rows to a tuple of the primary keys of the removed rows. (For tables without
+                 primary keys, the positions the removed rows had when remove_foreign_key_failures was called).
         """
-        fk_failures = self.find_foreign_key_failures(tic_dat)
-        needs_removal = set()
-        for fk, (_, failed_pks) in fk_failures.items():
-            for failed_pk in failed_pks:
-                if self.primary_key_fields.get(fk.native_table):
-                    assert dictish(getattr(tic_dat, fk.native_table))
-                    if failed_pk in getattr(tic_dat, fk.native_table) :
-                        del(getattr(tic_dat, fk.native_table)[failed_pk])
-                else:
-                    needs_removal.add((fk.native_table, failed_pk))
-        for t,row_index in sorted(needs_removal, reverse=True):
-            getattr(tic_dat, t).pop(row_index)
-        if fk_failures and propagate:
-            return self.remove_foreign_key_failures(tic_dat)
+        assert self.good_tic_dat_object(tic_dat), "tic_dat not a good object for this factory"
+        removed = clt.defaultdict(list)
+        original_posns = {} # for tables without primary keys, the original positions of the remaining rows
+        def remove(table, failed_pks):
+            _table = getattr(tic_dat, table)
+            if dictish(_table):
+                for pk in failed_pks:
+                    if pk in _table:
+                        del _table[pk]
+                        removed[table].append(pk)
+            else:
+                posns = original_posns.setdefault(table, list(range(len(_table))))
+                for i in sorted(set(failed_pks), reverse=True):
+                    _table.pop(i)
+                    removed[table].append(posns.pop(i))
+        if propagate:
+            # the foreign keys are checked with parent tables ahead of their children. A foreign key only needs to
+            # be (re)checked when its parent table loses rows, so (absent circular foreign keys) each is checked once
+            ranks = self.compile().foreign_key_ranks
+            fk_order = {fk: (ranks[fk.native_table], i) for i, fk in enumerate(self.foreign_keys)}
+            to_check = set(self.foreign_keys)
+            while to_check:
+                fk = min(to_check, key=fk_order.get)
+                to_check.remove(fk)
+                failed_pks = [pk for pk, _ in self._foreign_key_failure_rows(tic_dat, fk)]
+                if failed_pks:
+                    remove(fk.native_table, failed_pks)
+                    to_check.update(_ for _ in self.foreign_keys if _.foreign_table == fk.native_table)
+        else:
+            needs_removal = clt.defaultdict(list)
+            for fk, (_, failed_pks) in self.find_foreign_key_failures(tic_dat).items():
+                needs_removal[fk.native_table].extend(failed_pks)
+            for t, failed_pks in needs_removal.items():
+                remove(t, failed_pks)
+        if return_removed_keys:
+            return tic_dat, {t: tuple(pks) for t, pks in removed.items()}
         return tic_dat
 
     def _get_full_row(self, ticdat, table, pk):
@@ -1579,7 +2416,40 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
             full_row = dict(full_row, **{f:d for f,d in
                                          zip(self.primary_key_fields[table], pk)})
         return full_row
-    def find_data_type_failures(self, tic_dat, max_failures=float("inf")):
+    def _full_rows_getter(self, tic_dat, cache=False):
+        # a function that returns the (primary key, full row) pairs of a table. (For tables without a primary key,
+        # these are the (position, data row) pairs). If cache, then the pairs of each table are built at most once
+        cached = {}
+        def full_rows(table):
+            if table in cached:
+                return cached[table]
+            _table = getattr(tic_dat, table)
+            rtn = ((pk, self._get_full_row(tic_dat, table, pk)) for pk in _table) if dictish(_table) \
+                  else enumerate(_table)
+            if cache:
+                rtn = cached[table] = list(rtn)
+            return rtn
+        return full_rows
+    def _changed_rows_getter(self, tic_dat, full_rows, dirty):
+        # restricts full_rows to the rows that dirty flags as possibly changed (see _dirty_keys)
+        if dirty is None:
+            return full_rows
+        def changed_rows(table):
+            if dirty.get(table) is None:
+                return full_rows(table)
+            _table = getattr(tic_dat, table)
+            return ((pk, self._get_full_row(tic_dat, table, pk)) for pk in dirty[table] if pk in _table)
+        return changed_rows
+    def _table_data_frame(self, table, full_rows):
+        # (the row identifiers, a DataFrame with a column for each field and a row for each row of the table)
+        # the row identifiers are the primary keys for tables with a primary key, and the row positions otherwise
+        columns = list(self.compile().all_fields[table])
+        keys, records = [], []
+        for pk, full_row in full_rows(table):
+            keys.append(pk)
+            records.append(tuple(full_row[f] for f in columns))
+        return keys, DataFrame.from_records(records, columns=columns)
+    def find_data_type_failures(self, tic_dat, max_failures=float("inf"), n_jobs=1, since=None):
         """
         Finds the data type failures for a ticdat object
 
@@ -1588,6 +2458,14 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         :param max_failures: number. An upper limit on the number of failures to find. Will short circuit and return
                                      ASAP with a partial failure enumeration when this number is reached.
 
+        :param n_jobs: integer. The number of worker processes to shard the checks across (-1 means one per CPU).
+                       The workers are forked, and thus inherit tic_dat without it being pickled. Ignored if
+                       max_failures is finite (since short circuiting is inherently sequential) or if processes can't
+                       be forked on this platform.
+
+        :param since: a token returned by change_token. If provided, only the rows that were inserted or edited since
+                      the token was issued are re-examined, and only their failures are returned.
+
         :return: A dictionary constructed as follow:
 
          The keys are namedtuples with members "table", "field". Each (table,field) pair
@@ -1613,44 +2491,36 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         """
         assert self.good_tic_dat_object(tic_dat), "tic_dat not a good object for this factory"
         assert max_failures > 0, "max_failures should be a positive number"
-
+        dirty = None if since is None else self._dirty_keys(tic_dat, since)
+        if n_jobs != 1 and max_failures == float("inf"):
+            return self._sharded_find(lambda t: self._find_data_type_failures(
+                tic_dat, max_failures, [0], self._full_rows_getter(tic_dat), tables=[t], dirty=dirty),
+                self.all_tables, n_jobs)
+        return self._find_data_type_failures(tic_dat, max_failures, [0], self._full_rows_getter(tic_dat),
+                                             dirty=dirty)
+    def _find_data_type_failures(self, tic_dat, max_failures, number_failures, full_rows, tables=None,
+                                 dirty=None):
+        # number_failures is a one element list counting the failures found so far, by this and any earlier checks
+        # tables, if provided, restricts the tables that are checked
+        # dirty, if provided, restricts the rows that are checked (see _dirty_keys)
+        full_rows = self._changed_rows_getter(tic_dat, full_rows, dirty)
         rtn_values, rtn_pks = clt.defaultdict(set), clt.defaultdict(set)
-        tmp_tdf = TicDatFactory.create_from_full_schema(self.schema(include_ancillary_info=True))
-        for t, pks in self.primary_key_fields.items():
-            for pk in pks:
-                if pk not in self._data_types.get(t, ()):
-                    tmp_tdf.set_data_type(t, pk, number_allowed=True,
-                      inclusive_min=True, inclusive_max=True, min=-float("inf"), max=float("inf"),
-                      must_be_int=False, strings_allowed='*', nullable=False, datetime=False)
-        number_failures = [0] if max_failures < float("inf") else None
         def populate_rtn():
             def inc_failures_trips_end():
-                if number_failures:
-                    number_failures[0] += 1
-                    return number_failures[0] >= max_failures
-            for table, type_row in tmp_tdf._data_types.items():
-                _table = getattr(tic_dat, table)
-                if dictish(_table):
-                    for pk  in _table:
-                        full_row = self._get_full_row(tic_dat, table, pk)
-                        for field, data_type in type_row.items():
-                            if not data_type.valid_data(full_row[field]) :
-                                rtn_values[(table, field)].add(full_row[field])
-                                rtn_pks[(table, field)].add(pk)
-                                if inc_failures_trips_end():
-                                    return
-                elif containerish(_table):
-                    for pk, data_row in enumerate(_table):
-                        for field, data_type in type_row.items():
-                            if not data_type.valid_data(data_row[field]) :
-                                rtn_values[(table, field)].add(data_row[field])
-                                rtn_pks[(table, field)].add(pk)
-                                if inc_failures_trips_end():
-                                    return
+                number_failures[0] += 1
+                return number_failures[0] >= max_failures
+            for table, type_row in self.compile().data_types.items():
+                if tables is not None and table not in tables:
+                    continue
+                for pk, full_row in full_rows(table):
+                    for field, data_type in type_row.items():
+                        if not data_type.valid_data(full_row[field]) :
+                            rtn_values[(table, field)].add(full_row[field])
+                            rtn_pks[(table, field)].add(pk)
+                            if inc_failures_trips_end():
+                                return
         populate_rtn()
         assert set(rtn_values).issuperset(set(rtn_pks))
-        TableField = clt.namedtuple("TableField", ["table", "field"])
-        ValuesPks = clt.namedtuple("ValuesPks", ["bad_values", "pks"])
         return {TableField(*tf):ValuesPks(tuple(rtn_values[tf]),
                                           tuple(rtn_pks[tf]) if tf in rtn_pks else None)
                 for tf in rtn_values}
@@ -1702,7 +2572,8 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         assert not set(self.find_data_type_failures(tic_dat)).intersection(real_replacements)
         return tic_dat
 
-    def find_data_row_failures(self, tic_dat, exception_handling="__debug__", max_failures=float("inf")):
+    def find_data_row_failures(self, tic_dat, exception_handling="__debug__", max_failures=float("inf"),
+                               n_jobs=1, since=None):
         """
         Finds the data row failures for a ticdat object
 
@@ -1711,7 +2582,8 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         :param exception_handling: One of "Handled as Failure",  "Unhandled" or "__debug__"
               "Handled as Failure": Any exception generated by calling a row predicate function will indicate a data
                                     failure for that row. (Similarly, predicate_kwargs_maker exceptions create an entry
-                                    in the returned failure dictionary).
+                                    in the returned failure dictionary). An exception generated by a vectorized
+                                    predicate indicates a data failure for every row of the table.
               "Unhandled": Exceptions resulting from calling a row predicate (or a predicate_kwargs_maker) will not be
                            handled by data_row_failures.
               "__debug__": Since "Handled as Failure" makes more sense for production runs and "Unhandled" makes more
@@ -1721,6 +2593,17 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         :param max_failures: number. An upper limit on the number of failures to find. Will short circuit and return
                                      ASAP with a partial failure enumeration when this number is reached.
 
+        :param n_jobs: integer. The number of worker processes to shard the checks across (-1 means one per CPU).
+                       The workers are forked, and thus inherit tic_dat without it being pickled. The
+                       predicate_kwargs_makers are called before the checks are sharded. Ignored if
+                       max_failures is finite (since short circuiting is inherently sequential) or if processes can't
+                       be forked on this platform.
+
+        :param since: a token returned by change_token. If provided, only the rows that were inserted or edited since
+                      the token was issued are re-examined, and only their failures are returned. (Predicates with a
+                      predicate_kwargs_maker and vectorized predicates can depend on other rows, and are thus still
+                      applied to every row).
+
         :return: A dictionary constructed as follow:
 
          The keys are namedtuples with members "table", "predicate_name".
@@ -1741,8 +2624,31 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         assert max_failures > 0, "max_failures should be a positive number"
         verify(exception_handling in ["Handled as Failure", "Unhandled", "__debug__"],
                "bad exception_handling argument")
+        dirty = None if since is None else self._dirty_keys(tic_dat, since)
+        if n_jobs != 1 and max_failures == float("inf"):
+            predicate_kwargs_maker_results = self._predicate_kwargs_maker_results(tic_dat, exception_handling)
+            return self._sharded_find(lambda tbl_pn: self._find_data_row_failures(
+                tic_dat, exception_handling, max_failures, [0], self._full_rows_getter(tic_dat),
+                predicates=[tbl_pn], predicate_kwargs_maker_results=predicate_kwargs_maker_results, dirty=dirty),
+                [(t, pn) for t, row_predicates in self._all_data_row_predicates().items() for pn in row_predicates],
+                n_jobs)
+        return self._find_data_row_failures(tic_dat, exception_handling, max_failures, [0],
+                                            self._full_rows_getter(tic_dat), dirty=dirty)
+    def _true_exception_handling(self, exception_handling):
         if exception_handling == "__debug__":
-            exception_handling = "Unhandled" if __debug__ else "Handled as Failure"
+            return "Unhandled" if __debug__ else "Handled as Failure"
+        return exception_handling
+    def _predicate_kwargs_maker_results(self, tic_dat, exception_handling):
+        # calls each predicate_kwargs_maker once, ahead of the row predicates being sharded across worker processes
+        exception_handling = self._true_exception_handling(exception_handling)
+        rtn = {}
+        for row_predicates in self._all_data_row_predicates().values():
+            for rpi in row_predicates.values():
+                if rpi.predicate_kwargs_maker:
+                    utils.predicate_kwargs_maker_result(rpi, tic_dat, exception_handling, rtn)
+        return rtn
+    def _all_data_row_predicates(self):
+        # the data row predicates, including the implicit predicate that checks the parameters table
         data_row_predicates = {k: dict(v) for k,v in self._data_row_predicates.items()}
         if self._parameters:
             def good_parameter(row):
@@ -1756,36 +2662,59 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                                   self._data_row_predicates.get("parameters", {}))
             data_row_predicates["parameters"] = data_row_predicates.get("parameters", {})
             data_row_predicates["parameters"][predicate_name] = RowPredicateInfo(good_parameter, None, "Boolean")
-
-        predicate_kwargs_maker_results = {}
+        return data_row_predicates
+    def _find_data_row_failures(self, tic_dat, exception_handling, max_failures, number_failures, full_rows,
+                                predicates=None, predicate_kwargs_maker_results=None, dirty=None):
+        # number_failures is a one element list counting the failures found so far, by this and any earlier checks
+        # predicates, if provided, restricts the (table, predicate name) pairs that are checked
+        # dirty, if provided, restricts the rows that are checked by the plain row predicates (see _dirty_keys)
+        changed_rows = self._changed_rows_getter(tic_dat, full_rows, dirty)
+        exception_handling = self._true_exception_handling(exception_handling)
+        data_row_predicates = self._all_data_row_predicates()
+        predicate_kwargs_maker_results = {} if predicate_kwargs_maker_results is None \
+                                         else predicate_kwargs_maker_results
+        table_data_frames = {} # built at most once per table, and only for vectorized predicates
         rtn = clt.defaultdict(set)
-        PKEM = clt.namedtuple("PrimaryKeyErrorMessage", ["primary_key", "error_message"])
-        number_failures = [0] if max_failures < float("inf") else None
+        PKEM = PrimaryKeyErrorMessage
         def populate_rtn():
             def inc_failures_trips_end():
-                if number_failures:
-                    number_failures[0] += 1
-                    return number_failures[0] >= max_failures
+                number_failures[0] += 1
+                return number_failures[0] >= max_failures
             for tbl, row_predicates in data_row_predicates.items():
                 for pn, rpi in row_predicates.items():
+                    if predicates is not None and (tbl, pn) not in predicates:
+                        continue
                     predicate_kwargs = {}
                     if rpi.predicate_kwargs_maker:
-                        if rpi.predicate_kwargs_maker not in predicate_kwargs_maker_results:
-                            if exception_handling == "Handled as Failure":
-                                try:
-                                    _predicate_kwargs = rpi.predicate_kwargs_maker(tic_dat)
-                                except Exception as e:
-                                    _predicate_kwargs = f"Exception<{e}>"
-                            else:
-                                _predicate_kwargs = rpi.predicate_kwargs_maker(tic_dat)
-                            predicate_kwargs_maker_results[rpi.predicate_kwargs_maker] = _predicate_kwargs
-                        predicate_kwargs = predicate_kwargs_maker_results[rpi.predicate_kwargs_maker]
+                        predicate_kwargs = utils.predicate_kwargs_maker_result(rpi, tic_dat, exception_handling,
+                                                                               predicate_kwargs_maker_results)
                     if not isinstance(predicate_kwargs, dict):
                         rtn[tbl, pn] = PKEM('*', predicate_kwargs
                                             if (isinstance(predicate_kwargs, str) and "Exception<" in predicate_kwargs)
                                             else f"predicate_kwargs_maker failed to return a dict")
                         if inc_failures_trips_end():
                             return
+                    elif rpi.predicate_vectorized:
+                        if tbl not in table_data_frames:
+                            table_data_frames[tbl] = self._table_data_frame(tbl, full_rows)
+                        keys, df = table_data_frames[tbl]
+                        if exception_handling == "Unhandled":
+                            predicate_result = utils.vectorized_predicate_result(df, rpi.predicate, predicate_kwargs)
+                        else:
+                            try:
+                                predicate_result = utils.vectorized_predicate_result(df, rpi.predicate,
+                                                                                     predicate_kwargs)
+                            except Exception as e:
+                                predicate_result = pd.Series([False if rpi.predicate_failure_response == "Boolean"
+                                                              else f"Exception<{e}>"] * len(df),
+                                                             index=df.index, dtype=object)
+                        where_bad_rows = utils.vectorized_predicate_failures(predicate_result,
+                                                                             rpi.predicate_failure_response)
+                        for i in where_bad_rows.to_numpy().nonzero()[0]:
+                            rtn[tbl, pn].add(keys[i] if rpi.predicate_failure_response == "Boolean" else
+                                             PKEM(keys[i], str(predicate_result.iloc[i])))
+                            if inc_failures_trips_end():
+                                return
                     else:
                         if rpi.predicate_failure_response == "Boolean":
                             def _p(row):
@@ -1801,7 +2730,6 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                                     return f"Exception<{e}>"
                         if exception_handling == "Unhandled":
                             _p = lambda row: rpi.predicate(row, **predicate_kwargs)
-                        _table = getattr(tic_dat, tbl)
                         def handle_full_row_trips_end(pk, full_row):
                             if rpi.predicate_failure_response == "Boolean" and not _p(full_row):
                                 rtn[tbl, pn].add(pk)
@@ -1811,19 +2739,69 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                                 if not _ is True:
                                     rtn[tbl, pn].add(PKEM(pk, str(_)))
                                     return inc_failures_trips_end()
-                        if dictish(_table):
-                            for pk  in _table:
-                                full_row = self._get_full_row(tic_dat, tbl, pk)
-                                if handle_full_row_trips_end(pk, full_row):
-                                    return
-                        else:
-                            for i, data_row in enumerate(_table):
-                                if handle_full_row_trips_end(i, data_row):
-                                    return
+                        for pk, full_row in (full_rows if rpi.predicate_kwargs_maker else changed_rows)(tbl):
+                            if handle_full_row_trips_end(pk, full_row):
+                                return
         populate_rtn()
-        TPN = clt.namedtuple("TablePredicateName", ["table", "predicate_name"])
+        return {TablePredicateName(*k):(v if isinstance(v, PKEM) else tuple(v)) for k,v in rtn.items()}
+
+    def check_all(self, tic_dat, exception_handling="__debug__", max_failures=float("inf"), n_jobs=1):
+        """
+        Performs all the integrity checks for a ticdat object at once. This is equivalent to calling
+        find_data_type_failures, find_data_row_failures and find_foreign_key_failures, but is faster, since
+        tic_dat is validated only once, and the rows of each table are materialized only once and then shared
+        by all the checks. (As a result, the row predicates shouldn't edit their row argument).
+
+        :param tic_dat: ticdat object
+
+        :param exception_handling: See find_data_row_failures.
 
-        return {TPN(*k):(v if isinstance(v, PKEM) else tuple(v)) for k,v in rtn.items()}
+        :param max_failures: number. An upper limit on the total number of failures to find, across all the checks.
+                                     Will short circuit and return ASAP with a partial failure enumeration when this
+                                     number is reached.
+
+        :param n_jobs: integer. The number of worker processes to shard the checks across (-1 means one per CPU).
+                       The shards of all three checks are spread across the same workers. See the n_jobs argument
+                       of the find_ functions.
+
+        :return: A namedtuple with members "data_type_failures", "data_row_failures" and "foreign_key_failures".
+                 Each member is the dictionary returned by the corresponding find_ function.
+        """
+        assert self.good_tic_dat_object(tic_dat), "tic_dat not a good object for this factory"
+        assert max_failures > 0, "max_failures should be a positive number"
+        verify(exception_handling in ["Handled as Failure", "Unhandled", "__debug__"],
+               "bad exception_handling argument")
+        number_failures, full_rows = [0], self._full_rows_getter(tic_dat, cache=True)
+        checks = [lambda: self._find_data_type_failures(tic_dat, max_failures, number_failures, full_rows),
+                  lambda: self._find_data_row_failures(tic_dat, exception_handling, max_failures, number_failures,
+                                                       full_rows),
+                  lambda: self._find_foreign_key_failures(tic_dat, "High", max_failures, number_failures, full_rows)]
+        IntegrityFailures = clt.namedtuple("IntegrityFailures", ["data_type_failures", "data_row_failures",
+                                                                 "foreign_key_failures"])
+        if n_jobs != 1 and max_failures == float("inf"):
+            predicate_kwargs_maker_results = self._predicate_kwargs_maker_results(tic_dat, exception_handling)
+            shards = [("data_type_failures", t) for t in self.all_tables] + \
+                     [("data_row_failures", (t, pn)) for t, row_predicates in self._all_data_row_predicates().items()
+                      for pn in row_predicates] + \
+                     [("foreign_key_failures", fk) for fk in self.foreign_keys]
+            def find(shard):
+                check, arg = shard
+                if check == "data_type_failures":
+                    return self._find_data_type_failures(tic_dat, max_failures, [0], full_rows, tables=[arg])
+                if check == "data_row_failures":
+                    return self._find_data_row_failures(tic_dat, exception_handling, max_failures, [0], full_rows,
+                        predicates=[arg], predicate_kwargs_maker_results=predicate_kwargs_maker_results)
+                # the foreign key namedtuples can't be pickled, so the workers only return the failures
+                return self._find_foreign_key_failures(tic_dat, "High", max_failures, [0], full_rows,
+                                                       fks=[arg]).get(arg)
+            rtn = {_: {} for _ in IntegrityFailures._fields}
+            for (check, arg), found in zip(shards, utils.fork_map(find, shards, n_jobs)):
+                if check != "foreign_key_failures":
+                    rtn[check].update(found)
+                elif found:
+                    rtn[check][arg] = found
+            return IntegrityFailures(**rtn)
+        return IntegrityFailures(*[check() if number_failures[0] < max_failures else {} for check in checks])
 
     def obfusimplify(self, tic_dat, table_prepends = utils.FrozenDict(), skip_tables = (),
                      freeze_it = False) :
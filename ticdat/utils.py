@@ -3,8 +3,10 @@ general utility module
 PEP8
 """
 from numbers import Number
-from itertools import chain, combinations
-from collections import defaultdict
+from itertools import chain, combinations, count
+from collections import defaultdict, OrderedDict, Counter
+import collections.abc as clt_abc
+from array import array
 import ticdat
 import getopt
 import sys
@@ -28,6 +30,8 @@ try:
 except:
     drm = None
 import inspect
+import multiprocessing
+import weakref
 
 def dat_restricted(table_list):
     '''
@@ -177,6 +181,64 @@ class TypeDictionary(namedtuple("TypeDictionary",
             assert containerish(self.strings_allowed)
             return data in self.strings_allowed
         return False
+    def valid_data_series(self, series):
+        """
+        a vectorized version of valid_data, that checks an entire pandas Series at once.
+
+        :param series: a pandas Series
+
+        :return: a boolean Series, with the same index as series, that is True for the entries that are valid
+                 (i.e. that valid_data would accept)
+        """
+        verify(pd, "pandas needs to be installed to use valid_data_series")
+        not_null = series.notnull().to_numpy()
+        rtn = numpy.full(len(series), bool(self.nullable))
+        values = series.to_numpy()[not_null]
+        if self.datetime and pd.api.types.is_datetime64_any_dtype(series.dtype):
+            rtn[not_null] = True
+        elif not self.datetime and pd.api.types.is_numeric_dtype(series.dtype) and \
+             not pd.api.types.is_bool_dtype(series.dtype):
+            rtn[not_null] = self._valid_numbers(values)
+        elif not self.datetime and series.dtype == object:
+            # classify by type, so that numbers and strings can each be checked in bulk
+            kinds = {t: "number" if issubclass(t, Number) and not issubclass(t, bool) else
+                        ("string" if stringish(t) else "other") for t in set(map(type, values))}
+            kind = numpy.array(list(map(kinds.__getitem__, map(type, values))), dtype=object)
+            valid = numpy.zeros(len(values), dtype=bool)
+            valid[kind == "number"] = self._valid_numbers(values[kind == "number"])
+            strings = kind == "string"
+            valid[strings] = True if self.strings_allowed == "*" else \
+                             pd.Series(values[strings], dtype=object).isin(self.strings_allowed).to_numpy()
+            rtn[not_null] = valid
+        else:
+            # datetime parsing is expensive, so each distinct value is only checked once
+            cache = {}
+            def valid_data(x):
+                try:
+                    return cache[type(x), x]
+                except KeyError:
+                    cache[type(x), x] = rtn_ = self.valid_data(x)
+                    return rtn_
+                except TypeError: # unhashable
+                    return self.valid_data(x)
+            rtn[not_null] = [valid_data(x) for x in values]
+        return pd.Series(rtn, index=series.index)
+    def _valid_numbers(self, values):
+        if not self.number_allowed:
+            return numpy.zeros(len(values), dtype=bool)
+        rtn = (values >= self.min) if self.inclusive_min else (values > self.min)
+        rtn &= (values <= self.max) if self.inclusive_max else (values < self.max)
+        if self.must_be_int:
+            try:
+                float_values = values.astype(float)
+            except OverflowError:
+                # some (Python int) values are beyond the float range, so each value is checked on its own
+                return numpy.array([self.valid_data(x) for x in values], dtype=bool)
+            is_int = numpy.isfinite(float_values) & (numpy.floor(float_values) == float_values)
+            if self.inclusive_max and self.max == float("inf"):
+                is_int |= float_values == float("inf")
+            rtn &= is_int
+        return rtn.astype(bool)
     @staticmethod
     def safe_creator(number_allowed, inclusive_min, inclusive_max, min, max,
                       must_be_int, strings_allowed, nullable, datetime=False):
@@ -672,30 +734,53 @@ class Slicer(object):
     """
     Object to perform multi-index slicing over an index sequence
     """
-    def __init__(self, iter_of_iters):
+    def __init__(self, iter_of_iters, backend="auto", memory_budget=None):
         """
         Construct a multi-index Slicer object
         :param iter_of_iters An iterable of iterables. Usually a list of lists, or a list
         of tuples. Each inner iterable must be the same size. The "*" string has a special
         flag meaning and cannot be a member of any of the inner iterables.
+        :param backend "auto", "dict" or "numpy".
+        "auto" uses gurobipy.tuplelist when possible, and "dict" otherwise.
+        "dict" archives every slicing pattern (i.e. every placement of '*') as a dict of lists of the matching tuples.
+        "numpy" encodes each index position as integer codes, and indexes each slicing pattern with a sorted
+        permutation that is searched with binary search. This uses far less memory than "dict" for large index
+        sequences, and requires numpy.
+        :param memory_budget An optional number of bytes. Limits the memory used by the per slicing pattern indexes
+        of the "numpy" backend, with the least recently used indexes discarded (and rebuilt when next needed) to
+        stay within budget.
         Slicer is fairly similar to gurobipy.tuplelist, and will try to use tuplelist for improved performance
         whenever possible. One key difference is Slicer can accommodate tuples that themselves contain tuples (or
         really any hashable) wherease tuplelist should only be used with tuples that themselves contain only primitives.
         """
+        verify(backend in ("auto", "dict", "numpy"), "backend should be one of 'auto', 'dict', 'numpy'")
+        verify(backend != "numpy" or numpy, "numpy needs to be installed to use the numpy backend")
+        verify(memory_budget is None or (numericish(memory_budget) and memory_budget >= 0),
+               "memory_budget should be a non-negative number")
         verify(hasattr(iter_of_iters, "__iter__"), "need an iterator of iterators")
         copied = tuple(iter_of_iters)
         verify(all(hasattr(_, "__iter__") for _ in copied), "need iterator of iterators")
-        self._indicies = tuple(map(tuple, copied))
+        self._indicies = list(map(tuple, copied))
         if self._indicies:
             verify(min(map(len, self._indicies)) == max(map(len, self._indicies)),
                    "each inner iterator needs to have the same number of elements")
             verify(not any("*" in _ for _ in self._indicies),
                    "The '*' character cannot itself be used as an index")
+        self._memory_budget = memory_budget
         self._gu = None
-        if gu and not any(any(map(containerish, _)) for _ in self._indicies):
+        if backend == "auto" and gu and not any(any(map(containerish, _)) for _ in self._indicies):
             self._gu = gu.tuplelist(self._indicies)
             self._indicies = None
-        self.clear()
+        self._numpy = backend == "numpy"
+        # removals are recorded as tombstones, which are purged once they account for half of self._indicies
+        self._dead = Counter() # dict backend : the removed tuples, which are the first occurrences in self._indicies
+        self._alive = None # numpy backend : a mask over the encoded tuples, None if none of them have been removed
+        self._dead_count = 0
+        self._counts = None # dict backend : the number of live occurrences of each tuple, built by the first remove
+        if self._numpy:
+            self._encode()
+        else:
+            self.clear()
 
     def slice(self, *args):
         """
@@ -713,10 +798,129 @@ class Slicer(object):
         fixedposns = tuple(i for i in range(len(args)) if i not in wildcards)
         def fa(t):
             return tuple(t[i] for i in fixedposns)
+        rtn = []
+        if self._numpy:
+            # the encoded tuples are searched with the pattern indexes, and the tuples added since then are
+            # archived the same way the dict backend archives every tuple
+            rtn = [self._indicies[i] for i in self._numpy_positions(args, wildcards, fixedposns).tolist()]
+            indicies = self._indicies[len(self._codes):]
+        else:
+            indicies = self._live_indicies()
         if wildcards not in self._archived_slicings:
-            for indx in self._indicies:
+            for indx in indicies:
                 self._archived_slicings[wildcards][fa(indx)].append(indx)
-        return list(self._archived_slicings[wildcards][fa(args)])
+        return rtn + self._archived_slicings[wildcards].get(fa(args), [])
+    def add(self, *args):
+        """
+        Add an index tuple. The archived slicings are updated rather than rebuilt.
+        :param *args the index values. I.e. slicer.add(1, 2) adds (1, 2).
+        :return:
+        """
+        self._forceguout()
+        verify(not self._indicies or len(args) == len(self._indicies[0]), "inconsistent number of elements")
+        verify("*" not in args, "The '*' character cannot itself be used as an index")
+        self._indicies.append(args)
+        if self._numpy and len(self._indicies) - len(self._codes) > max(1000, len(self._codes) // 4):
+            # the tuples added since the last encoding are merged in, so as to amortize the cost of re-encoding
+            return self._encode()
+        if self._counts is not None:
+            self._counts[args] += 1
+        for wildcards, slicings in self._archived_slicings.items():
+            slicings[tuple(x for i, x in enumerate(args) if i not in wildcards)].append(args)
+    def remove(self, *args):
+        """
+        Remove an index tuple. If it was provided more than once, only one occurrence is removed. The archived
+        slicings are updated rather than rebuilt.
+        :param *args the index values. I.e. slicer.remove(1, 2) removes (1, 2).
+        :return:
+        """
+        self._forceguout()
+        if self._numpy:
+            positions = self._numpy_positions(args, (), tuple(range(len(args)))) \
+                        if self._indicies and len(args) == len(self._indicies[0]) else ()
+            if len(positions):
+                if self._alive is None:
+                    self._alive = numpy.ones(len(self._codes), dtype=bool)
+                self._alive[positions[0]] = False
+                self._dead_count += 1
+                if self._dead_count * 2 > len(self._codes):
+                    self._encode()
+                return
+            verify(args in self._indicies[len(self._codes):], "%s is not an index of this Slicer"%(args,))
+            del self._indicies[self._indicies.index(args, len(self._codes))]
+        else:
+            if self._counts is None:
+                self._counts = Counter(self._live_indicies())
+            verify(self._counts.get(args), "%s is not an index of this Slicer"%(args,))
+            self._counts[args] -= 1
+            self._dead[args] += 1
+            self._dead_count += 1
+        for wildcards, slicings in self._archived_slicings.items():
+            fa = tuple(x for i, x in enumerate(args) if i not in wildcards)
+            slicings[fa].remove(args)
+            if not slicings[fa]:
+                del slicings[fa]
+        if not self._numpy and self._dead_count * 2 > len(self._indicies):
+            self._indicies = self._live_indicies()
+            self._dead, self._dead_count = Counter(), 0
+    def _live_indicies(self):
+        if not self._dead_count:
+            return self._indicies
+        dead = Counter(self._dead)
+        rtn = []
+        for indx in self._indicies:
+            if dead.get(indx):
+                dead[indx] -= 1
+            else:
+                rtn.append(indx)
+        return rtn
+    def _encode(self):
+        # (re)encodes the live index tuples for the numpy backend. Each distinct value at each position is
+        # assigned an integer code, in order of first appearance
+        if self._alive is not None:
+            self._indicies = [indx for indx, alive in zip(self._indicies, self._alive.tolist()) if alive] + \
+                             self._indicies[len(self._codes):]
+        self._value_codes = [{} for _ in (self._indicies[0] if self._indicies else ())]
+        self._codes = numpy.array([[vc.setdefault(x, len(vc)) for vc, x in zip(self._value_codes, indx)]
+                                   for indx in self._indicies],
+                                  dtype=numpy.int32 if len(self._indicies) < 2**31 else numpy.int64)
+        self._codes.shape = (len(self._indicies), len(self._value_codes))
+        self._alive, self._dead_count = None, 0
+        self.clear()
+    def _numpy_positions(self, args, wildcards, fixedposns):
+        # the positions (in self._indicies) of the live encoded tuples that match args
+        query = []
+        for i in fixedposns:
+            code = self._value_codes[i].get(args[i]) if len(self._codes) else None
+            if code is None:
+                return numpy.array([], dtype=int)
+            query.append(code)
+        if wildcards in self._pattern_indexes:
+            self._pattern_indexes.move_to_end(wildcards)
+        else:
+            self._add_pattern_index(wildcards, fixedposns)
+        perm, sorted_columns = self._pattern_indexes[wildcards]
+        # the rows matching the fixed positions are contiguous in perm. Each successive fixed position is sorted
+        # within the range matching the fixed positions that precede it.
+        lo, hi = 0, len(perm)
+        for column, code in zip(sorted_columns, query):
+            sub_column = column[lo:hi]
+            lo, hi = (lo + int(numpy.searchsorted(sub_column, code, "left")),
+                      lo + int(numpy.searchsorted(sub_column, code, "right")))
+        rtn = perm[lo:hi]
+        return rtn if self._alive is None else rtn[self._alive[rtn]]
+    def _add_pattern_index(self, wildcards, fixedposns):
+        # lexsort is stable, so the tuples matching a slice are returned in their original order
+        perm = numpy.lexsort([self._codes[:, i] for i in reversed(fixedposns)]) if fixedposns else \
+               numpy.arange(len(self._codes))
+        sorted_columns = [self._codes[perm, i] for i in fixedposns]
+        nbytes = perm.nbytes + sum(_.nbytes for _ in sorted_columns)
+        while self._pattern_indexes and self._memory_budget is not None and \
+              self._pattern_index_bytes + nbytes > self._memory_budget:
+            _perm, _sorted_columns = self._pattern_indexes.popitem(last=False)[1]
+            self._pattern_index_bytes -= _perm.nbytes + sum(_.nbytes for _ in _sorted_columns)
+        self._pattern_indexes[wildcards] = (perm, sorted_columns)
+        self._pattern_index_bytes += nbytes
     def clear(self):
         """
         reduce memory overheard by clearing out any archived slicing.
@@ -724,9 +928,11 @@ class Slicer(object):
         :return:
         """
         self._archived_slicings = defaultdict(lambda : defaultdict(list))
+        self._pattern_indexes = OrderedDict()
+        self._pattern_index_bytes = 0
     def _forceguout(self):
         if self._gu:
-            self._indicies = tuple(map(tuple, self._gu))
+            self._indicies = list(map(tuple, self._gu))
             self._gu = None
 
 def do_it(g): # just walks through everything in a gen - I like the syntax this enables
@@ -843,63 +1049,309 @@ def deep_freeze(x) :
 def td_row_factory(table, key_field_names, data_field_names, default_values={}):
     assert dictish(default_values) and set(default_values).issubset(data_field_names)
     assert not set(key_field_names).intersection(data_field_names)
+    # the foreign key links that will be built the first time they are requested from any row of the table
+    # (see TicDat._try_make_foreign_links)
+    lazy_links = {}
+    def lazy_link_getattr(self, item):
+        if item in lazy_links :
+            lazy_links.pop(item)()
+            return object.__getattribute__(self, item)
+        raise AttributeError("'%s' object has no attribute '%s'"%(type(self).__name__, item))
     if not data_field_names:
          # need a freezeable dict not a frozen dict here so can still link foreign keys
-        def makefreezeabledict(x=()) :
-            verify(containerish(x) and len(x) == 0, "Attempting to add non-empty data to %s"%table)
-            return FreezeableDict()
-        return makefreezeabledict
-    fieldtoindex = {x:data_field_names.index(x) for x in data_field_names}
-    indextofield = {v:k for k,v in fieldtoindex.items()}
-    class TicDatDataRow(freezable_factory(object, "_attributesFrozen")) :
+        class TicDatDataRow(FreezeableDict) :
+            _dataFrozen = _attributesFrozen = False
+            _lazy_links = lazy_links
+            __getattr__ = lazy_link_getattr
+            def __init__(self, x=()):
+                verify(containerish(x) and len(x) == 0, "Attempting to add non-empty data to %s"%table)
+                super(TicDatDataRow, self).__init__()
+        return TicDatDataRow
+    # everything that can be worked out from the schema is worked out once, here, so that the row methods
+    # don't need to allocate anything or re-derive anything on each call
+    data_field_names = tuple(data_field_names)
+    datalen = len(data_field_names)
+    fieldtoindex = {x:i for i,x in enumerate(data_field_names)}
+    fieldset = frozenset(data_field_names)
+    # since ticDat targeting numerical analysis, 0 is good default default
+    defaults = [default_values.get(f, 0) for f in data_field_names]
+    bad_length_message = "%s requires each row to have %s data values"%(table, datalen)
+    class TicDatDataRow(object) :
+        # __dict__ is retained so that foreign key links can be attached to a row
+        __slots__ = ("_data", "__dict__")
+        # the frozen flags are set on the class, so that all the rows of a table are frozen at once
+        _dataFrozen = _attributesFrozen = False
+        _lazy_links = lazy_links
+        __getattr__ = lazy_link_getattr
+        # the data fields that the table needs to hear about edits to (see TicDatFactory.add_index,
+        # TicDatFactory.find_foreign_key_failures and TicDatFactory.change_token)
+        _watched_fields = frozenset()
         def __init__(self, x):
-            # since ticDat targeting numerical analysis, 0 is good default default
-            self._data = [0] * len(fieldtoindex)
-            if dictish(x) :
-                verify(set(x.keys()).issubset(fieldtoindex),
-                       "Applying inappropriate data field names to %s"%table)
-                for f,i in fieldtoindex.items():
-                    if f in default_values :
-                        self._data[i] = default_values[f]
+            if type(x) is tuple or type(x) is list :
+                if len(x) != datalen :
+                    raise TicDatError(bad_length_message)
+                set_data(self, list(x))
+            elif type(x) is dict or dictish(x) :
+                if not fieldset.issuperset(x.keys()) :
+                    raise TicDatError("Applying inappropriate data field names to %s"%table)
+                data = list(defaults)
                 for f,_d in x.items():
-                    self[f] = _d
+                    data[fieldtoindex[f]] = _d
+                set_data(self, data)
             elif containerish(x) :
-                verify(len(x) == len(self), "%s requires each row to have %s data values"%
-                       (table, len(self)))
-                for i in range(len(self)):
-                    self._data[i] = x[i]
+                if len(x) != datalen :
+                    raise TicDatError(bad_length_message)
+                set_data(self, [x[i] for i in range(datalen)])
             else:
-                verify(len(self) ==1, "%s requires each row to have %s data values"%
-                       (table, len(self)))
-                self._data[0] = x
+                if datalen != 1 :
+                    raise TicDatError(bad_length_message)
+                set_data(self, [x])
         def __getitem__(self, item):
             try :
                 return self._data[fieldtoindex[item]]
             except :
                 raise TicDatError("Key error : %s not data field name for table %s"% (item, table))
         def __setitem__(self, key, value):
-            verify(key in fieldtoindex, "Key error : %s not data field name for table %s"%
-                   (key, table))
-            if getattr(self, "_dataFrozen", False) :
+            if key not in fieldtoindex :
+                raise TicDatError("Key error : %s not data field name for table %s"% (key, table))
+            if self._dataFrozen :
                 raise TicDatError("Can't edit a frozen TicDatDataRow")
-            self._data[fieldtoindex[key]] = value
+            if key in self._watched_fields :
+                old_value, self._data[fieldtoindex[key]] = self._data[fieldtoindex[key]], value
+                self._on_watched_edit(self, key, old_value)
+            else :
+                self._data[fieldtoindex[key]] = value
+        def __setattr__(self, key, value):
+            if self._attributesFrozen :
+                raise TicDatError("can't set attributes to a frozen TicDatDataRow")
+            object.__setattr__(self, key, value)
+        def __delattr__(self, item):
+            if self._attributesFrozen :
+                raise TicDatError("can't del attributes to a frozen TicDatDataRow")
+            object.__delattr__(self, item)
         def keys(self):
-            return tuple(indextofield[i] for i in range(len(self)))
+            return data_field_names
         def values(self):
             return tuple(self._data)
         def items(self):
-            return zip(self.keys(), self.values())
+            return zip(data_field_names, self._data)
         def __contains__(self, item):
             return item in fieldtoindex
         def __iter__(self):
-            return iter(fieldtoindex)
+            return iter(data_field_names)
         def __len__(self):
-            return len(self._data)
+            return datalen
         def __repr__(self):
-            return "_td:" + {k:v for k,v in self.items()}.__repr__()
+            return "_td:" + dict(zip(data_field_names, self._data)).__repr__()
+        @staticmethod
+        def _share_data(row):
+            # a new row of this class whose data is shared with row (see TicDatFactory.copy_tic_dat)
+            rtn = TicDatSharedDataRow.__new__(TicDatSharedDataRow)
+            set_data(rtn, row._data)
+            return rtn
+        @staticmethod
+        def _mark_shared(row):
+            # row is about to share its data, and thus needs to copy it before it is next edited
+            if type(row) is TicDatDataRow :
+                object.__setattr__(row, "__class__", TicDatSharedDataRow)
+    class TicDatSharedDataRow(TicDatDataRow) :
+        # a row whose data might be shared with some other row. The data is copied the first time the row is
+        # edited, at which point the row becomes a regular TicDatDataRow
+        __slots__ = ()
+        def __setitem__(self, key, value):
+            if key in fieldtoindex and not self._dataFrozen :
+                set_data(self, list(self._data))
+                object.__setattr__(self, "__class__", TicDatDataRow)
+            TicDatDataRow.__setitem__(self, key, value)
+    set_data = TicDatDataRow._data.__set__ # writes the slot directly, skipping the frozen check in __setattr__
     assert dictish(TicDatDataRow)
     return TicDatDataRow
 
+def _new_column_for(value):
+    # the first value appended to an empty column determines if a typed array can be used
+    if isinstance(value, float):
+        return array("d")
+    if type(value) is int and -2**63 <= value < 2**63:
+        return array("q")
+    return []
+
+def _new_column_from(values):
+    if values and all(isinstance(v, float) for v in values):
+        return array("d", values)
+    if values and all(type(v) is int and -2**63 <= v < 2**63 for v in values):
+        return array("q", values)
+    return list(values)
+
+def _column_fits(column, value):
+    if type(column) is list:
+        return True
+    if column.typecode == "d":
+        return isinstance(value, float)
+    return type(value) is int and -2**63 <= value < 2**63
+
+def td_columnar_table_factory(table, key_field_names, data_field_names, default_values={}):
+    """
+    Creates the dict-like class used for the columnar tables of a TicDatFactory (see set_columnar_tables).
+    Rather than holding one row object per primary key, the primary keys are kept in a hash index and each data
+    field is held in its own column. A column is a typed array.array so long as every value it holds is a float
+    (or every value is an int), and falls back to a list otherwise. Rows are served up as light weight views that
+    read and write through to the columns.
+    """
+    assert key_field_names and dictish(default_values) and set(default_values).issubset(data_field_names)
+    assert not set(key_field_names).intersection(data_field_names)
+    keylen = len(key_field_names)
+    data_field_names = tuple(data_field_names)
+    fieldtoindex = {x:i for i,x in enumerate(data_field_names)}
+    defaults = tuple(default_values.get(f, 0) for f in data_field_names)
+
+    class TicDatColumnarRow(object):
+        __slots__ = ("_table", "_key")
+        def __init__(self, table_, key):
+            self._table = table_
+            self._key = key
+        def _posn(self):
+            try:
+                return self._table._positions[self._key]
+            except KeyError:
+                raise TicDatError("%s is no longer a row of %s"%(self._key, table))
+        def __getitem__(self, item):
+            if item not in fieldtoindex:
+                raise TicDatError("Key error : %s not data field name for table %s"% (item, table))
+            return self._table._columns[fieldtoindex[item]][self._posn()]
+        def __setitem__(self, key, value):
+            verify(key in fieldtoindex, "Key error : %s not data field name for table %s"%
+                   (key, table))
+            if getattr(self._table, "_dataFrozen", False) :
+                raise TicDatError("Can't edit a frozen TicDatDataRow")
+            self._table._set_cell(self._posn(), fieldtoindex[key], value)
+        def keys(self):
+            return data_field_names
+        def values(self):
+            posn = self._posn()
+            return tuple(c[posn] for c in self._table._columns)
+        def items(self):
+            return zip(data_field_names, self.values())
+        def __contains__(self, item):
+            return item in fieldtoindex
+        def __iter__(self):
+            return iter(data_field_names)
+        def __len__(self):
+            return len(data_field_names)
+        def __repr__(self):
+            return "_td:" + {k:v for k,v in self.items()}.__repr__()
+
+    class TicDatColumnarDict(freezable_factory(clt_abc.MutableMapping, "_attributesFrozen")):
+        _columnar = True
+        def __init__(self, *_args, **_kwargs):
+            self._positions = {}
+            self._keys = []
+            self._columns = [[] for _ in data_field_names]
+            self.update(*_args, **_kwargs)
+        def _row_data(self, value):
+            if dictish(value) :
+                verify(set(value.keys()).issubset(fieldtoindex),
+                       "Applying inappropriate data field names to %s"%table)
+                return tuple(value[f] if f in value else d for f, d in zip(data_field_names, defaults))
+            if containerish(value) :
+                verify(len(value) == len(data_field_names), "%s requires each row to have %s data values"%
+                       (table, len(data_field_names)))
+                return tuple(value)
+            verify(len(data_field_names) == 1, "%s requires each row to have %s data values"%
+                   (table, len(data_field_names)))
+            return (value,)
+        def _set_cell(self, posn, i, value):
+            column = self._columns[i]
+            if not _column_fits(column, value):
+                column = self._columns[i] = list(column)
+            column[posn] = value
+        def _append_row(self, key, data):
+            self._positions[key] = len(self._keys)
+            self._keys.append(key)
+            for i, value in enumerate(data):
+                column = self._columns[i]
+                if not len(column):
+                    column = self._columns[i] = _new_column_for(value)
+                elif not _column_fits(column, value):
+                    column = self._columns[i] = list(column)
+                column.append(value)
+        def _load_columns(self, keys, columns):
+            # bulk population of an empty table from the keys and the parallel data columns
+            assert not self._positions and len(columns) == len(data_field_names)
+            keys = list(keys)
+            positions = dict(zip(keys, range(len(keys))))
+            if len(positions) < len(keys): # duplicated keys, so the later rows need to overwrite the earlier
+                for key, data in zip(keys, zip(*columns) if columns else ((),)*len(keys)):
+                    self[key] = data
+                return
+            self._keys = keys
+            self._positions = positions
+            self._columns = [_new_column_from(c) for c in columns]
+        def _column(self, field):
+            """
+            :return: the column for a data field. Its entries line up with self._keys, which might differ from the
+                     iteration order of the table itself.
+            """
+            return self._columns[fieldtoindex[field]]
+        def __setitem__(self, key, value):
+            verify(containerish(key) ==  (keylen > 1) and (keylen == 1 or keylen == len(key)),
+                   "inconsistent key length for %s"%table)
+            if getattr(self, "_dataFrozen", False) :
+                raise TicDatError("Can't edit a frozen " + self.__class__.__name__)
+            data = self._row_data(value)
+            if key not in self._positions:
+                return self._append_row(key, data)
+            posn = self._positions[key]
+            for i, value in enumerate(data):
+                self._set_cell(posn, i, value)
+        def __getitem__(self, item):
+            if item not in self._positions:
+                if getattr(self, "_dataFrozen", False):
+                    raise KeyError(item)
+                self[item] = {}
+            return TicDatColumnarRow(self, item)
+        def __delitem__(self, key):
+            if getattr(self, "_dataFrozen", False) :
+                raise TicDatError("Can't edit a frozen " + self.__class__.__name__)
+            posn = self._positions.pop(key)
+            last = len(self._keys) - 1
+            if posn != last: # move the last row into the vacated position
+                moved = self._keys[last]
+                self._keys[posn] = moved
+                self._positions[moved] = posn
+                for column in self._columns:
+                    column[posn] = column[last]
+            self._keys.pop()
+            for column in self._columns:
+                column.pop()
+        def __contains__(self, item):
+            return item in self._positions
+        def __iter__(self):
+            return iter(self._positions)
+        def __len__(self):
+            return len(self._positions)
+        def keys(self):
+            return self._positions.keys()
+        def get(self, key, default=None):
+            return self[key] if key in self._positions else default
+        def pop(self, key, *default):
+            # a view onto a deleted row would be useless, so return a plain dict instead
+            if key not in self._positions:
+                if default:
+                    return default[0]
+                raise KeyError(key)
+            rtn = dict(self[key].items())
+            del self[key]
+            return rtn
+        def popitem(self):
+            if not self._positions:
+                raise KeyError("popitem(): %s is empty"%table)
+            key = next(iter(self._positions))
+            return key, self.pop(key)
+        def __repr__(self):
+            return "td:" + {k:dict(v.items()) for k,v in self.items()}.__repr__()
+    assert dictish(TicDatColumnarDict)
+    return TicDatColumnarDict
+
 
 class Sloc(object):
     """
@@ -1091,8 +1543,94 @@ def per_error(x1, x2) :
 def nearly_same(x1, x2, epsilon) :
     return per_error(x1, x2) < epsilon
 
+def make_snapshot(objects, versions):
+    """
+    make an (objects, versions) snapshot for same_snapshot. The objects are only weakly referenced, so that a
+    snapshot never keeps them alive (and thus can be memoized against an object that refers to them).
+    :param objects: an iterable of objects
+    :param versions: an iterable of versions
+    :return: the snapshot, or None if some of the objects can't be weakly referenced
+    """
+    try:
+        return tuple(weakref.ref(_) for _ in objects), tuple(versions)
+    except TypeError:
+        return None
+
+def same_snapshot(snapshot1, snapshot2):
+    """
+    are two snapshots (as created by make_snapshot) the same? The objects are compared by identity, so that
+    large tables are never compared cell by cell.
+    :param snapshot1: a snapshot, or None
+    :param snapshot2: a snapshot, or None
+    :return: True if neither snapshot is None and they refer to the same live objects at the same versions
+    """
+    if snapshot1 is None or snapshot2 is None:
+        return False
+    if snapshot1[1] != snapshot2[1] or len(snapshot1[0]) != len(snapshot2[0]):
+        return False
+    for ref1, ref2 in zip(snapshot1[0], snapshot2[0]):
+        x1 = ref1()
+        if x1 is None or x1 is not ref2():
+            return False
+    return True
+
 RowPredicateInfo = namedtuple("RowPredicateInfo", ["predicate", "predicate_kwargs_maker",
-                                                   "predicate_failure_response"])
+                                                   "predicate_failure_response", "predicate_vectorized"],
+                              defaults=(False,))
+
+def predicate_kwargs_maker_result(rpi, dat, exception_handling, results):
+    """
+    the result of calling the predicate_kwargs_maker of a RowPredicateInfo. Each predicate_kwargs_maker is called
+    at most once, with results serving as the cache
+    :param rpi: RowPredicateInfo with a predicate_kwargs_maker
+    :param dat: the dat object being checked
+    :param exception_handling: either "Handled as Failure" or "Unhandled" (see find_data_row_failures)
+    :param results: dict mapping predicate_kwargs_maker to result
+    :return: the dict returned by predicate_kwargs_maker, or whatever else it returned, or an exception string
+    """
+    if rpi.predicate_kwargs_maker not in results:
+        if exception_handling == "Handled as Failure":
+            try:
+                _predicate_kwargs = rpi.predicate_kwargs_maker(dat)
+            except Exception as e:
+                _predicate_kwargs = f"Exception<{e}>"
+        else:
+            _predicate_kwargs = rpi.predicate_kwargs_maker(dat)
+        results[rpi.predicate_kwargs_maker] = _predicate_kwargs
+    return results[rpi.predicate_kwargs_maker]
+
+def vectorized_predicate_result(df, predicate, predicate_kwargs):
+    """
+    evaluates a vectorized row predicate (see add_data_row_predicate) against every row of a DataFrame at once
+    :param df: a DataFrame with a column for each field of the table
+    :param predicate: either a DataFrame.eval expression string, or a function that accepts the DataFrame
+                      (along with the predicate_kwargs) and returns a Series
+    :param predicate_kwargs: a dict. For expression strings, these are available as @ variables.
+    :return: a Series with an entry for each row of df, aligned with (and indexed like) df
+    """
+    if stringish(predicate):
+        rtn = df.eval(predicate, local_dict=dict(predicate_kwargs))
+    else:
+        rtn = predicate(df, **predicate_kwargs)
+    verify(isinstance(rtn, pd.Series) and len(rtn) == len(df),
+           "a vectorized row predicate needs to return a Series with an entry for each row")
+    if not rtn.index.equals(df.index):
+        # the predicate re-ordered (or re-indexed) its result, so it is aligned by label, and never by position
+        verify(df.index.is_unique and rtn.index.is_unique and rtn.index.isin(df.index).all(),
+               "a vectorized row predicate needs to return a Series indexed by the rows of the DataFrame")
+        rtn = rtn.reindex(df.index)
+    return rtn
+
+def vectorized_predicate_failures(predicate_result, predicate_failure_response):
+    """
+    :param predicate_result: a Series returned by vectorized_predicate_result
+    :param predicate_failure_response: either "Boolean" or "Error Message"
+    :return: a boolean Series identifying the rows that fail the predicate
+    """
+    if predicate_failure_response == "Boolean" or predicate_result.dtype == bool:
+        return ~predicate_result.fillna(False).astype(bool)
+    return pd.Series([x is not True and x is not numpy.True_ for x in predicate_result],
+                     index=predicate_result.index, dtype=bool)
 
 def does_new_fk_complete_circle(native_tbl, foreign_tbl, tdf):
     fks = defaultdict(set)
@@ -1106,4 +1644,135 @@ def does_new_fk_complete_circle(native_tbl, foreign_tbl, tdf):
             for fk in fks.get(t, ()):
                 process_table(fk.foreign_table, already_seen + [t])
     process_table(foreign_tbl, [])
-    return bool(rtn)
\ No newline at end of file
+    return bool(rtn)
+
+def foreign_key_table_ranks(foreign_keys):
+    """
+    ranks the tables that participate in foreign keys so that parent (i.e. foreign) tables are ranked ahead of
+    their child (i.e. native) tables. Tables in a circle of foreign keys are ranked after the tables that feed
+    into the circle, but otherwise in no particular order.
+    :param foreign_keys: iterable of ForeignKey objects
+    :return: a dict mapping table name to rank (with 0 being the first rank)
+    """
+    foreign_keys = list(foreign_keys)
+    tables = list(dict.fromkeys(t for fk in foreign_keys for t in (fk.foreign_table, fk.native_table)))
+    parents = {t: set() for t in tables}
+    for fk in foreign_keys:
+        if fk.native_table != fk.foreign_table:
+            parents[fk.native_table].add(fk.foreign_table)
+    def ancestors(t):
+        rtn, stack = set(), [t]
+        while stack:
+            for p in parents[stack.pop()]:
+                if p not in rtn:
+                    rtn.add(p)
+                    stack.append(p)
+        return rtn
+    rtn = {}
+    while len(rtn) < len(tables):
+        ready = [t for t in tables if t not in rtn and parents[t].issubset(rtn)]
+        if not ready: # ranking an entire circle that only depends on tables that have already been ranked
+            t = next(t for t in tables if t not in rtn and all(t in ancestors(p) for p in parents[t].difference(rtn)))
+            ready = [t] + [p for p in tables if p not in rtn and p != t and p in ancestors(t) and t in ancestors(p)]
+        for t in ready:
+            rtn[t] = len(rtn)
+    return rtn
+
+_forked_work = None # the (function, args) being mapped by fork_map, inherited by the worker processes
+def _do_forked_work(i):
+    function, args = _forked_work
+    return function(args[i])
+
+def fork_map(function, args, n_jobs):
+    """
+    maps function over args, sharding the calls across a pool of forked worker processes. The workers inherit
+    the memory of this process (copy-on-write), so neither function nor the data it refers to need to be pickled,
+    but the return values do.
+    :param function: a one argument function
+    :param args: an iterable of arguments for function
+    :param n_jobs: the number of worker processes. -1 means one per CPU. If 1 (or if processes can't be forked on
+                   this platform) then function is simply called in this process.
+    :return: the list of function return values, in the order of args
+    """
+    global _forked_work
+    verify(n_jobs == -1 or (isinstance(n_jobs, int) and n_jobs >= 1), "n_jobs should be -1 or a positive integer")
+    args = list(args)
+    n_jobs = min(os.cpu_count() or 1 if n_jobs == -1 else n_jobs, len(args))
+    if n_jobs <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return [function(_) for _ in args]
+    verify(_forked_work is None, "fork_map can't be called from within a fork_map call")
+    _forked_work = (function, args)
+    try:
+        with multiprocessing.get_context("fork").Pool(n_jobs) as pool:
+            return pool.map(_do_forked_work, range(len(args)), chunksize=1)
+    finally:
+        _forked_work = None
+
+def has_perfect_matching(left, candidates, supply=None, capacity=None):
+    """
+    can every left item be paired with its own distinct right item, such that each left item is paired with one of
+    its candidates? Solved with augmenting paths, so an early pairing never blocks a later one.
+    :param left: iterable of hashable left items
+    :param candidates: function that maps a left item to an iterable of hashable right items, best guesses first.
+                       Each iterable is consumed lazily, and only once, so that in the typical case where the first
+                       candidate works out the remaining candidates are never computed.
+    :param supply: optional function that maps a left item to the number of right items it needs (by default, 1).
+                   Identical items can thus be collapsed into a single item with a count.
+    :param capacity: optional function that maps a right item to the number of left items it can take (by default, 1)
+    :return: True if such a pairing exists, False otherwise
+    """
+    supply, capacity = supply or (lambda x: 1), capacity or (lambda y: 1)
+    flow, used, found, pending, done = {}, {}, {}, {}, object() # flow maps right item -> {left item: amount}
+    def candidate(x, i):
+        # the i-th candidate of left item x, or done
+        if x not in found:
+            found[x], pending[x] = [], iter(candidates(x))
+        while len(found[x]) <= i:
+            y = next(pending[x], done)
+            if y is done:
+                return done
+            found[x].append(y)
+        return found[x][i]
+    for root in left:
+        need = supply(root)
+        while need > 0:
+            # a depth first search that alternates between left items (trying their candidates) and full right items
+            # (trying to re-route the left items paired with them). The stack is the path being searched.
+            seen_left, seen_right, stack, end = {root}, set(), [(root, count())], None
+            while stack:
+                node, it = stack[-1]
+                if len(stack) % 2:
+                    y = candidate(node, next(it))
+                    if y is done:
+                        stack.pop()
+                    elif y not in seen_right:
+                        seen_right.add(y)
+                        if used.get(y, 0) < capacity(y):
+                            end = y
+                            break
+                        stack.append((y, iter(list(flow.get(y, ())))))
+                else:
+                    x = next(it, done)
+                    if x is done:
+                        stack.pop()
+                    elif x not in seen_left:
+                        seen_left.add(x)
+                        stack.append((x, count()))
+            if end is None:
+                return False
+            path = [node for node, _ in stack] + [end]
+            amount = min([need, capacity(end) - used[end] if end in used else capacity(end)] +
+                         [flow[path[k]][path[k+1]] for k in range(1, len(path) - 1, 2)])
+            for k in range(len(path) - 1):
+                if k % 2: # an existing pairing is undone
+                    y, x = path[k], path[k+1]
+                    flow[y][x] -= amount
+                    if not flow[y][x]:
+                        del flow[y][x]
+                else:
+                    x, y = path[k], path[k+1]
+                    flow.setdefault(y, {})
+                    flow[y][x] = flow[y].get(x, 0) + amount
+            used[end] = used.get(end, 0) + amount
+            need -= amount
+    return True
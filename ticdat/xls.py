@@ -182,17 +182,19 @@ class XlsTicFactory(freezable_factory(object, "_isFrozen")) :
                     table_len = min(len(list(self.iter_cols(sheet))[field_indicies[table][field]])
                                    for field in tdf.data_fields[table])
                     row_list = list(self.iter_rows(sheet))
+                    sub_tuple = self._sub_tuple(table, tdf.data_fields[table],
+                                                field_indicies[table], treat_inf_as_infinity, datemode)
                     for x in (row_list[i] for i in range(table_len)[row_offset+ho:]):
-                        yield self._sub_tuple(table, tdf.data_fields[table],
-                                              field_indicies[table], treat_inf_as_infinity, datemode)(x)
+                        yield sub_tuple(x)
             else:
                 if table in sheets :
                     sheet = sheets[table]
                     table_len = min(len(sheet.col_values(field_indicies[table][field]))
                                    for field in tdf.data_fields[table])
+                    sub_tuple = self._sub_tuple(table, tdf.data_fields[table],
+                                                field_indicies[table], treat_inf_as_infinity, datemode)
                     for x in (sheet.row_values(i) for i in range(table_len)[row_offset+ho:]):
-                        yield self._sub_tuple(table, tdf.data_fields[table],
-                                              field_indicies[table], treat_inf_as_infinity, datemode)(x)
+                        yield sub_tuple(x)
         return tableObj
 
     def _create_tic_dat_dict(self, xls_file_path, row_offsets, headers_present, treat_inf_as_infinity):
@@ -210,42 +212,46 @@ class XlsTicFactory(freezable_factory(object, "_isFrozen")) :
         ho = 1 if headers_present else 0
         if xls_file_path.endswith('.xlsx'):
             for tbl, sheet in sheets.items() :
-                fields = tdf.primary_key_fields.get(tbl, ()) + tdf.data_fields.get(tbl, ())
+                fields = tdf.compile().all_fields.get(tbl, ())
                 assert fields or tbl in self.tic_dat_factory.generic_tables
                 indicies = field_indicies[tbl]
                 table_len = min(len(list(self.iter_cols(sheet))[indicies[field]])
                                 for field in (fields or indicies))
                 if tdf.primary_key_fields.get(tbl, ()) :
                     row_list = list(self.iter_rows(sheet))
-                    tableObj = {self._sub_tuple(tbl, tdf.primary_key_fields[tbl], indicies, tiai, dm)(x):
-                                self._sub_tuple(tbl, tdf.data_fields.get(tbl, ()), indicies, tiai, dm)(x)
+                    pk_tuple = self._sub_tuple(tbl, tdf.primary_key_fields[tbl], indicies, tiai, dm)
+                    data_tuple = self._sub_tuple(tbl, tdf.data_fields.get(tbl, ()), indicies, tiai, dm)
+                    tableObj = {pk_tuple(x): data_tuple(x)
                                 for x in (row_list[i] for i in
                                             range(table_len)[row_offsets[tbl]+ho:])}
                 elif tbl in tdf.generic_tables:
                     tableObj = None # will be read via PanDatFactory
                 else :
                     row_list = list(self.iter_rows(sheet))
-                    tableObj = [self._sub_tuple(tbl, tdf.data_fields.get(tbl, ()), indicies, tiai, dm)(x)
+                    data_tuple = self._sub_tuple(tbl, tdf.data_fields.get(tbl, ()), indicies, tiai, dm)
+                    tableObj = [data_tuple(x)
                                 for x in (row_list[i] for i in
                                             range(table_len)[row_offsets[tbl]+ho:])]
                 if tableObj is not None:
                     rtn[tbl] = tableObj
         else:
             for tbl, sheet in sheets.items():
-                fields = tdf.primary_key_fields.get(tbl, ()) + tdf.data_fields.get(tbl, ())
+                fields = tdf.compile().all_fields.get(tbl, ())
                 assert fields or tbl in self.tic_dat_factory.generic_tables
                 indicies = field_indicies[tbl]
                 table_len = min(len(sheet.col_values(indicies[field]))
                                 for field in (fields or indicies))
                 if tdf.primary_key_fields.get(tbl, ()):
-                    tableObj = {self._sub_tuple(tbl, tdf.primary_key_fields[tbl], indicies, tiai, dm)(x):
-                                    self._sub_tuple(tbl, tdf.data_fields.get(tbl, ()), indicies, tiai, dm)(x)
+                    pk_tuple = self._sub_tuple(tbl, tdf.primary_key_fields[tbl], indicies, tiai, dm)
+                    data_tuple = self._sub_tuple(tbl, tdf.data_fields.get(tbl, ()), indicies, tiai, dm)
+                    tableObj = {pk_tuple(x): data_tuple(x)
                                 for x in (sheet.row_values(i) for i in
                                           range(table_len)[row_offsets[tbl] + ho:])}
                 elif tbl in tdf.generic_tables:
                     tableObj = None  # will be read via PanDatFactory
                 else:
-                    tableObj = [self._sub_tuple(tbl, tdf.data_fields.get(tbl, ()), indicies, tiai, dm)(x)
+                    data_tuple = self._sub_tuple(tbl, tdf.data_fields.get(tbl, ()), indicies, tiai, dm)
+                    tableObj = [data_tuple(x)
                                 for x in (sheet.row_values(i) for i in
                                           range(table_len)[row_offsets[tbl] + ho:])]
                 if tableObj is not None:
@@ -298,9 +304,10 @@ class XlsTicFactory(freezable_factory(object, "_isFrozen")) :
                 indicies = fieldIndicies[table]
                 table_len = min(len(list(self.iter_cols(sheet))[indicies[field]]) for field in fields)
                 row_list = list(self.iter_rows(sheet))
+                pk_tuple = self._sub_tuple(table, tdf.primary_key_fields[table],
+                                           indicies, treat_inf_as_infinity=True, datemode=dm)
                 for x in (row_list[i] for i in range(table_len)[row_offsets[table]+ho:]) :
-                    rtn[table][self._sub_tuple(table, tdf.primary_key_fields[table],
-                                               indicies, treat_inf_as_infinity=True, datemode=dm)(x)] += 1
+                    rtn[table][pk_tuple(x)] += 1
             for t in list(rtn.keys()):
                 rtn[t] = {k:v for k,v in rtn[t].items() if v > 1}
                 if not rtn[t]:
@@ -310,9 +317,10 @@ class XlsTicFactory(freezable_factory(object, "_isFrozen")) :
                 fields = tdf.primary_key_fields[table] + tdf.data_fields.get(table, ())
                 indicies = fieldIndicies[table]
                 table_len = min(len(sheet.col_values(indicies[field])) for field in fields)
+                pk_tuple = self._sub_tuple(table, tdf.primary_key_fields[table],
+                                           indicies, treat_inf_as_infinity=True, datemode=dm)
                 for x in (sheet.row_values(i) for i in range(table_len)[row_offsets[table]+ho:]) :
-                    rtn[table][self._sub_tuple(table, tdf.primary_key_fields[table],
-                                               indicies, treat_inf_as_infinity=True, datemode=dm)(x)] += 1
+                    rtn[table][pk_tuple(x)] += 1
             for t in list(rtn.keys()):
                 rtn[t] = {k:v for k,v in rtn[t].items() if v > 1}
                 if not rtn[t]:
@@ -328,34 +336,43 @@ class XlsTicFactory(freezable_factory(object, "_isFrozen")) :
         return self._dv_dt[table, field]
     def _sub_tuple(self, table, fields, field_indicies, treat_inf_as_infinity, datemode) :
         assert set(fields).issubset(field_indicies)
-        if self.tic_dat_factory.infinity_io_flag != "N/A" or \
-            (table == "parameters" and self.tic_dat_factory.parameters):
+        tdf = self.tic_dat_factory
+        if tdf.infinity_io_flag != "N/A" or (table == "parameters" and tdf.parameters):
             treat_inf_as_infinity = False
-        def _read_cell(x, field):
+        def cell_reader(field):
+            # resolves everything that depends only on (table, field) up front, so as to not pay for it once per cell
             dv, dt = self._get_dv_dt(table, field)
-            rtn = x[field_indicies[field]]
-            if rtn == "" and ((dt and dt.nullable) or (not dt and dv is None)):
-                return None
-            if treat_inf_as_infinity and utils.stringish(rtn) and rtn.lower() in ["inf", "-inf"]:
-                return float(rtn.lower())
-            if utils.numericish(rtn) and utils.safe_apply(int)(rtn) == rtn and dt and dt.must_be_int:
-                rtn = int(rtn)
-            if rtn == "":
-                try_rtn = self.tic_dat_factory._general_read_cell(table, field, None) # None as infinity flagging
-                if utils.numericish(try_rtn):
-                    return try_rtn
-            if utils.numericish(rtn) and dt and dt.datetime:
-                rtn = utils.safe_apply(lambda : xlrd.xldate_as_tuple(rtn, datemode))()
-                if rtn is not None:
-                    f = datetime.datetime
-                    if utils.pd:
-                        f = utils.pd.Timestamp
-                    return f(year=rtn[0], month=rtn[1], day=rtn[2], hour=rtn[3], minute=rtn[4], second=rtn[5])
-            return self.tic_dat_factory._general_read_cell(table, field, rtn)
+            index, general = field_indicies[field], tdf._cell_reader(table, field)
+            empty_is_none = bool((dt and dt.nullable) or (not dt and dv is None))
+            must_be_int, is_datetime = bool(dt and dt.must_be_int), bool(dt and dt.datetime)
+            empty_read = [] # None as infinity flagging, resolved the first time an empty cell is read
+            def reader(x):
+                rtn = x[index]
+                if rtn == "" and empty_is_none:
+                    return None
+                if treat_inf_as_infinity and utils.stringish(rtn) and rtn.lower() in ["inf", "-inf"]:
+                    return float(rtn.lower())
+                if must_be_int and utils.numericish(rtn) and utils.safe_apply(int)(rtn) == rtn:
+                    rtn = int(rtn)
+                if rtn == "":
+                    if not empty_read:
+                        empty_read.append(None if general is None else general(None))
+                    if utils.numericish(empty_read[0]):
+                        return empty_read[0]
+                if is_datetime and utils.numericish(rtn):
+                    rtn = utils.safe_apply(lambda : xlrd.xldate_as_tuple(rtn, datemode))()
+                    if rtn is not None:
+                        f = datetime.datetime
+                        if utils.pd:
+                            f = utils.pd.Timestamp
+                        return f(year=rtn[0], month=rtn[1], day=rtn[2], hour=rtn[3], minute=rtn[4], second=rtn[5])
+                return rtn if general is None else general(rtn)
+            return reader
+        readers = [cell_reader(field) for field in fields]
+        if len(readers) == 1 :
+            return readers[0]
         def rtn(x) :
-            if len(fields) == 1 :
-                return _read_cell(x, fields[0])
-            return tuple(_read_cell(x, field) for field in fields)
+            return tuple(r(x) for r in readers)
         return rtn
 
     def iter_rows(self, ws):
@@ -463,9 +480,9 @@ class XlsTicFactory(freezable_factory(object, "_isFrozen")) :
         book = xlwt.Workbook()
         for t in  sorted(sorted(tdf.all_tables),
                          key=lambda x: len(tdf.primary_key_fields.get(x, ()))) :
-            all_flds = self.tic_dat_factory.primary_key_fields.get(t, ()) + self.tic_dat_factory.data_fields.get(t, ())
+            all_flds = tdf.compile().all_fields.get(t, ())
             sheet = book.add_sheet(tbl_name_mapping[t][:_longest_sheet])
-            for i,f in enumerate(tdf.primary_key_fields.get(t,()) + tdf.data_fields.get(t, ())) :
+            for i,f in enumerate(all_flds) :
                 sheet.write(0, i, f)
             _t = getattr(tic_dat, t)
             if utils.dictish(_t) :
@@ -495,9 +512,9 @@ class XlsTicFactory(freezable_factory(object, "_isFrozen")) :
             return x
         for t in sorted(sorted(tdf.all_tables),
                          key=lambda x: len(tdf.primary_key_fields.get(x, ()))) :
-            all_flds = self.tic_dat_factory.primary_key_fields.get(t, ()) + self.tic_dat_factory.data_fields.get(t, ())
+            all_flds = tdf.compile().all_fields.get(t, ())
             sheet = book.add_worksheet(tbl_name_mapping[t][:_longest_sheet])
-            for i,f in enumerate(tdf.primary_key_fields.get(t,()) + tdf.data_fields.get(t, ())) :
+            for i,f in enumerate(all_flds) :
                 sheet.write(0, i, f)
             _t = getattr(tic_dat, t)
             if utils.dictish(_t) :